@@ -0,0 +1,140 @@
+#important python libraries
+import os
+import json
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+#folder next to the artifacts holding one manifest entry per artifact
+MANIFEST_FOLDER = '.manifest'
+
+#bump when the entry layout or the fingerprint encoding changes so that all artifacts are rebuilt
+MANIFEST_VERSION = 1
+
+def _update_hash(sha, obj):
+    """
+    Feeds an object into a hash: frames, series, indexes and arrays by their values,
+    containers recursively and anything else by its repr.
+    """
+    if isinstance(obj, pd.DataFrame):
+        sha.update(b'frame')
+        _update_hash(sha, [str(column) for column in obj.columns])
+        _update_hash(sha, [str(dtype) for dtype in obj.dtypes])
+        sha.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, pd.Series):
+        sha.update(f'series|{obj.name}|{obj.dtype}|{obj.index.dtype}'.encode('utf-8'))
+        sha.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, pd.Index):
+        sha.update(f'index|{obj.name}|{obj.dtype}'.encode('utf-8'))
+        sha.update(pd.util.hash_pandas_object(obj).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        sha.update(f'array|{obj.dtype}|{obj.shape}'.encode('utf-8'))
+        if obj.dtype == object:
+            sha.update(pd.util.hash_pandas_object(pd.Series(obj.ravel()), index=False).to_numpy().tobytes())
+        else:
+            sha.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        sha.update(f'dict|{len(obj)}'.encode('utf-8'))
+        for key in sorted(obj, key=str):
+            _update_hash(sha, str(key))
+            _update_hash(sha, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        sha.update(f'{type(obj).__name__}|{len(obj)}'.encode('utf-8'))
+        for item in obj:
+            _update_hash(sha, item)
+    elif isinstance(obj, bytes):
+        sha.update(b'bytes|' + obj)
+    else:
+        sha.update(f'{type(obj).__name__}|{obj!r}'.encode('utf-8'))
+
+def fingerprint(*parts):
+    """
+    Builds a fingerprint of the data and parameters an artifact is made from.
+
+    Args:
+        *parts: The inputs of the artifact, e.g. a plot spec. DataFrames, Series, Index
+                objects and numpy arrays are hashed by value; dicts, lists and tuples
+                recursively; anything else by its repr.
+
+    Returns:
+        str: The SHA-256 hex digest of the inputs.
+    """
+    sha = hashlib.sha256(f'manifest-v{MANIFEST_VERSION}'.encode('utf-8'))
+    _update_hash(sha, parts)
+    return sha.hexdigest()
+
+def entry_path(artifact_path):
+    """
+    Returns the path of the manifest entry of an artifact.
+
+    Args:
+        artifact_path (str): The path of the artifact, e.g. a PNG or HTML file.
+
+    Returns:
+        str: The path of its JSON manifest entry.
+    """
+    folder, name = os.path.split(artifact_path)
+    return os.path.join(folder, MANIFEST_FOLDER, f'{name}.json')
+
+def _read_entry(artifact_path):
+    try:
+        with open(entry_path(artifact_path), 'r', encoding='utf-8') as entry_file:
+            return json.load(entry_file)
+    except (OSError, ValueError):
+        return None
+
+def is_up_to_date(artifact_path, key):
+    """
+    Checks whether an artifact was produced from inputs with the given fingerprint.
+
+    The artifact must also still exist with the size and modification time recorded
+    when it was written, so that a deleted or externally edited file is rebuilt.
+
+    Args:
+        artifact_path (str): The path of the artifact.
+        key (str): The fingerprint of its current inputs (see `fingerprint`).
+
+    Returns:
+        bool: True if the artifact can be kept as it is.
+    """
+    entry = _read_entry(artifact_path)
+    if entry is None or entry.get('fingerprint') != key:
+        return False
+    try:
+        stat = os.stat(artifact_path)
+    except OSError:
+        return False
+    return entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns
+
+def record(artifact_path, key):
+    """
+    Records the fingerprint of a freshly written artifact in its manifest entry.
+
+    Args:
+        artifact_path (str): The path of the artifact.
+        key (str): The fingerprint of the inputs it was made from.
+    """
+    stat = os.stat(artifact_path)
+    entry = {'fingerprint': key, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    path = entry_path(artifact_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    #write to a temporary file first so that a concurrent reader never sees half an entry
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as entry_file:
+        json.dump(entry, entry_file)
+    os.replace(temp_path, path)
+
+def forget(artifact_path):
+    """
+    Removes the manifest entry of an artifact, so that it is rebuilt on the next run.
+
+    Args:
+        artifact_path (str): The path of the artifact.
+    """
+    try:
+        os.remove(entry_path(artifact_path))
+    except FileNotFoundError:
+        pass
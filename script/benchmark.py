@@ -0,0 +1,460 @@
+#important python libraries
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tracemalloc
+
+#root of the repository, so that `script` is importable in child interpreters
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#child interpreter code: time one cold import and report which heavy libraries it pulled in
+_IMPORT_TIMER = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = ['nltk', 'spacy', 'sklearn', 'textblob', 'matplotlib', 'seaborn']
+print(json.dumps({{'seconds': elapsed, 'loaded': [name for name in heavy if name in sys.modules]}}))
+"""
+
+def benchmark_import_time(module='script.news_analyser', repeats=5, offline=True):
+    """
+    Measures the cold import time of a module, each run in a fresh interpreter.
+
+    Args:
+        module (str): The dotted module name to import.
+        repeats (int): The number of fresh interpreters to time.
+        offline (bool): Whether to run with NLP offline mode on, so that no run can
+                        spend time downloading resources.
+
+    Returns:
+        dict: The module, per-run seconds, their min/median/max, and the heavy
+              libraries loaded by the import.
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [REPO_ROOT, env.get('PYTHONPATH')]))
+    if offline:
+        env['NLP_OFFLINE'] = '1'
+
+    runs = []
+    loaded = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', _IMPORT_TIMER.format(module=module)],
+                                cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        runs.append(result['seconds'])
+        loaded = result['loaded']
+
+    return {'module': module,
+            'runs': runs,
+            'min_seconds': min(runs),
+            'median_seconds': statistics.median(runs),
+            'max_seconds': max(runs),
+            'heavy_modules_loaded': loaded}
+
+def synthetic_prices(n_rows, seed=0, freq='min', start='2020-01-01'):
+    """
+    Generates a seeded random-walk OHLCV frame with a 'Date' column.
+
+    Args:
+        n_rows (int): The number of bars.
+        seed (int): The random seed; the same seed gives the same frame.
+        freq (str): The bar frequency, e.g. 'min' for minute bars or 'B' for trading days.
+        start (str): The date of the first bar.
+
+    Returns:
+        pandas.DataFrame: The bars, with the columns of the historical price files.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n_rows)))
+    spread = close * rng.uniform(0, 0.002, n_rows)
+    return pd.DataFrame({'Date': pd.date_range(start, periods=n_rows, freq=freq),
+                         'Open': close + rng.normal(0, 0.0005, n_rows) * close,
+                         'High': close + spread,
+                         'Low': close - spread,
+                         'Close': close,
+                         'Adj Close': close * 0.99,
+                         'Volume': rng.integers(100, 10_000, n_rows)})
+
+#vocabulary of the synthetic analyst-ratings headlines
+_FIRMS = ['Morgan Stanley', 'Goldman Sachs', 'JP Morgan', 'Barclays', 'Citi', 'Credit Suisse', 'UBS',
+          'Deutsche Bank', 'Wells Fargo', 'Jefferies', 'Piper Sandler', 'Needham', 'Oppenheimer', 'Bernstein']
+_ACTIONS = ['Upgrades', 'Downgrades', 'Maintains Buy on', 'Maintains Sell on', 'Initiates Coverage On',
+            'Raises Price Target On', 'Lowers Price Target On', 'Reiterates Neutral on', 'Assumes Outperform on']
+_TAILS = ['Shares Rise In Pre-Market', 'Shares Fall After Hours', 'Sees Strong Growth Ahead',
+          'Cites Weak Guidance', 'Ahead Of Earnings', 'After Better-Than-Expected Q2 Results',
+          'Following Disappointing Sales', 'On Valuation Concerns', 'As Demand Recovers',
+          'Amid Supply Chain Risks', 'Price Target Raised To $150', 'Price Target Cut To $90']
+_PUBLISHERS = ['Benzinga Newsdesk', 'Lisa Levin', 'Paul Quintaro', 'Charles Gross', 'Monica Gerson',
+               'Eddie Staley', 'Hal Lindon', 'ETF Professor', 'Juan Lopez', 'vick@benzinga.com',
+               'webmaster@benzinga.com', 'newsdesk@reuters.com']
+_TICKERS = ['AAPL', 'AMZN', 'GOOG', 'META', 'MSFT', 'NVDA', 'TSLA', 'A', 'AA', 'AAL', 'AMD', 'BA', 'C', 'DIS',
+            'F', 'GE', 'IBM', 'INTC', 'JPM', 'KO', 'MS', 'NFLX', 'ORCL', 'PFE', 'T', 'WMT', 'XOM', 'ZNGA']
+
+#tickers the load stage filters for
+BENCHMARK_TICKERS = ['AAPL', 'AMZN', 'GOOG', 'META', 'MSFT', 'NVDA', 'TSLA']
+
+def synthetic_headlines(n_rows, seed=0, start='2011-01-01', end='2020-06-11'):
+    """
+    Generates seeded analyst-ratings headlines in the layout of the raw news file.
+
+    Headlines combine a firm, a rating action, a ticker and a tail; tickers follow a
+    skewed distribution and timestamps are spread over the period, newest first, with
+    the -04:00 offset of the raw file.
+
+    Args:
+        n_rows (int): The number of headlines.
+        seed (int): The random seed; the same seed gives the same frame.
+        start (str): The first publication date.
+        end (str): The last publication date.
+
+    Returns:
+        pandas.DataFrame: The columns 'headline', 'url', 'publisher', 'date' and 'stock'.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    tickers = np.array(_TICKERS, dtype=object)
+    weights = 1 / np.arange(1, len(tickers) + 1)
+    stock = tickers[rng.choice(len(tickers), n_rows, p=weights / weights.sum())]
+
+    def pick(words):
+        return pd.Series(np.array(words, dtype=object)[rng.integers(0, len(words), n_rows)])
+
+    headline = pick(_FIRMS) + ' ' + pick(_ACTIONS) + ' ' + pd.Series(stock) + ', ' + pick(_TAILS)
+
+    first, last = pd.Timestamp(start).value // 10**9, pd.Timestamp(end).value // 10**9
+    seconds = np.sort(rng.integers(first, last, n_rows))[::-1]
+    date = pd.to_datetime(seconds, unit='s').tz_localize('UTC').tz_convert('UTC-04:00')
+
+    return pd.DataFrame({'headline': headline,
+                         'url': 'https://www.benzinga.com/news/' + pd.Series(np.arange(n_rows)).astype(str),
+                         'publisher': pick(_PUBLISHERS),
+                         'date': date,
+                         'stock': stock})
+
+def write_synthetic_news(file_path, n_rows, seed=0):
+    """
+    Writes synthetic headlines to a CSV file shaped like the raw analyst-ratings file.
+
+    Args:
+        file_path (str): The path of the CSV file.
+        n_rows (int): The number of headlines.
+        seed (int): The random seed.
+
+    Returns:
+        str: The path of the CSV file.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    #the unnamed leading index column matches the raw file
+    synthetic_headlines(n_rows, seed).to_csv(file_path, index=True)
+    return file_path
+
+def benchmark_indicator_memory(n_rows=1_000_000, dtype='float64'):
+    """
+    Measures the peak memory of building a StockAnalyser and its indicators, with and without copies.
+
+    Memory is traced with `tracemalloc`, which records NumPy buffers. The copy-free mode
+    is checked against its documented bound: the indicator buffer plus
+    `INDICATOR_TEMP_BYTES_PER_ROW` bytes of temporaries per row.
+
+    Args:
+        n_rows (int): The number of synthetic minute bars.
+        dtype (str): The indicator dtype, 'float64' or 'float32'.
+
+    Returns:
+        dict: Input bytes per row, peak extra bytes per row for each mode, the bound
+              and whether the copy-free mode stayed within it.
+    """
+    import numpy as np
+    from .historical_price_analyser import StockAnalyser, INDICATOR_TEMP_BYTES_PER_ROW
+    from .indicator_engine import INDICATOR_COLUMNS
+
+    dtype = np.dtype(dtype)
+    prices = synthetic_prices(n_rows)
+    result = {'rows': n_rows, 'dtype': dtype.name,
+              'input_bytes_per_row': prices.memory_usage(index=False).sum() / n_rows}
+
+    for copy in (True, False):
+        data = prices.copy()
+        tracemalloc.start()
+        analyser = StockAnalyser(data, copy=copy)
+        analyser.calculate_technical_indicators(analyser.data, copy=copy, dtype=dtype.type)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['copy_peak_bytes_per_row' if copy else 'copy_free_peak_bytes_per_row'] = peak / n_rows
+        del analyser, data
+
+    bound = len(INDICATOR_COLUMNS) * dtype.itemsize + INDICATOR_TEMP_BYTES_PER_ROW
+    result['copy_free_bound_bytes_per_row'] = bound
+    result['within_guarantee'] = result['copy_free_peak_bytes_per_row'] <= bound
+    return result
+
+#news file sizes the suite runs by default; larger sizes (up to 10M rows) are passed with --sizes
+SUITE_SIZES = (10_000, 100_000)
+
+#a stage is a regression when its time or peak memory grows by more than this share
+REGRESSION_THRESHOLD = 0.25
+
+def _stage_load(n_rows, seed, workdir):
+    from . import news_data_loader
+
+    path = os.path.join(workdir, f'news_{n_rows}_{seed}.csv')
+    if not os.path.exists(path):
+        write_synthetic_news(path, n_rows, seed)
+    return lambda: news_data_loader.load_and_filter_data(path, BENCHMARK_TICKERS)
+
+def _stage_sentiment(n_rows, seed, workdir, scorer='textblob'):
+    from . import news_sentiment_analyser
+
+    news = synthetic_headlines(n_rows, seed).rename(columns={'headline': 'Headline'})
+    return lambda: news_sentiment_analyser.add_sentiment_column(news, scorer=scorer)
+
+def _stage_sentiment_lexicon(n_rows, seed, workdir):
+    return _stage_sentiment(n_rows, seed, workdir, scorer='lexicon')
+
+def _stage_preprocess(n_rows, seed, workdir):
+    from . import news_text_processor
+
+    headlines = synthetic_headlines(n_rows, seed)['headline']
+    return lambda: news_text_processor.preprocess_texts(headlines)
+
+def _stage_tfidf(n_rows, seed, workdir):
+    from . import news_text_processor
+
+    headlines = synthetic_headlines(n_rows, seed)['headline'].str.lower()
+    return lambda: news_text_processor.calculate_tfidf(headlines)
+
+def _stage_indicators(n_rows, seed, workdir):
+    from .historical_price_analyser import StockAnalyser
+
+    prices = synthetic_prices(n_rows, seed)
+
+    def run():
+        analyser = StockAnalyser(prices)
+        return analyser.calculate_technical_indicators(analyser.data)
+    return run
+
+def _stage_align(n_rows, seed, workdir):
+    import numpy as np
+    import pandas as pd
+    from . import correlation_analyser
+
+    news = synthetic_headlines(n_rows, seed)[['date']].rename(columns={'date': 'Date'})
+    news['Sentiment'] = np.random.default_rng(seed).uniform(-1, 1, n_rows)
+    #one trading day per session over the whole news period
+    sessions = len(pd.bdate_range(news['Date'].min().date(), news['Date'].max().date()))
+    prices = synthetic_prices(sessions, seed, freq='B', start=str(news['Date'].min().date()))
+    return lambda: correlation_analyser.process_and_align_data(prices, news)
+
+#benchmark stages: each builds its seeded input (untimed) and returns the call to time
+STAGES = {
+    'load': _stage_load,
+    'sentiment': _stage_sentiment,
+    'sentiment-lexicon': _stage_sentiment_lexicon,
+    'preprocess': _stage_preprocess,
+    'tfidf': _stage_tfidf,
+    'indicators': _stage_indicators,
+    'align': _stage_align,
+}
+
+def _environment():
+    """
+    Describes the machine and library versions a benchmark ran with.
+    """
+    import platform
+    import datetime
+    import numpy as np
+    import pandas as pd
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'commit': commit,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()}
+
+def run_stage(stage, n_rows, seed=0, repeats=3, memory=True, workdir=None):
+    """
+    Times one stage on seeded synthetic data, and optionally traces its peak memory.
+
+    The input is generated before timing. Each repeat is timed after a garbage
+    collection, and the stage's own printing is suppressed. The memory run is a
+    separate run under `tracemalloc`, so that tracing does not slow the timed runs.
+
+    Args:
+        stage (str): The stage name, a key of `STAGES`.
+        n_rows (int): The number of synthetic rows.
+        seed (int): The random seed.
+        repeats (int): The number of timed runs.
+        memory (bool): Whether to trace the peak memory.
+        workdir (str, optional): The folder for generated files. Defaults to 'data/benchmark'.
+
+    Returns:
+        dict: The stage, rows, per-run seconds, their minimum and median, rows per
+              second and the peak traced bytes; or the error if the stage failed.
+    """
+    import io
+    import gc
+    import time
+    import contextlib
+
+    workdir = workdir or os.path.join('data', 'benchmark')
+    os.makedirs(workdir, exist_ok=True)
+    result = {'stage': stage, 'rows': n_rows}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            run = STAGES[stage](n_rows, seed, workdir)
+            runs = []
+            for _ in range(repeats):
+                gc.collect()
+                start = time.perf_counter()
+                run()
+                runs.append(time.perf_counter() - start)
+
+            peak = None
+            if memory:
+                gc.collect()
+                tracemalloc.start()
+                run()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+    except Exception as e:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        result['error'] = f'{type(e).__name__}: {e}'
+        return result
+
+    result.update({'runs': runs,
+                   'min_seconds': min(runs),
+                   'median_seconds': statistics.median(runs),
+                   'rows_per_second': n_rows / min(runs) if min(runs) > 0 else None,
+                   'peak_bytes': peak})
+    return result
+
+def run_suite(stages=None, sizes=SUITE_SIZES, seed=0, repeats=3, memory=True, workdir=None):
+    """
+    Runs the benchmark stages for each size, offline.
+
+    Args:
+        stages (list, optional): The stage names. Defaults to all of `STAGES`.
+        sizes (tuple): The numbers of synthetic rows.
+        seed (int): The random seed.
+        repeats (int): The number of timed runs per stage and size.
+        memory (bool): Whether to trace the peak memory.
+        workdir (str, optional): The folder for generated files.
+
+    Returns:
+        dict: The 'environment' and the list of stage 'results'.
+    """
+    from . import nlp_resources
+
+    #a benchmark must never spend its time downloading models or corpora
+    nlp_resources.set_offline_mode(True)
+
+    results = []
+    for n_rows in sizes:
+        for stage in stages or list(STAGES):
+            result = run_stage(stage, n_rows, seed=seed, repeats=repeats, memory=memory, workdir=workdir)
+            results.append(result)
+            print(f"{stage:>18} {n_rows:>10,}: " + (result['error'] if 'error' in result
+                                                      else f"{result['min_seconds']:.3f}s"), file=sys.stderr)
+    return {'environment': _environment(), 'seed': seed, 'results': results}
+
+def compare_results(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Compares two suite runs stage by stage.
+
+    Args:
+        baseline (dict): The reference run, as returned by `run_suite` or loaded from its JSON.
+        current (dict): The new run.
+        threshold (float): The allowed relative growth of time and peak memory.
+
+    Returns:
+        list: One dict per stage and size present in both runs, with the time and memory
+              ratios (current / baseline) and whether either is a regression.
+    """
+    reference = {(result['stage'], result['rows']): result for result in baseline['results'] if 'error' not in result}
+    comparison = []
+    for result in current['results']:
+        before = reference.get((result['stage'], result['rows']))
+        if before is None or 'error' in result:
+            continue
+        time_ratio = result['min_seconds'] / before['min_seconds'] if before['min_seconds'] else None
+        memory_ratio = (result['peak_bytes'] / before['peak_bytes']
+                        if result.get('peak_bytes') and before.get('peak_bytes') else None)
+        comparison.append({'stage': result['stage'], 'rows': result['rows'],
+                           'time_ratio': time_ratio, 'memory_ratio': memory_ratio,
+                           'regression': any(ratio is not None and ratio > 1 + threshold
+                                             for ratio in (time_ratio, memory_ratio))})
+    return comparison
+
+def main(argv=None):
+    """
+    Command-line entry point, e.g. `python -m script.benchmark import-time --repeats 5`.
+    """
+    parser = argparse.ArgumentParser(description='Performance benchmarks for the analysis scripts.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import-time', help='Time a cold import of a module.')
+    import_parser.add_argument('--module', default='script.news_analyser')
+    import_parser.add_argument('--repeats', type=int, default=5)
+
+    memory_parser = subparsers.add_parser('indicator-memory', help='Peak memory of the indicator pipeline.')
+    memory_parser.add_argument('--rows', type=int, default=1_000_000)
+    memory_parser.add_argument('--dtype', default='float64', choices=['float64', 'float32'])
+
+    suite_parser = subparsers.add_parser('suite', help='Time and memory-profile the pipeline stages.')
+    suite_parser.add_argument('--stages', nargs='+', default=list(STAGES), choices=list(STAGES))
+    suite_parser.add_argument('--sizes', nargs='+', type=int, default=list(SUITE_SIZES))
+    suite_parser.add_argument('--seed', type=int, default=0)
+    suite_parser.add_argument('--repeats', type=int, default=3)
+    suite_parser.add_argument('--no-memory', action='store_true', help='Skip the traced memory run.')
+    suite_parser.add_argument('--output', help='JSON file to store the results in.')
+    suite_parser.add_argument('--baseline', help='JSON results of an earlier run to compare against.')
+    suite_parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+
+    compare_parser = subparsers.add_parser('compare', help='Compare two stored suite runs.')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+
+    args = parser.parse_args(argv)
+    if args.command == 'import-time':
+        result = benchmark_import_time(args.module, repeats=args.repeats)
+    elif args.command == 'indicator-memory':
+        result = benchmark_indicator_memory(args.rows, dtype=args.dtype)
+    elif args.command == 'suite':
+        result = run_suite(args.stages, args.sizes, seed=args.seed, repeats=args.repeats, memory=not args.no_memory)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as output:
+                json.dump(result, output, indent=2, default=float)
+        if args.baseline:
+            with open(args.baseline, 'r', encoding='utf-8') as baseline:
+                result = compare_results(json.load(baseline), result, args.threshold)
+    else:
+        with open(args.baseline, 'r', encoding='utf-8') as baseline, \
+                open(args.current, 'r', encoding='utf-8') as current:
+            result = compare_results(json.load(baseline), json.load(current), args.threshold)
+    print(json.dumps(result, indent=2, default=float))
+
+    #a failing exit status lets a deployment script stop on a regression
+    if args.command in ('suite', 'compare') and isinstance(result, list):
+        return 1 if any(row['regression'] for row in result) else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
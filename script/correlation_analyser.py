@@ -1,8 +1,15 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
 
+from . import news_store
+from . import frame_schema
+from . import plot_renderer
+from . import decimation
+from . import session_alignment
+from . import correlation_engine
+from . import frame_writer
+from . import instrumentation
+
 def load_stock_data(hist_data, senti_data):
     """
     Loads historical price and sentiment data from specified DataFrames.
@@ -20,25 +27,20 @@ def load_stock_data(hist_data, senti_data):
         return None, None
     return hist_data, senti_data
     
-def save_dataframe(ticker, df, df_folder, df_name) -> None:
+def save_dataframe(ticker, df, df_folder, df_name, fmt='csv') -> None:
     """
-        Saves a DataFrame to a specified directory as a CSV file.
+        Saves a DataFrame to a specified directory as a CSV, Parquet or Feather file.
+
+        The index is written as a column, as `reset_index` would, without copying the data.
 
         Args:
             df (pd.DataFrame): The DataFrame to save.
             df_folder (str): The directory path where the DataFrame will be saved.
-            df_name (str): The name of the CSV file (without extension).
+            df_name (str): The name of the file (without extension).
+            fmt (str): The output format: 'csv', or 'parquet' / 'feather' to keep the dtypes.
     """
-    if not os.path.exists(df_folder):
-        os.makedirs(df_folder)
-
-    df_path = os.path.join(df_folder, f'{df_name}.csv')
-
-    #reset the index to include the Date as a column
-    df_to_save = df.reset_index()
-
     #save the DataFrame to the specified directory
-    df_to_save.to_csv(df_path, index=False)
+    df_path, _ = frame_writer.save_frame(df, df_folder, df_name, fmt=fmt, force=True)
 
     #calculate the relative path
     current_directory = os.getcwd()
@@ -46,17 +48,29 @@ def save_dataframe(ticker, df, df_folder, df_name) -> None:
 
     print(f'DataFrame saved to: {relative_df_path}\n')
 
-def process_and_align_data(hist_data, senti_data, start_date=None, end_date=None):
+def process_and_align_data(hist_data, senti_data, start_date=None, end_date=None, compact=False,
+                           cutoff=session_alignment.MARKET_CLOSE, reducers=('mean',)):
     """
     Processes and aligns historical price data with aggregated sentiment data.
 
+    Each headline counts towards the first trading session closing after it was
+    published (see `session_alignment.map_to_sessions`), so after-hours and weekend
+    news is kept. The inputs are not modified.
+
     Args:
         hist_data (pd.DataFrame): The historical price data.
         senti_data (pd.DataFrame): The sentiment data.
-        start_date (str, optional): The start date for filtering historical data (YYYY-MM-DD).
-                                    Defaults to None.
-        end_date (str, optional): The end date for filtering historical data (YYYY-MM-DD).
-                                  Defaults to None.
+        start_date (str, optional): The start date for filtering historical and sentiment data
+                                    (YYYY-MM-DD). Defaults to None.
+        end_date (str, optional): The end date for filtering historical and sentiment data
+                                  (YYYY-MM-DD), inclusive. Defaults to None.
+        compact (bool, optional): Whether to store the result with compact dtypes
+                                  (see `frame_schema.ALIGNED_SCHEMA`). Defaults to False.
+        cutoff (str, optional): The market close (exchange time) after which news counts
+                                towards the next session. Defaults to '16:00'.
+        reducers (tuple, optional): The per-session sentiment reducers (see
+                                    `session_alignment.REDUCERS`). The mean is always added,
+                                    as it fills the 'Sentiment' column. Defaults to the mean.
 
     Returns:
         pd.DataFrame: The aligned DataFrame, or None if input data is None.
@@ -64,21 +78,21 @@ def process_and_align_data(hist_data, senti_data, start_date=None, end_date=None
     if hist_data is None or senti_data is None:
         return None
 
-    senti_data.dropna(inplace=True)
-    agg_senti = senti_data.groupby('Date')['Sentiment'].mean().reset_index()
-    '''
-    if start_date and end_date:
-        hist_data = hist_data[
-            (hist_data['Date'] >= start_date) &
-            (hist_data['Date'] <= end_date)]
-        hist_data = hist_data.reset_index(drop=True)
-    '''
-    hist_data.dropna(inplace=True)
-
-    agg_senti['Date'] = pd.to_datetime(agg_senti['Date']).dt.normalize().dt.tz_localize(None)
-    hist_data['Date'] = pd.to_datetime(hist_data['Date']).dt.normalize()
-
-    aligned_data = pd.merge(hist_data, agg_senti, left_on='Date', right_on='Date', how='inner')
+    #sessions with missing prices are dropped only after the mapping, so their news is not moved to the next session
+    price_columns = list(hist_data.columns)
+    hist_data = hist_data.assign(Date=pd.to_datetime(hist_data['Date']).dt.normalize())
+
+    #keep only the requested date window (inclusive) for both inputs
+    if start_date is not None or end_date is not None:
+        hist_data = news_store.filter_by_date(hist_data, start_date, end_date)
+        senti_data = news_store.filter_by_date(senti_data, start_date, end_date)
+
+    #the categories, plots and correlations all read the mean 'Sentiment' column
+    reducers = ('mean',) + tuple(reducer for reducer in reducers if reducer != 'mean')
+
+    aligned_data = session_alignment.align_sessions(hist_data, senti_data, cutoff=cutoff,
+                                                    reducers=reducers)
+    aligned_data = aligned_data.dropna(subset=price_columns).reset_index(drop=True)
     aligned_data = aligned_data.drop(columns=['Dividends', 'Stock Splits'], errors='ignore') # Use errors='ignore'
 
     aligned_data['Sentiment_Category'] = pd.cut(aligned_data['Sentiment'],
@@ -88,31 +102,10 @@ def process_and_align_data(hist_data, senti_data, start_date=None, end_date=None
 
     # Calculate Daily Return
     aligned_data['Daily_Return'] = aligned_data['Adj Close'].pct_change()
-    return aligned_data
-
-def save_plot(plot_folder, plot_name, plot_path):
-    """
-    Saves the current matplotlib plot to a specified location.
-
-    Args:
-        plot_folder (str): The folder to save the plot.
-        plot_name (str): The name of the plot file.
-        plot_path (str): The full path to save the plot.
-    """
-    
-    #create the directory if it doesn't exist
-    if not os.path.exists(plot_folder):
-        os.makedirs(plot_folder)
-    
-    #save plot
-    plt.savefig(plot_path)
-
-    #calculate the relative path
-    current_directory = os.getcwd()
-    relative_plot_path = os.path.relpath(plot_path, current_directory)
 
-    #display message and close plot
-    print(f'\nPlot is saved to {relative_plot_path}.\n')
+    if compact:
+        aligned_data = frame_schema.compact_aligned_frame(aligned_data)
+    return aligned_data
 
 def plot_sentiment_distribution(aligned_data, ticker,plot_folder):
     """
@@ -128,25 +121,13 @@ def plot_sentiment_distribution(aligned_data, ticker,plot_folder):
 
     sentiment_percentages = aligned_data['Sentiment_Category'].value_counts(normalize=True).sort_index() * 100
 
-    plt.figure(figsize=(8, 5))
-    sns.barplot(x=sentiment_percentages.index, y=sentiment_percentages.values,
-                hue=sentiment_percentages.index, palette='viridis', legend=False)
-    plt.title(f'{ticker} - Distribution of Publisher Sentiment Categories')
-    plt.xlabel('Sentiment Category')
-    plt.ylabel("Percentage of Publishers' Sentiment")
-    plt.grid()
-
     plot_name = f'{ticker} - Distribution of Publisher Sentiment Categories.png'
-    plot_path = os.path.join(plot_folder, plot_name)
-
-    #save plot
-    save_plot(plot_folder, plot_name, plot_path)
-
-    #show plot
-    plt.show()
-
-    #close plot to free up memory
-    plt.close()
+    plot_renderer.draw(plot_renderer.make_spec(
+        plot_folder, plot_name,
+        [{'kind': 'barplot', 'x': sentiment_percentages.index, 'y': sentiment_percentages.values,
+          'hue': sentiment_percentages.index, 'palette': 'viridis', 'legend': False}],
+        figsize=(8, 5), title=f'{ticker} - Distribution of Publisher Sentiment Categories',
+        xlabel='Sentiment Category', ylabel="Percentage of Publishers' Sentiment", grid=True))
 
 def plot_daily_return_and_sentiment(aligned_data, ticker,plot_folder):
     """
@@ -160,34 +141,19 @@ def plot_daily_return_and_sentiment(aligned_data, ticker,plot_folder):
     if aligned_data is None:
         return
 
-    fig, ax1 = plt.subplots(figsize=(12, 6))
-
-    # Plot Daily Returns
-    ax1.plot(aligned_data['Date'], aligned_data['Daily_Return'], color='black', label='Daily Return')
-    ax1.set_xlabel('Date')
-    ax1.set_ylabel('Daily Return', color='black')
-    ax1.tick_params(axis='y', labelcolor='black')
-
-    # Create a second y-axis for Sentiment
-    ax2 = ax1.twinx()
-    ax2.plot(aligned_data['Date'], aligned_data['Sentiment'], color='red', label='Sentiment')
-    ax2.set_ylabel('Sentiment', color='red')
-    ax2.tick_params(axis='y', labelcolor='red')
-
-    plt.title(f'{ticker} - Daily Stock Returns and Sentiment Over Time')
-    fig.tight_layout()
+    #long histories are reduced to a shape-preserving sample of points
+    return_dates, daily_returns = decimation.decimate_xy(aligned_data['Date'], aligned_data['Daily_Return'])
+    sentiment_dates, sentiment = decimation.decimate_xy(aligned_data['Date'], aligned_data['Sentiment'])
 
+    #daily returns on the left y-axis, sentiment on a second y-axis
     plot_name = f'{ticker} - Daily Stock Returns and Sentiment Over Time.png'
-    plot_path = os.path.join(plot_folder, plot_name)
-
-    #save plot
-    save_plot(plot_folder, plot_name, plot_path)
-
-    #show plot
-    plt.show()
-
-    #close plot to free up memory
-    plt.close()
+    plot_renderer.draw(plot_renderer.make_spec(
+        plot_folder, plot_name,
+        [{'kind': 'line', 'x': return_dates, 'y': daily_returns, 'color': 'black',
+          'label': 'Daily Return', 'xlabel': 'Date', 'ylabel': 'Daily Return'},
+         {'kind': 'line', 'x': sentiment_dates, 'y': sentiment, 'color': 'red',
+          'label': 'Sentiment', 'ylabel': 'Sentiment', 'twin': True}],
+        figsize=(12, 6), title=f'{ticker} - Daily Stock Returns and Sentiment Over Time', tight_layout=True))
 
 def plot_sentiment_vs_daily_return(aligned_data, ticker,plot_folder):
     """
@@ -201,23 +167,13 @@ def plot_sentiment_vs_daily_return(aligned_data, ticker,plot_folder):
     if aligned_data is None:
         return
 
-    plt.figure(figsize=(8, 6))
-    sns.scatterplot(data=aligned_data, x='Sentiment', y='Daily_Return')
-    plt.title(f'{ticker} - Scatter Plot of Sentiment vs. Daily Return')
-    plt.xlabel('Sentiment Score')
-    plt.ylabel('Daily Return')
-    
     plot_name = f'{ticker} - Scatter Plot of Sentiment vs. Daily Return.png'
-    plot_path = os.path.join(plot_folder, plot_name)
-
-    #save plot
-    save_plot(plot_folder, plot_name, plot_path)
-
-    #show plot
-    plt.show()
-
-    #close plot to free up memory
-    plt.close()
+    plot_renderer.draw(plot_renderer.make_spec(
+        plot_folder, plot_name,
+        [{'kind': 'scatterplot', 'data': aligned_data[['Sentiment', 'Daily_Return']], 'x': 'Sentiment',
+          'y': 'Daily_Return'}],
+        figsize=(8, 6), title=f'{ticker} - Scatter Plot of Sentiment vs. Daily Return',
+        xlabel='Sentiment Score', ylabel='Daily Return'))
     
 def plot_sentiment_vs_volatility(aligned_data, ticker,plot_folder):
     """
@@ -233,25 +189,17 @@ def plot_sentiment_vs_volatility(aligned_data, ticker,plot_folder):
              print(f"Volatility column not found or data is None for {ticker}. Skipping Volatility analysis.")
         return
 
-    plt.figure(figsize=(8, 6))
-    sns.scatterplot(data=aligned_data, x='Sentiment', y='Volatility')
-    plt.title(f'{ticker} - Scatter Plot of Sentiment vs. Volatility (Rolling Std Dev)')
-    plt.xlabel('Aggregated Sentiment Score')
-    plt.ylabel('Volatility (Rolling Std Dev)')
-
     plot_name = f'{ticker} - Scatter Plot of Sentiment vs. Volatility (Rolling Std Dev).png'
-    plot_path = os.path.join(plot_folder, plot_name)
-
-    #save plot
-    save_plot(plot_folder, plot_name, plot_path)
-
-    #show plot
-    plt.show()
-
-    #close plot to free up memory
-    plt.close()
+    plot_renderer.draw(plot_renderer.make_spec(
+        plot_folder, plot_name,
+        [{'kind': 'scatterplot', 'data': aligned_data[['Sentiment', 'Volatility']], 'x': 'Sentiment',
+          'y': 'Volatility'}],
+        figsize=(8, 6), title=f'{ticker} - Scatter Plot of Sentiment vs. Volatility (Rolling Std Dev)',
+        xlabel='Aggregated Sentiment Score', ylabel='Volatility (Rolling Std Dev)'))
 
-def analyse_and_plot(ticker, hist_data, senti_data, start_date=None, end_date=None, plot_folder=None):
+@instrumentation.traced('analyse_and_plot')
+def analyse_and_plot(ticker, hist_data, senti_data, start_date=None, end_date=None, plot_folder=None,
+                     cutoff=session_alignment.MARKET_CLOSE):
     """
     Performs the full analysis and plotting for a given ticker
     using specified data DataFrames.
@@ -265,36 +213,40 @@ def analyse_and_plot(ticker, hist_data, senti_data, start_date=None, end_date=No
         end_date (str, optional): The end date for filtering historical data (YYYY-MM-DD).
                                   Defaults to None.
         plot_folder (str): The folder to save the plot.
+        cutoff (str, optional): The market close after which news counts towards the next
+                                session. Defaults to '16:00'.
     """
     print(f"Analysing data for {ticker}...")
     hist_data, senti_data = load_stock_data(hist_data, senti_data)
 
-    aligned_data = process_and_align_data(hist_data, senti_data, start_date, end_date)
+    with instrumentation.span('align', rows=len(hist_data) if hist_data is not None else 0) as stage:
+        aligned_data = process_and_align_data(hist_data, senti_data, start_date, end_date, cutoff=cutoff)
+        stage.set(news_rows=len(senti_data) if senti_data is not None else 0,
+                  aligned_rows=len(aligned_data) if aligned_data is not None else 0)
 
     if aligned_data is not None:
-        plot_sentiment_distribution(aligned_data, ticker, plot_folder)
-        plot_daily_return_and_sentiment(aligned_data, ticker, plot_folder)
-        plot_sentiment_vs_daily_return(aligned_data, ticker, plot_folder)
-        plot_sentiment_vs_volatility(aligned_data, ticker, plot_folder)
-
-        # Correlation Analysis
-        correlation = aligned_data['Sentiment'].corr(aligned_data['Daily_Return'])
-        print(f"{ticker} - Correlation between news sentiment and daily stock returns: {correlation}")
-
-        correlation_matrix = aligned_data[['Sentiment', 'Daily_Return', 'Adj Close']].corr()
-
-        plt.figure(figsize=(6, 4))
-        sns.heatmap(correlation_matrix, annot=True, fmt=".2f")
-        plt.title(f'{ticker} - Correlation Heatmap of Sentiment and Daily Return')
-        
-        plot_name = f'{ticker} - Correlation Heatmap of Sentiment and Daily Return.png'
-        plot_path = os.path.join(plot_folder, plot_name)
-
-        #save plot
-        save_plot(plot_folder, plot_name, plot_path)
-
-        #show plot
-        plt.show()
-
-        #close plot to free up memory
-        plt.close()
+        with instrumentation.span('plots', rows=len(aligned_data)):
+            plot_sentiment_distribution(aligned_data, ticker, plot_folder)
+            plot_daily_return_and_sentiment(aligned_data, ticker, plot_folder)
+            plot_sentiment_vs_daily_return(aligned_data, ticker, plot_folder)
+            plot_sentiment_vs_volatility(aligned_data, ticker, plot_folder)
+
+        with instrumentation.span('correlation', rows=len(aligned_data)):
+            # Correlation Analysis
+            correlation = aligned_data['Sentiment'].corr(aligned_data['Daily_Return'])
+            print(f"{ticker} - Correlation between news sentiment and daily stock returns: {correlation}")
+
+            #lead/lag correlations: sentiment on a session against the return k sessions later
+            #the aligned data holds this ticker only, so its rows are labelled with it
+            lagged = correlation_engine.sentiment_return_correlations(aligned_data, windows=(), ticker_column=None)
+            lagged['Ticker'] = ticker
+            print(f"{ticker} - Correlation between news sentiment and daily stock returns k sessions later:")
+            print(lagged.set_index('Lag')[['Correlation', 'Observations']])
+
+            correlation_matrix = aligned_data[['Sentiment', 'Daily_Return', 'Adj Close']].corr()
+
+        with instrumentation.span('heatmap_plot'):
+            plot_name = f'{ticker} - Correlation Heatmap of Sentiment and Daily Return.png'
+            plot_renderer.draw(plot_renderer.make_spec(
+                plot_folder, plot_name, [{'kind': 'heatmap', 'data': correlation_matrix, 'annot': True, 'fmt': '.2f'}],
+                figsize=(6, 4), title=f'{ticker} - Correlation Heatmap of Sentiment and Daily Return'))
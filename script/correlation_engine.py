@@ -0,0 +1,222 @@
+#important python libraries
+import numpy as np
+import pandas as pd
+
+#rolling windows, in sessions, of the sentiment-return correlation
+ROLLING_WINDOWS = (20, 60)
+
+#lags, in sessions: sentiment at t against the return at t + lag
+LAGS = (0, 1, 2, 3, 5)
+
+#columns of the tidy result frames
+RESULT_COLUMNS = ['Ticker', 'Date', 'Window', 'Lag', 'Correlation', 'Observations']
+
+#a variance counts as zero below this share of the sum of squares it is computed from
+VARIANCE_RTOL = 1e-10
+
+def pivot_panel(data, column, ticker_column='Ticker', date_column='Date'):
+    """
+    Turns long aligned data into a (dates x tickers) panel of one column.
+
+    Args:
+        data (pandas.DataFrame): Aligned data, e.g. from `correlation_analyser.process_and_align_data`
+                             for one ticker or concatenated for many.
+        column (str): The column to pivot.
+        ticker_column (str, optional): The ticker column; None treats the frame as one ticker.
+        date_column (str): The date column.
+
+    Returns:
+        pd.DataFrame: The panel, with sorted dates as index and one column per ticker.
+    """
+    if ticker_column is None or ticker_column not in data.columns:
+        panel = data.set_index(date_column)[[column]].rename(columns={column: None})
+    else:
+        panel = data.pivot_table(index=date_column, columns=ticker_column, values=column, aggfunc='mean',
+                                 observed=True, dropna=False)
+    return panel.sort_index()
+
+def _shift(values, lag):
+    """
+    Shifts a (tickers x time) array so that column t holds time t + lag, padding with NaN.
+    """
+    shifted = np.full_like(values, np.nan)
+    n_times = values.shape[1]
+    if lag >= 0:
+        shifted[:, :n_times - lag] = values[:, lag:]
+    else:
+        shifted[:, -lag:] = values[:, :n_times + lag]
+    return shifted
+
+def _centered_pairs(x, y):
+    """
+    Returns the pairwise-complete mask and both arrays centred on their mean, zero where a pair is missing.
+
+    Centring keeps the running sums small, so that the differences of cumulative sums stay accurate.
+    """
+    mask = np.isfinite(x) & np.isfinite(y)
+    counts = mask.sum(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = np.where(mask, x, 0.0).sum(axis=1, keepdims=True) / counts
+        y_mean = np.where(mask, y, 0.0).sum(axis=1, keepdims=True) / counts
+    x = np.where(mask, x - x_mean, 0.0)
+    y = np.where(mask, y - y_mean, 0.0)
+    return mask.astype(np.float64), x, y
+
+def _correlation_from_sums(n, sx, sy, sxx, syy, sxy, min_periods):
+    """
+    Pearson correlation from the count, sums, sums of squares and sum of products of the pairs.
+
+    A variance within `VARIANCE_RTOL` of its sum of squares is rounding error of a
+    constant series, so its correlation is NaN rather than a tiny spurious value.
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covariance = sxy - sx * sy / n
+        x_variance = sxx - sx * sx / n
+        y_variance = syy - sy * sy / n
+        correlation = covariance / np.sqrt(x_variance * y_variance)
+    valid = (n >= max(min_periods, 2)) & (x_variance > VARIANCE_RTOL * sxx) & (y_variance > VARIANCE_RTOL * syy)
+    return np.where(valid, np.clip(correlation, -1.0, 1.0), np.nan)
+
+def rolling_correlation(x, y, windows=ROLLING_WINDOWS, min_periods=None):
+    """
+    Rolling Pearson correlations of two (tickers x time) arrays for several windows.
+
+    The running sums (pair count, sums, squares and products) are accumulated once with cumulative sums and every window
+    is read off them as a difference, so the cost does not grow with the window length.
+    Pairs with a missing value are skipped, as in `pd.Series.rolling(...).corr`.
+
+    Args:
+        x (numpy.ndarray): The first series, one row per ticker.
+        y (numpy.ndarray): The second series, aligned with `x`.
+        windows (iterable): The window lengths, in rows.
+        min_periods (int, optional): The least number of pairs a window needs; defaults to its length.
+
+    Returns:
+        dict: Maps each window to a tuple of (tickers x time) arrays: the correlation at
+              the end of each window (NaN where undefined) and its number of pairs.
+    """
+    mask, x, y = _centered_pairs(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+    n_tickers, n_times = x.shape
+
+    #cumulative sums with a zero column first, stacked as count, x, y, x*x, y*y, x*y
+    cumulative = np.zeros((6, n_tickers, n_times + 1))
+    for i, values in enumerate((mask, x, y, x * x, y * y, x * y)):
+        np.cumsum(values, axis=1, out=cumulative[i, :, 1:])
+
+    results = {}
+    for window in windows:
+        if window < 2:
+            raise ValueError(f'Windows must span at least 2 rows, got {window}.')
+        #sums over the last `window` rows, shorter at the start of the series
+        starts = np.maximum(np.arange(1, n_times + 1) - window, 0)
+        sums = cumulative[:, :, 1:] - cumulative[:, :, starts]
+        correlation = _correlation_from_sums(*sums, min_periods=window if min_periods is None else min_periods)
+        results[window] = (correlation, sums[0].astype(np.int64))
+    return results
+
+def lagged_correlation(x, y, lags=LAGS, min_periods=2):
+    """
+    Full-sample Pearson correlations of x at t against y at t + lag, for several lags.
+
+    Args:
+        x (numpy.ndarray): The first series, one row per ticker.
+        y (numpy.ndarray): The second series, aligned with `x`.
+        lags (iterable): The lags, in rows; negative lags put y before x.
+        min_periods (int): The least number of pairs a correlation needs.
+
+    Returns:
+        dict: Maps each lag to a tuple of per-ticker arrays: the correlation and its number of pairs.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    results = {}
+    for lag in lags:
+        mask, xc, yc = _centered_pairs(x, _shift(y, lag))
+        sums = [values.sum(axis=1) for values in (mask, xc, yc, xc * xc, yc * yc, xc * yc)]
+        results[lag] = (_correlation_from_sums(*sums, min_periods=min_periods), sums[0].astype(np.int64))
+    return results
+
+def sentiment_return_correlations(data, windows=ROLLING_WINDOWS, lags=LAGS, min_periods=None, x_column='Sentiment',
+                                  y_column='Daily_Return', ticker_column='Ticker', date_column='Date'):
+    """
+    Rolling and lead/lag correlations of sentiment and returns for all tickers, as a tidy frame.
+
+    For each lag the series are shifted once and all tickers and windows are computed
+    together (see `rolling_correlation`). Rows whose window has too few pairs are left out.
+    Window 0 holds the full-sample correlation of each ticker and lag, dated at its
+    last session.
+
+    Args:
+        data (pandas.DataFrame): Aligned data with ticker, date, sentiment and return columns.
+        windows (iterable): The rolling window lengths, in sessions.
+        lags (iterable): The lags, in sessions: sentiment at t against the return at t + lag.
+        min_periods (int, optional): The least number of pairs a window needs; defaults to its length.
+        x_column (str): The leading column, usually the sentiment.
+        y_column (str): The lagged column, usually the return.
+        ticker_column (str, optional): The ticker column; None treats the frame as one ticker.
+        date_column (str): The date column.
+
+    Returns:
+        pd.DataFrame: One row per ticker, date, window and lag, with the columns `RESULT_COLUMNS`.
+    """
+    x_panel = pivot_panel(data, x_column, ticker_column, date_column)
+    y_panel = pivot_panel(data, y_column, ticker_column, date_column).reindex(index=x_panel.index,
+                                                                            columns=x_panel.columns)
+    tickers, dates = x_panel.columns.to_numpy(), x_panel.index
+    x = x_panel.to_numpy(dtype=np.float64).T
+    y = y_panel.to_numpy(dtype=np.float64).T
+
+    frames = []
+    for lag in lags:
+        y_lagged = _shift(y, lag)
+        for window, (correlation, observations) in rolling_correlation(x, y_lagged, windows, min_periods).items():
+            ticker_index, time_index = np.nonzero(np.isfinite(correlation))
+            frames.append(pd.DataFrame({'Ticker': tickers[ticker_index], 'Date': dates[time_index],
+                                        'Window': window, 'Lag': lag,
+                                        'Correlation': correlation[ticker_index, time_index],
+                                        'Observations': observations[ticker_index, time_index]}))
+
+    #the full-sample correlations, dated at the last session
+    for lag, (correlation, observations) in lagged_correlation(x, y, lags).items():
+        ticker_index = np.flatnonzero(np.isfinite(correlation))
+        frames.append(pd.DataFrame({'Ticker': tickers[ticker_index], 'Date': dates[-1] if len(dates) else pd.NaT,
+                                    'Window': 0, 'Lag': lag, 'Correlation': correlation[ticker_index],
+                                    'Observations': observations[ticker_index]}))
+
+    if not frames:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    return pd.concat(frames, ignore_index=True)[RESULT_COLUMNS]
+
+def cross_ticker_correlation(data, column='Daily_Return', min_periods=2, ticker_column='Ticker', date_column='Date'):
+    """
+    Pairwise-complete correlation matrix of one column across tickers.
+
+    All pairs are computed at once with matrix products of the masked data, which
+    matches `DataFrame.corr(min_periods=...)` on the (dates x tickers) panel.
+
+    Args:
+        data (pandas.DataFrame): Aligned data with ticker, date and `column` columns.
+        column (str): The column to correlate, e.g. 'Daily_Return' or 'Sentiment'.
+        min_periods (int): The least number of common dates a pair needs.
+        ticker_column (str): The ticker column.
+        date_column (str): The date column.
+
+    Returns:
+        pd.DataFrame: The (tickers x tickers) correlation matrix.
+    """
+    panel = pivot_panel(data, column, ticker_column, date_column)
+    values = panel.to_numpy(dtype=np.float64)
+    mask = np.isfinite(values).astype(np.float64)
+
+    #centre each ticker to keep the sums small, then zero the missing values
+    with np.errstate(invalid='ignore'):
+        values = values - np.nanmean(np.where(mask > 0, values, np.nan), axis=0, keepdims=True)
+    values = np.where(mask > 0, values, 0.0)
+
+    #n[i, j] counts the dates both tickers have; s[i, j] sums ticker i over those dates
+    n = mask.T @ mask
+    s = values.T @ mask
+    ss = (values * values).T @ mask
+    sp = values.T @ values
+    correlation = _correlation_from_sums(n, s, s.T, ss, ss.T, sp, min_periods=min_periods)
+    return pd.DataFrame(correlation, index=panel.columns, columns=panel.columns)
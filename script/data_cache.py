@@ -0,0 +1,206 @@
+#important python libraries
+import pandas as pd
+import os
+import glob
+import json
+import hashlib
+
+from . import news_data_loader
+
+#default location of the on-disk cache, relative to the working directory
+CACHE_FOLDER = os.path.join('data', 'cache')
+
+#bump when the cached frame layout changes so that old entries are rebuilt
+CACHE_VERSION = 1
+
+def file_fingerprint(file_path, hash_contents=False):
+    """
+    Builds a fingerprint of a source file from its path, modification time and size.
+
+    Args:
+        file_path (str): The path to the source file.
+        hash_contents (bool): Whether to also include a SHA-256 hash of the file contents.
+                              Slower, but catches edits that keep the mtime and size.
+
+    Returns:
+        dict: The fingerprint of the file.
+    """
+    stat = os.stat(file_path)
+    fingerprint = {'path': os.path.abspath(file_path),
+                   'mtime_ns': stat.st_mtime_ns,
+                   'size': stat.st_size}
+
+    if hash_contents:
+        sha = hashlib.sha256()
+        with open(file_path, 'rb') as source:
+            for block in iter(lambda: source.read(1 << 20), b''):
+                sha.update(block)
+        fingerprint['sha256'] = sha.hexdigest()
+    return fingerprint
+
+def cache_path(file_path, loader_name, loader_args=None, cache_folder=CACHE_FOLDER, hash_contents=False):
+    """
+    Returns the cache file path for a source file, a loader and its arguments.
+
+    The file name starts with a prefix derived from the source path, loader and its
+    arguments, so that entries for older versions of the same source can be found and
+    removed without touching the entries for other arguments.
+
+    Args:
+        file_path (str): The path to the source file.
+        loader_name (str): The name of the loader that produces the cached frame.
+        loader_args (dict, optional): The loader arguments that affect the result.
+        cache_folder (str): The folder holding the cache files.
+        hash_contents (bool): Whether the fingerprint includes a content hash.
+
+    Returns:
+        str: The path of the Parquet cache file.
+    """
+    fingerprint = file_fingerprint(file_path, hash_contents=hash_contents)
+    key = json.dumps({'version': CACHE_VERSION, 'loader': loader_name,
+                      'args': loader_args or {}, 'source': fingerprint},
+                     sort_keys=True, default=str)
+
+    prefix = _cache_prefix(file_path, loader_name, loader_args)
+    key_hash = hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_folder, f'{prefix}_{key_hash}.parquet')
+
+def _cache_prefix(file_path, loader_name, loader_args=None):
+    """
+    Returns the cache file name prefix shared by all entries of one source, loader and loader arguments.
+    """
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    args = json.dumps(loader_args or {}, sort_keys=True, default=str)
+    source_hash = hashlib.sha256(f'{os.path.abspath(file_path)}|{loader_name}|{args}'.encode('utf-8')).hexdigest()[:8]
+    return f'{stem}_{loader_name}_{source_hash}'
+
+def load_with_cache(file_path, loader, loader_name, loader_args=None,
+                    cache_folder=CACHE_FOLDER, hash_contents=False, refresh=False):
+    """
+    Loads a DataFrame through a columnar Parquet cache.
+
+    On a hit the typed frame is read back from Parquet. On a miss (or when the source
+    file changed) the loader is called, its result is written to the cache and any
+    stale entries for the same source, loader and arguments are removed.
+
+    Args:
+        file_path (str): The path to the source file.
+        loader (callable): Called as `loader(file_path, **loader_args)`; returns a DataFrame or None.
+        loader_name (str): The name of the loader, part of the cache key.
+        loader_args (dict, optional): Keyword arguments passed to the loader, part of the cache key.
+        cache_folder (str): The folder holding the cache files.
+        hash_contents (bool): Whether to include a content hash in the cache key.
+        refresh (bool): Whether to ignore an existing entry and rebuild it.
+
+    Returns:
+        pandas.DataFrame: The loaded DataFrame, or None if the loader failed.
+    """
+    loader_args = loader_args or {}
+    try:
+        path = cache_path(file_path, loader_name, loader_args, cache_folder, hash_contents)
+    except FileNotFoundError:
+        print(f"Error: The file path '{file_path}' was not found.")
+        return None
+
+    relative_path = os.path.relpath(path, os.getcwd())
+    if os.path.exists(path) and not refresh:
+        try:
+            df = pd.read_parquet(path)
+            print(f'DataFrame loaded from cache: {relative_path}')
+            return df
+        except Exception as e:
+            print(f'Cache entry could not be read, rebuilding it: {e}')
+
+    df = loader(file_path, **loader_args)
+    if df is None:
+        return None
+
+    if not os.path.exists(cache_folder):
+        os.makedirs(cache_folder)
+
+    #remove entries written for older versions of the source file with the same arguments
+    prefix = _cache_prefix(file_path, loader_name, loader_args)
+    for stale_path in glob.glob(os.path.join(cache_folder, f'{prefix}_*.parquet')):
+        if stale_path != path:
+            os.remove(stale_path)
+
+    #write to a temporary file first so an interrupted run never leaves a partial entry
+    tmp_path = f'{path}.tmp'
+    df.to_parquet(tmp_path, index=True)
+    os.replace(tmp_path, path)
+    print(f'DataFrame cached to: {relative_path}')
+    return df
+
+def load_and_filter_data_cached(file_path, tickers, chunksize=None, columns=None,
+                                cache_folder=CACHE_FOLDER, hash_contents=False, refresh=False):
+    """
+    Cached version of `news_data_loader.load_and_filter_data`.
+
+    Args:
+        file_path (str): The path to the raw data CSV file.
+        tickers (list): A list of stock ticker symbols.
+        chunksize (int, optional): Streams the file in chunks of this many rows on a miss.
+        columns (list, optional): Raw column names to load in streaming mode; ignored otherwise.
+        cache_folder (str): The folder holding the cache files.
+        hash_contents (bool): Whether to include a content hash in the cache key.
+        refresh (bool): Whether to ignore an existing entry and rebuild it.
+
+    Returns:
+        pandas.DataFrame: The filtered and processed DataFrame.
+    """
+    #the streamed loader returns categorical 'Stock'/'Publisher' and honours `columns`, the
+    #in-memory one does neither, so the mode is part of the key; the chunk size itself only
+    #affects memory use and is left out
+    streamed = bool(chunksize)
+    loader_args = {'tickers': sorted(tickers), 'streamed': streamed,
+                   'columns': sorted(columns) if streamed and columns else None}
+
+    def loader(path, tickers, streamed, columns):
+        return news_data_loader.load_and_filter_data(path, tickers, chunksize=chunksize, columns=columns)
+
+    return load_with_cache(file_path, loader, 'news', loader_args,
+                           cache_folder=cache_folder, hash_contents=hash_contents, refresh=refresh)
+
+def _read_price_csv(file_path, date_column='Date'):
+    """
+    Reads a price CSV file and parses its date column.
+    """
+    df = pd.read_csv(file_path)
+    if date_column in df.columns:
+        df[date_column] = pd.to_datetime(df[date_column])
+    return df
+
+def read_price_data_cached(file_path, date_column='Date', cache_folder=CACHE_FOLDER,
+                           hash_contents=False, refresh=False):
+    """
+    Reads a historical price CSV file through the cache, with the date column parsed.
+
+    The result can be passed straight to `StockAnalyser`.
+
+    Args:
+        file_path (str): The path to the price CSV file.
+        date_column (str): The name of the date column to parse.
+        cache_folder (str): The folder holding the cache files.
+        hash_contents (bool): Whether to include a content hash in the cache key.
+        refresh (bool): Whether to ignore an existing entry and rebuild it.
+
+    Returns:
+        pandas.DataFrame: The price DataFrame.
+    """
+    return load_with_cache(file_path, _read_price_csv, 'price', {'date_column': date_column},
+                           cache_folder=cache_folder, hash_contents=hash_contents, refresh=refresh)
+
+def clear_cache(cache_folder=CACHE_FOLDER):
+    """
+    Removes all cache files from the cache folder.
+
+    Args:
+        cache_folder (str): The folder holding the cache files.
+
+    Returns:
+        int: The number of removed files.
+    """
+    paths = glob.glob(os.path.join(cache_folder, '*.parquet'))
+    for path in paths:
+        os.remove(path)
+    return len(paths)
@@ -0,0 +1,213 @@
+#important python libraries
+import math
+
+import numpy as np
+import pandas as pd
+
+#points kept per trace in interactive Plotly charts
+PLOT_MAX_POINTS = 5_000
+
+#points kept per line in saved matplotlib charts, about twice the pixel width of a 12 inch figure
+LINE_MAX_POINTS = 2_000
+
+#min/max candidates per output point handed to LTTB
+MINMAX_RATIO = 4
+
+#line traces longer than this are drawn with WebGL (Scattergl) instead of SVG
+WEBGL_MIN_POINTS = 1_000
+
+#how OHLC columns are combined when candles are merged; other columns keep their last value
+OHLC_AGGREGATES = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Adj Close': 'last',
+                   'Volume': 'sum'}
+
+def _numeric(x):
+    """
+    Returns x-values as a float array, datetimes as nanoseconds since the epoch.
+    """
+    index = pd.Index(x)
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(np.float64)
+    return index.to_numpy(dtype=np.float64)
+
+def _take(values, positions):
+    """
+    Selects rows by position, keeping pandas objects (and their index) intact.
+    """
+    if isinstance(values, (pd.Series, pd.DataFrame)):
+        return values.iloc[positions]
+    return values[positions]
+
+def minmax_indices(y, n_buckets):
+    """
+    Returns the positions of the minimum and maximum of each of `n_buckets` equal-sized buckets.
+
+    Args:
+        y (numpy.ndarray): The finite values.
+        n_buckets (int): The number of buckets.
+
+    Returns:
+        numpy.ndarray: The sorted, unique positions.
+    """
+    n = len(y)
+    size = math.ceil(n / n_buckets)
+    n_buckets = math.ceil(n / size)
+
+    #pad the last bucket so that the buckets form a matrix; padding never wins a min or max
+    lows = np.full(n_buckets * size, np.inf)
+    highs = np.full(n_buckets * size, -np.inf)
+    lows[:n] = y
+    highs[:n] = y
+
+    offsets = np.arange(n_buckets) * size
+    argmins = lows.reshape(n_buckets, size).argmin(axis=1) + offsets
+    argmaxs = highs.reshape(n_buckets, size).argmax(axis=1) + offsets
+    return np.unique(np.concatenate([argmins, argmaxs]))
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: returns the positions of `n_out` points that keep the
+    visual shape of a line.
+
+    The first and last points are always kept. Each bucket in between keeps the point
+    forming the largest triangle with the previous kept point and the mean of the next bucket.
+
+    Args:
+        x (numpy.ndarray): The increasing x-values as floats.
+        y (numpy.ndarray): The finite y-values.
+        n_out (int): The number of points to keep, at least 3.
+
+    Returns:
+        numpy.ndarray: The sorted positions of the kept points.
+    """
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+
+    #buckets over the inner points; bounds[i]:bounds[i + 1] is bucket i
+    bounds = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(bounds)
+    x_means = np.add.reduceat(x[:-1], bounds[:-1]) / counts
+    y_means = np.add.reduceat(y[:-1], bounds[:-1]) / counts
+
+    #the bucket after the last one is the last point
+    x_next = np.append(x_means[1:], x[-1])
+    y_next = np.append(y_means[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = bounds[bucket], bounds[bucket + 1]
+        x_a, y_a = x[previous], y[previous]
+        areas = np.abs((x_a - x_next[bucket]) * (y[start:stop] - y_a)
+                       - (x_a - x[start:stop]) * (y_next[bucket] - y_a))
+        previous = start + int(areas.argmax())
+        selected[bucket + 1] = previous
+    return selected
+
+def minmax_lttb_indices(x, y, n_out, minmax_ratio=MINMAX_RATIO):
+    """
+    MinMaxLTTB: preselects the minimum and maximum of small buckets, then runs LTTB on them.
+
+    The preselection keeps every spike while making LTTB cost proportional to the
+    output size rather than to the length of the series.
+
+    Args:
+        x (numpy.ndarray): The increasing x-values as floats.
+        y (numpy.ndarray): The finite y-values.
+        n_out (int): The number of points to keep, at least 3.
+        minmax_ratio (int): The number of min/max candidates per output point.
+
+    Returns:
+        numpy.ndarray: The sorted positions of the kept points.
+    """
+    n = len(y)
+    if n_out < 3:
+        raise ValueError('At least 3 points must be kept.')
+    if n <= n_out:
+        return np.arange(n)
+
+    if n > n_out * minmax_ratio:
+        inner = minmax_indices(y[1:-1], n_out * minmax_ratio // 2) + 1
+        candidates = np.concatenate([[0], inner, [n - 1]])
+    else:
+        candidates = np.arange(n)
+    return candidates[lttb_indices(x[candidates], y[candidates], n_out)]
+
+def decimate_xy(x, y, max_points=LINE_MAX_POINTS):
+    """
+    Downsamples a line to at most `max_points` points with MinMaxLTTB.
+
+    Lines within the budget are returned unchanged. Longer lines lose their missing
+    values, as they would not be drawn anyway.
+
+    Args:
+        x (array-like): The x-values (numbers or datetimes), in increasing order.
+        y (array-like): The y-values.
+        max_points (int, optional): The point budget; None keeps every point.
+
+    Returns:
+        tuple: The kept x-values and y-values, of the input types.
+    """
+    if max_points is None or len(y) <= max_points:
+        return x, y
+    if len(x) != len(y):
+        raise ValueError('x and y must have the same length.')
+
+    y_values = np.asarray(y, dtype=np.float64)
+    finite = np.flatnonzero(np.isfinite(y_values))
+    kept = finite[minmax_lttb_indices(_numeric(x)[finite], y_values[finite], max_points)]
+    return _take(x, kept), _take(y, kept)
+
+def decimate_series(series, max_points=LINE_MAX_POINTS):
+    """
+    Downsamples a Series plotted against its index (see `decimate_xy`).
+
+    Args:
+        series (pandas.Series): The series, with an increasing index.
+        max_points (int, optional): The point budget; None keeps every point.
+
+    Returns:
+        pandas.Series: The kept points, with their index.
+    """
+    return decimate_xy(series.index, series, max_points)[1]
+
+def resample_ohlc(data, max_points=PLOT_MAX_POINTS):
+    """
+    Merges consecutive candles so that at most `max_points` remain.
+
+    Each merged candle spans the same number of rows (trading sessions) and is stamped
+    with the time of its first row: the open is the first open, the high the highest
+    high, the low the lowest low, the close the last close and the volume the sum.
+    Other columns keep their last value.
+
+    Args:
+        data (pandas.DataFrame): The price data, in time order.
+        max_points (int, optional): The candle budget; None keeps every candle.
+
+    Returns:
+        pandas.DataFrame: The merged candles, with the input columns.
+    """
+    n = len(data)
+    if max_points is None or n <= max_points:
+        return data
+
+    size = math.ceil(n / max_points)
+    starts = np.arange(0, n, size)
+    lasts = np.minimum(starts + size, n) - 1
+
+    columns = {}
+    for column in data.columns:
+        values = data[column].to_numpy()
+        how = OHLC_AGGREGATES.get(column, 'last')
+        if how == 'first':
+            columns[column] = values[starts]
+        elif how == 'max':
+            columns[column] = np.fmax.reduceat(values, starts)
+        elif how == 'min':
+            columns[column] = np.fmin.reduceat(values, starts)
+        elif how == 'sum':
+            columns[column] = np.add.reduceat(values, starts)
+        else:
+            columns[column] = values[lasts]
+    return pd.DataFrame(columns, index=data.index[starts])
@@ -0,0 +1,182 @@
+#important python libraries
+import numpy as np
+import pandas as pd
+
+#days of the week in calendar order, the categories of 'Publication_Day'
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+#sentiment bins used by `correlation_analyser.process_and_align_data`
+SENTIMENT_CATEGORIES = ['Negative', 'Neutral', 'Positive']
+
+#compact dtype per column; 'int' columns are downcast only as far as their values allow
+PRICE_SCHEMA = {
+    'Open': 'float64',
+    'High': 'float64',
+    'Low': 'float64',
+    'Close': 'float64',
+    'Adj Close': 'float64',
+    'Volume': 'int',
+    'Dividends': 'float32',
+    'Stock Splits': 'float32',
+    #technical indicators, see `indicator_engine.INDICATOR_COLUMNS`
+    'SMA_15': 'float32',
+    'SMA_60': 'float32',
+    'RSI_15': 'float32',
+    'RSI_60': 'float32',
+    'MACD': 'float32',
+    'MACD_Signal': 'float32',
+    'MACD_Diff': 'float32',
+    'Volatility': 'float32',
+}
+
+NEWS_SCHEMA = {
+    'Publisher': 'category',
+    'Stock': 'category',
+    'Domain': 'category',
+    'Publication_Day': pd.CategoricalDtype(DAY_ORDER, ordered=True),
+    'Sentiment': 'float32',
+    'Headline_Length': 'int',
+}
+
+ALIGNED_SCHEMA = {
+    **PRICE_SCHEMA,
+    'Sentiment': 'float32',
+    'Sentiment_Category': pd.CategoricalDtype(SENTIMENT_CATEGORIES, ordered=True),
+    'Daily_Return': 'float32',
+}
+
+#object columns are made categorical when at most this share of their values is unique
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+def downcast_integer(series):
+    """
+    Downcasts an integer column to the smallest signed type that holds its values, at least int32.
+
+    Args:
+        series (pandas.Series): The integer column.
+
+    Returns:
+        pandas.Series: The downcast column, or the input if it has missing or non-integer values.
+    """
+    if not pd.api.types.is_integer_dtype(series.dtype):
+        if not pd.api.types.is_float_dtype(series.dtype) or series.isna().any():
+            return series
+        values = series.to_numpy()
+        if not np.array_equal(values, np.round(values)):
+            return series
+    if len(series) == 0:
+        return series.astype('int32')
+
+    low, high = series.min(), series.max()
+    for dtype in ('int32', 'int64'):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return series.astype(dtype)
+    return series
+
+def compact_frame(df, schema, categorize_strings=True, inplace=False):
+    """
+    Converts the columns of a DataFrame to the compact dtypes of a schema.
+
+    Columns missing from the frame are ignored and columns outside the schema keep
+    their dtype, except repeated strings which become categorical when
+    `categorize_strings` is True. Values that do not fit a dtype are left as they are.
+
+    Args:
+        df (pandas.DataFrame): The input DataFrame.
+        schema (dict): Maps a column name to a dtype, or 'int' for a safe integer downcast.
+        categorize_strings (bool): Whether to turn other repeated-string columns into categoricals.
+        inplace (bool): Whether to convert the columns of `df` itself instead of a shallow copy.
+
+    Returns:
+        pandas.DataFrame: The DataFrame with compact dtypes.
+    """
+    if not inplace:
+        df = df.copy(deep=False)
+
+    for column in df.columns:
+        series = df[column]
+        target = schema.get(column)
+        if target == 'int':
+            df[column] = downcast_integer(series)
+        elif target is not None:
+            if isinstance(target, pd.CategoricalDtype) and isinstance(series.dtype, pd.CategoricalDtype):
+                df[column] = series.cat.set_categories(target.categories, ordered=target.ordered)
+            elif series.dtype != target:
+                df[column] = series.astype(target)
+        elif categorize_strings and series.dtype == object and len(series):
+            if series.nunique(dropna=True) <= CATEGORY_MAX_UNIQUE_RATIO * len(series):
+                df[column] = series.astype('category')
+
+    #dates are stored as datetime64, not strings
+    if 'Date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['Date']):
+        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    return df
+
+def memory_usage(df):
+    """
+    Returns the deep memory usage of a DataFrame, including its index, in bytes.
+
+    Args:
+        df (pandas.DataFrame): The input DataFrame.
+
+    Returns:
+        int: The memory usage in bytes.
+    """
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+def compact_with_report(df, schema, name='frame', categorize_strings=True):
+    """
+    Converts a DataFrame to compact dtypes and prints its memory before and after.
+
+    Args:
+        df (pandas.DataFrame): The input DataFrame.
+        schema (dict): The schema to apply, e.g. `PRICE_SCHEMA`.
+        name (str): The name of the frame in the report.
+        categorize_strings (bool): Whether to turn other repeated-string columns into categoricals.
+
+    Returns:
+        tuple: The compact DataFrame and a dict with 'before' and 'after' bytes and the 'saved' ratio.
+    """
+    before = memory_usage(df)
+    compact = compact_frame(df, schema, categorize_strings=categorize_strings)
+    after = memory_usage(compact)
+    report = {'before': before, 'after': after, 'saved': 1 - after / before if before else 0.0}
+    print(f"{name}: {before / 2**20:.1f} MiB -> {after / 2**20:.1f} MiB ({report['saved']:.0%} saved)")
+    return compact, report
+
+def compact_price_frame(df):
+    """
+    Converts a price frame (with or without indicators) to compact dtypes.
+
+    Args:
+        df (pandas.DataFrame): The price DataFrame.
+
+    Returns:
+        pandas.DataFrame: The compact DataFrame.
+    """
+    return compact_frame(df, PRICE_SCHEMA)
+
+def compact_news_frame(df):
+    """
+    Converts a news frame to compact dtypes.
+
+    Args:
+        df (pandas.DataFrame): The news DataFrame.
+
+    Returns:
+        pandas.DataFrame: The compact DataFrame.
+    """
+    return compact_frame(df, NEWS_SCHEMA)
+
+def compact_aligned_frame(df):
+    """
+    Converts a frame from `correlation_analyser.process_and_align_data` to compact dtypes.
+
+    Args:
+        df (pandas.DataFrame): The aligned DataFrame.
+
+    Returns:
+        pandas.DataFrame: The compact DataFrame.
+    """
+    return compact_frame(df, ALIGNED_SCHEMA)
@@ -0,0 +1,168 @@
+#important python libraries
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from . import artifact_manifest
+
+#output formats and their file extensions
+FORMATS = {'csv': '.csv', 'parquet': '.parquet', 'feather': '.feather'}
+
+#compression of the binary formats
+PARQUET_COMPRESSION = 'zstd'
+FEATHER_COMPRESSION = 'zstd'
+
+#writer thread of the active background session, and the paths and futures of the frames it is writing
+_writer = None
+_pending = []
+_lock = threading.Lock()
+
+def frame_path(df_folder, df_name, fmt='csv'):
+    """
+    Returns the path of a saved frame.
+
+    Args:
+        df_folder (str): The folder of the file.
+        df_name (str): The name of the file (without extension).
+        fmt (str): The output format, a key of `FORMATS`.
+
+    Returns:
+        str: The path of the file.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown format {fmt!r}. Choose from {list(FORMATS)}.')
+    return os.path.join(df_folder, f'{df_name}{FORMATS[fmt]}')
+
+def write_frame(df, path, fmt='csv', key=None):
+    """
+    Writes a DataFrame with its index to a file.
+
+    The index is written as a column (named 'index' if it has no name) without a
+    `reset_index` copy. Parquet and Feather files keep the dtypes and the index, so
+    `pandas.read_parquet` / `pandas.read_feather` give back the same frame.
+
+    Args:
+        df (pandas.DataFrame): The DataFrame to write.
+        path (str): The file path.
+        fmt (str): The output format, a key of `FORMATS`.
+        key (str, optional): The fingerprint of the frame, recorded in the artifact manifest.
+
+    Returns:
+        str: The file path.
+    """
+    if fmt == 'csv':
+        df.to_csv(path, index=True, index_label=df.index.name if df.index.name is not None else 'index')
+    elif fmt in ('parquet', 'feather'):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        if fmt == 'parquet':
+            import pyarrow.parquet as pq
+            pq.write_table(table, path, compression=PARQUET_COMPRESSION)
+        else:
+            import pyarrow.feather as feather
+            feather.write_feather(table, path, compression=FEATHER_COMPRESSION)
+    else:
+        raise ValueError(f'Unknown format {fmt!r}. Choose from {list(FORMATS)}.')
+
+    if key is not None:
+        artifact_manifest.record(path, key)
+    return path
+
+def _fingerprint_and_write(df, path, fmt='csv', key=None):
+    """
+    Writes a frame with `write_frame`, fingerprinting it first if no key is given.
+
+    Runs on the writer thread in background mode, so a forced save never hashes the
+    frame on the caller's thread.
+    """
+    if key is None:
+        key = artifact_manifest.fingerprint(fmt, df)
+    return write_frame(df, path, fmt, key)
+
+def save_frame(df, df_folder, df_name, fmt='csv', force=False):
+    """
+    Saves a DataFrame to a folder, in the background while background writes are on.
+
+    The file is not rewritten when the frame matches the fingerprint recorded for it
+    in the artifact manifest. With `force` this check is skipped, and the fingerprint
+    recorded for the new file is computed by the writer. A frame handed to the
+    background writer must not be modified until the writes are finished.
+
+    Args:
+        df (pandas.DataFrame): The DataFrame to save.
+        df_folder (str): The directory path where the DataFrame will be saved.
+        df_name (str): The name of the file (without extension).
+        fmt (str): The output format, a key of `FORMATS`.
+        force (bool): Whether to save the DataFrame even if it is unchanged.
+
+    Returns:
+        tuple: The file path and whether it is being written (False if it was unchanged).
+    """
+    path = frame_path(df_folder, df_name, fmt)
+    key = None
+    if not force:
+        key = artifact_manifest.fingerprint(fmt, df)
+        if artifact_manifest.is_up_to_date(path, key):
+            return path, False
+
+    os.makedirs(df_folder, exist_ok=True)
+    with _lock:
+        if _writer is not None:
+            _pending.append((path, _writer.submit(_fingerprint_and_write, df, path, fmt, key)))
+            return path, True
+    _fingerprint_and_write(df, path, fmt, key)
+    return path, True
+
+def start_background_writes():
+    """
+    Turns on background writes: `save_frame` queues frames for a writer thread and returns at once.
+    """
+    global _writer
+    with _lock:
+        if _writer is None:
+            #one thread keeps the files in submission order; pyarrow and the disk release the GIL
+            _writer = ThreadPoolExecutor(max_workers=1)
+
+def finish_background_writes():
+    """
+    Waits for the queued frames and turns background writes off.
+
+    Returns:
+        tuple: The paths of the written files, and one error message per failed write
+               (failed writes are also printed).
+    """
+    global _writer, _pending
+    with _lock:
+        writer, pending = _writer, _pending
+        _writer, _pending = None, []
+    if writer is None:
+        return [], []
+
+    paths, errors = [], []
+    for path, future in pending:
+        try:
+            paths.append(future.result())
+        except Exception as e:
+            errors.append(f'{path}: {type(e).__name__}: {e}')
+            print(f'Error writing DataFrame to {path}: {e}')
+    writer.shutdown()
+    return paths, errors
+
+class background_writes:
+    def __init__(self):
+        """
+        Context manager running the enclosed code with background writes.
+
+        After the block, `paths` holds the written files and `errors` the failed writes.
+        """
+        self.paths = []
+        self.errors = []
+
+    def __enter__(self):
+        start_background_writes()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.paths, self.errors = finish_background_writes()
+        return False
@@ -1,4 +1,5 @@
 import pandas as pd
+import numpy as np
 import os
 
 from typing import Optional, Union, List, Dict
@@ -7,14 +8,28 @@ from typing import Optional, Union, List, Dict
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
-# import TA-Lib Library
-import ta
-from ta.volatility import average_true_range
+# vectorised indicator engine (falls back to the TA-Lib `ta` library for series with gaps)
+from . import indicator_engine
+
+# fingerprints of saved plots, so that unchanged files are not rewritten
+from . import artifact_manifest
+
+# CSV/Parquet/Feather output, optionally written in the background
+from . import frame_writer
+
+# shape-preserving downsampling of long series for plotting
+from . import decimation
+
+# compact dtypes of the price columns
+from . import frame_schema
+
+#upper bound on the float64 temporaries of one indicator pass, in bytes per row (see benchmark.py)
+INDICATOR_TEMP_BYTES_PER_ROW = 72
 
 
 
 class StockAnalyser:
-    def __init__(self, dataframe: pd.DataFrame):
+    def __init__(self, dataframe: pd.DataFrame, copy: bool = True, compact: bool = False):
         """
         Initialise the StockAnalyser with a pandas DataFrame containing stock data.
 
@@ -22,6 +37,11 @@ class StockAnalyser:
             dataframe (pd.DataFrame): DataFrame with stock data.
                                       It should contain 'Date', 'Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume'.
                                       'Date' column should be in datetime format.
+            copy (bool): Whether to work on a copy of the data. With False the analyser adopts
+                         the caller's frame: 'Date' is moved to its index in place and the price
+                         columns are shared, not copied.
+            compact (bool): Whether to convert the data to the compact dtypes of
+                            `frame_schema.PRICE_SCHEMA` and print its memory before and after.
         """
         if not isinstance(dataframe, pd.DataFrame):
             raise TypeError("Input must be a pandas DataFrame.")
@@ -30,8 +50,14 @@ class StockAnalyser:
         if not pd.api.types.is_datetime64_any_dtype(dataframe['Date']):
              raise ValueError("'Date' column must be in datetime format.")
 
-        self.data = dataframe.copy()
-        self.data = self.data.set_index('Date') # Set Date as index for easier handling
+        if copy:
+            self.data = dataframe.set_index('Date') # Set Date as index for easier handling (copies the data once)
+        else:
+            dataframe.set_index('Date', inplace=True)
+            self.data = dataframe
+
+        if compact:
+            self.data, _ = frame_schema.compact_with_report(self.data, frame_schema.PRICE_SCHEMA, name='Price data')
 
     def get_historical_data(self) -> pd.DataFrame:
         """
@@ -42,35 +68,65 @@ class StockAnalyser:
         """
         return self.data
 
-    def calculate_technical_indicators(self, data) -> pd.DataFrame:
+    def calculate_technical_indicators(self, data, copy: bool = True, dtype: type = np.float64) -> pd.DataFrame:
         """
         Calculate basic technical indicators for the stock data.
 
         Args:
             data (pd.DataFrame): Historical stock data
+            copy (bool): Whether to copy `data` before adding the indicators. With False the
+                         result is a new frame whose price columns are views of `data`'s
+                         columns and whose indicators are views of one preallocated buffer.
+                         Peak extra memory is then the indicator buffer plus at most
+                         `INDICATOR_TEMP_BYTES_PER_ROW` bytes of float64 temporaries per row.
+            dtype (type): The indicator dtype, np.float64 or np.float32.
 
         Returns:
             pd.DataFrame: Data with added technical indicators
         """
+        #SMA_15/SMA_60 (10/20 days), RSI_15/RSI_60 (10/20 days), MACD (12/26/9) and
+        #Volatility (10-day ATR), computed in one pass with shared EMAs, matching `ta`
+        indicators = indicator_engine.compute_indicators_single(data, dtype=dtype)
+
+        if not copy:
+            #unconsolidated frame over the existing column arrays: nothing is copied
+            columns = {name: data[name] for name in data.columns}
+            columns.update({name: indicators[name] for name in indicators.columns})
+            return pd.DataFrame(columns, copy=False)
+
         df = data.copy()
+        df[indicator_engine.INDICATOR_COLUMNS] = indicators
+
+        return df
 
-        #calculate simple moving average using ta library
-        df['SMA_15'] = ta.trend.sma_indicator(df['Adj Close'], window=10) #10 days
-        df['SMA_60'] = ta.trend.sma_indicator(df['Adj Close'], window=20) #20 days
+    def create_indicator_stream(self) -> indicator_engine.StreamingIndicators:
+        """
+        Create incremental indicator state primed with the loaded history.
 
-        #calculate RSI (Relative Strength Index) using ta library
-        df['RSI_15'] = ta.momentum.rsi(df['Adj Close'], window=10) #10 days
-        df['RSI_60'] = ta.momentum.rsi(df['Close'], window=20) #20 days
+        New bars can then be added with `update(high, low, close, adj_close)` in O(1),
+        giving the same values as rerunning `calculate_technical_indicators`.
 
-        #calculate MACD (Moving Average Convergence Divergence) using ta library
-        df['MACD'] = ta.trend.macd(df['Adj Close'])
-        df['MACD_Signal'] = ta.trend.macd_signal(df['Adj Close'])
-        df['MACD_Diff'] = ta.trend.macd_diff(df['Adj Close'])
+        Returns:
+            indicator_engine.StreamingIndicators: The primed indicator state.
+        """
+        return indicator_engine.StreamingIndicators.from_history(self.data)
 
-        #calculate volatality (Average True Range/ATR) using ta library
-        df['Volatility'] = average_true_range(high=df['High'], low=df['Low'], close=df['Close'], window=10)
-        
-        return df
+    @staticmethod
+    def calculate_panel_indicators(data: pd.DataFrame, ticker_column: str = 'Ticker',
+                                   date_column: Optional[str] = 'Date') -> pd.DataFrame:
+        """
+        Calculate the technical indicators for many tickers at once.
+
+        Args:
+            data (pd.DataFrame): A long frame with one row per ticker and date, or a wide
+                                 frame with (field, ticker) MultiIndex columns.
+            ticker_column (str): The ticker column of a long frame.
+            date_column (str, optional): The date column of a long frame.
+
+        Returns:
+            pd.DataFrame: Data with added technical indicators, in the same layout.
+        """
+        return indicator_engine.compute_indicators(data, ticker_column=ticker_column, date_column=date_column)
         
     def plot_stock_data(
                 self,
@@ -78,16 +134,24 @@ class StockAnalyser:
                 ticker: str,
                 indicators: bool = True,
                 volume: bool = True,
-                volume_color: str = 'black'
+                volume_color: str = 'black',
+                max_points: Optional[int] = decimation.PLOT_MAX_POINTS
             ) -> go.Figure:
                 """
                 Create an interactive plot of stock data using Plotly.
 
+                Histories longer than `max_points` rows are downsampled so that the size of the
+                saved HTML and the render time stay bounded: candles (and their volume) are merged
+                into wider candles, moving averages are reduced with MinMaxLTTB and long lines
+                are drawn with WebGL.
+
                 Args:
                     data (pd.DataFrame): Historical stock data (should already have indicators if needed).
                     ticker (str): Stock ticker symbol for the title
                     indicators (bool): Whether to show technical indicators (assumes they are in the data DataFrame).
                     volume (bool): Whether to show volume data
+                    volume_color (str): The colour of the volume bars.
+                    max_points (int, optional): The point budget per trace; None plots every row.
 
                 Returns:
                     go.Figure: The Plotly figure object.
@@ -106,14 +170,18 @@ class StockAnalyser:
                     row_heights=[0.7, 0.3] if volume else [1]
                 )
 
+                #merge candles above the point budget; volume is summed over the same rows
+                candle_columns = [column for column in ['Open', 'High', 'Low', 'Close', 'Volume'] if column in data.columns]
+                candles = decimation.resample_ohlc(data[candle_columns], max_points)
+
                 #add candlestick chart
                 fig.add_trace(
                     go.Candlestick(
-                        x=data.index,
-                        open=data['Open'],
-                        high=data['High'],
-                        low=data['Low'],
-                        close=data['Close'],
+                        x=candles.index,
+                        open=candles['Open'],
+                        high=candles['High'],
+                        low=candles['Low'],
+                        close=candles['Close'],
                         name='OHLC'
                     ),
                     row=1, col=1
@@ -126,24 +194,18 @@ class StockAnalyser:
                         print(f"Warning: Indicator columns {required_indicators} not found in the provided data. Skipping indicator plot.")
                     else:
                         #add moving averages
-                        fig.add_trace(
-                            go.Scatter(
-                                x=data.index,
-                                y=data['SMA_15'],
-                                name='SMA 15',
-                                line=dict(color='blue')
-                            ),
-                            row=1, col=1
-                        )
-                        fig.add_trace(
-                            go.Scatter(
-                                x=data.index,
-                                y=data['SMA_60'],
-                                name='SMA 60',
-                                line=dict(color='red')
-                            ),
-                            row=1, col=1
-                        )
+                        for column, name, color in [('SMA_15', 'SMA 15', 'blue'), ('SMA_60', 'SMA 60', 'red')]:
+                            x, y = decimation.decimate_xy(data.index, data[column], max_points)
+                            scatter = go.Scattergl if len(y) > decimation.WEBGL_MIN_POINTS else go.Scatter
+                            fig.add_trace(
+                                scatter(
+                                    x=x,
+                                    y=y,
+                                    name=name,
+                                    line=dict(color=color)
+                                ),
+                                row=1, col=1
+                            )
 
                 if volume:
                     #check if Volume column exists
@@ -153,8 +215,8 @@ class StockAnalyser:
                         #add volume bar chart
                         fig.add_trace(
                             go.Bar(
-                                x=data.index,
-                                y=data['Volume'],
+                                x=candles.index,
+                                y=candles['Volume'],
                                 name='Volume',
                                 marker_color=volume_color
                             ),
@@ -171,51 +233,63 @@ class StockAnalyser:
 
                 return fig #return the figure object
 
-    def save_plot(self, fig, plot_folder, plot_name) -> None:
+    def save_plot(self, fig, plot_folder, plot_name, force: bool = False) -> None:
         """
         Saves the Plotly figure to a local directory.
 
+        The HTML file is not rewritten when the figure matches the fingerprint recorded
+        for it in the artifact manifest.
+
         Args:
             fig (go.Figure): The Plotly figure object to save.
             plot_folder (str): The folder path where the plot will be saved.
             plot_name (str): The name of the plot file (without extension).
+            force (bool): Whether to save the plot even if it is unchanged.
         """
         if not os.path.exists(plot_folder):
                 os.makedirs(plot_folder)
 
         plot_path = os.path.join(plot_folder, f'{plot_name}.html')
 
-        #save plot as HTML
-        fig.write_html(plot_path)
-         
         #calculate the relative path
         current_directory = os.getcwd()
         relative_plot_path = os.path.relpath(plot_path, current_directory)
 
+        #the figure JSON holds all data and layout, and is far smaller than the HTML with plotly.js
+        key = artifact_manifest.fingerprint('plotly-html', fig.to_json())
+        if not force and artifact_manifest.is_up_to_date(plot_path, key):
+            print(f'Plot unchanged, kept: {relative_plot_path}')
+            return
+
+        #save plot as HTML
+        fig.write_html(plot_path)
+        artifact_manifest.record(plot_path, key)
+
         print(f'Plot saved to: {relative_plot_path}')
 
-    def save_dataframe(self, df, df_folder, df_name) -> None:
+    def save_dataframe(self, df, df_folder, df_name, force: bool = False, fmt: str = 'csv') -> None:
         """
-        Saves a DataFrame to a specified directory as a CSV file.
+        Saves a DataFrame to a specified directory as a CSV, Parquet or Feather file.
+
+        The Date index is written with the data, without a `reset_index` copy. The file is
+        not rewritten when the frame matches the fingerprint recorded for it in the artifact
+        manifest, and it is written by a background thread while
+        `frame_writer.background_writes` is active.
 
         Args:
             df (pd.DataFrame): The DataFrame to save.
             df_folder (str): The directory path where the DataFrame will be saved.
-            df_name (str): The name of the CSV file (without extension).
+            df_name (str): The name of the file (without extension).
+            force (bool): Whether to save the DataFrame even if it is unchanged.
+            fmt (str): The output format: 'csv', or 'parquet' / 'feather' to keep the dtypes.
         """
-        if not os.path.exists(df_folder):
-                    os.makedirs(df_folder)
-
-        df_path = os.path.join(df_folder, f'{df_name}.csv')
-
-        # Reset the index to include the Date as a column
-        df_to_save = df.reset_index()
-
-        #save the DataFrame to the specified directory
-        df_to_save.to_csv(df_path, index=False)
+        df_path, written = frame_writer.save_frame(df, df_folder, df_name, fmt=fmt, force=force)
 
         #calculate the relative path
         current_directory = os.getcwd()
         relative_df_path = os.path.relpath(df_path, current_directory)
 
-        print(f'DataFrame saved to: {relative_df_path}\n')
\ No newline at end of file
+        if written:
+            print(f'DataFrame saved to: {relative_df_path}\n')
+        else:
+            print(f'DataFrame unchanged, kept: {relative_df_path}\n')
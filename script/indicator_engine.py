@@ -0,0 +1,432 @@
+import numpy as np
+import pandas as pd
+from collections import deque
+
+from typing import Dict, Optional
+
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+#price fields the indicators are computed from
+PRICE_COLUMNS = ['High', 'Low', 'Close', 'Adj Close']
+
+#indicator columns, as added by `StockAnalyser.calculate_technical_indicators`
+INDICATOR_COLUMNS = ['SMA_15', 'SMA_60', 'RSI_15', 'RSI_60', 'MACD', 'MACD_Signal', 'MACD_Diff', 'Volatility']
+
+#indicator windows; the column names are kept from the original analysis
+SMA_WINDOWS = {'SMA_15': 10, 'SMA_60': 20}
+RSI_WINDOWS = {'RSI_15': ('Adj Close', 10), 'RSI_60': ('Close', 20)}
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+ATR_WINDOW = 10
+
+
+def _ema(values: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    """
+    Exponential moving average along the time axis of a (tickers x time) array.
+
+    Matches `Series.ewm(alpha=alpha, min_periods=min_periods, adjust=False).mean()`
+    for series without missing values.
+    """
+    ema = np.empty_like(values)
+    if values.shape[1] == 0:
+        return ema
+    #the first value seeds the average, the rest follow ema = alpha * x + (1 - alpha) * ema
+    ema[:, 0] = values[:, 0]
+    if values.shape[1] > 1:
+        ema[:, 1:], _ = lfilter([alpha], [1, -(1 - alpha)], values[:, 1:], axis=1,
+                                zi=(1 - alpha) * values[:, :1])
+    ema[:, :min_periods - 1] = np.nan
+    return ema
+
+
+def _sma(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Simple moving average along the time axis of a (tickers x time) array.
+
+    Each window is summed on its own through a strided view rather than as a
+    difference of running totals, whose rounding error grows with the history length.
+    """
+    n_times = values.shape[1]
+    sma = np.full(values.shape, np.nan)
+    if n_times >= window:
+        sma[:, window - 1:] = sliding_window_view(values, window, axis=1).sum(axis=-1) / window
+    return sma
+
+
+def _rsi(close: np.ndarray, window: int) -> np.ndarray:
+    """
+    Relative Strength Index with Wilder smoothing, as computed by `ta.momentum.rsi`.
+    """
+    diff = np.zeros_like(close)
+    diff[:, 1:] = np.diff(close, axis=1)
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    ema_up = _ema(up, 1 / window, window)
+    ema_down = _ema(down, 1 / window, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + ema_up / ema_down)
+    return np.where(ema_down == 0, 100.0, rsi)
+
+
+def _atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int) -> np.ndarray:
+    """
+    Average True Range with Wilder smoothing, as computed by `ta.volatility.average_true_range`.
+    """
+    true_range = high - low
+    previous_close = close[:, :-1]
+    true_range[:, 1:] = np.maximum.reduce([true_range[:, 1:], np.abs(high[:, 1:] - previous_close),
+                                           np.abs(low[:, 1:] - previous_close)])
+    atr = np.zeros_like(true_range)
+    if true_range.shape[1] < window:
+        return atr
+    atr[:, window - 1] = true_range[:, :window].mean(axis=1)
+    if true_range.shape[1] > window:
+        zi = (window - 1) / window * atr[:, window - 1:window]
+        atr[:, window:], _ = lfilter([1 / window], [1, -(window - 1) / window], true_range[:, window:],
+                                     axis=1, zi=zi)
+    return atr
+
+
+def _compute_aligned(prices: Dict[str, np.ndarray],
+                     out: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+    """
+    Computes every indicator for (tickers x time) price arrays in one pass.
+
+    The EMAs of the adjusted close are shared by MACD, its signal and histogram, and
+    both moving averages read the same adjusted close array. When
+    `out` is given, each indicator is written into its preallocated (tickers x time)
+    array as soon as it is computed, so that temporaries are released early.
+    """
+    adj_close = prices['Adj Close']
+    n_tickers, n_times = adj_close.shape
+    results = {} if out is None else out
+
+    def store(column, values):
+        if out is None:
+            results[column] = values
+        else:
+            out[column][...] = values
+
+    for column, window in SMA_WINDOWS.items():
+        store(column, _sma(adj_close, window))
+
+    for column, (field, window) in RSI_WINDOWS.items():
+        store(column, _rsi(prices[field], window))
+
+    macd = _ema(adj_close, 2 / (MACD_FAST + 1), MACD_FAST)
+    macd -= _ema(adj_close, 2 / (MACD_SLOW + 1), MACD_SLOW)
+    #the signal EMA starts at the first defined MACD value
+    signal = np.full_like(macd, np.nan)
+    signal[:, MACD_SLOW - 1:] = _ema(macd[:, MACD_SLOW - 1:], 2 / (MACD_SIGNAL + 1), MACD_SIGNAL)
+    store('MACD_Diff', macd - signal)
+    store('MACD', macd)
+    store('MACD_Signal', signal)
+    del macd, signal
+
+    store('Volatility', _atr(prices['High'], prices['Low'], prices['Close'], ATR_WINDOW))
+    return results
+
+
+def _compute_with_ta(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Computes the indicators of a single ticker with the `ta` library.
+
+    Used for tickers with missing prices, where the recursions of the panel engine
+    would not reproduce pandas' handling of NaN values.
+    """
+    import ta
+    from ta.volatility import average_true_range
+
+    result = pd.DataFrame(index=data.index)
+    for column, window in SMA_WINDOWS.items():
+        result[column] = ta.trend.sma_indicator(data['Adj Close'], window=window)
+    for column, (field, window) in RSI_WINDOWS.items():
+        result[column] = ta.momentum.rsi(data[field], window=window)
+    result['MACD'] = ta.trend.macd(data['Adj Close'])
+    result['MACD_Signal'] = ta.trend.macd_signal(data['Adj Close'])
+    result['MACD_Diff'] = ta.trend.macd_diff(data['Adj Close'])
+    result['Volatility'] = average_true_range(high=data['High'], low=data['Low'], close=data['Close'],
+                                              window=ATR_WINDOW)
+    return result
+
+
+def compute_indicators_long(data: pd.DataFrame, ticker_column: str = 'Ticker',
+                            date_column: Optional[str] = 'Date') -> pd.DataFrame:
+    """
+    Computes technical indicators for many tickers held in a long frame.
+
+    Rows are grouped by ticker and ordered by date (or kept in their order when
+    `date_column` is None), packed into contiguous (tickers x time) arrays, and
+    all indicators are computed for every ticker at once.
+
+    Args:
+        data (pd.DataFrame): One row per ticker and date with 'High', 'Low', 'Close'
+                             and 'Adj Close' columns.
+        ticker_column (str): The column holding the ticker symbol.
+        date_column (str, optional): The column holding the date. None uses the row order.
+
+    Returns:
+        pd.DataFrame: The indicator columns, aligned with the index of `data`.
+    """
+    if ticker_column not in data.columns:
+        raise ValueError(f"DataFrame must contain a '{ticker_column}' column.")
+    missing = [column for column in PRICE_COLUMNS if column not in data.columns]
+    if missing:
+        raise ValueError(f'DataFrame is missing price columns: {missing}')
+
+    codes, tickers = pd.factorize(data[ticker_column], sort=True)
+    if date_column is None:
+        order = np.argsort(codes, kind='stable')
+    else:
+        #lexsort sorts by the last key first: ticker, then date
+        order = np.lexsort((data[date_column].rank(method='first').to_numpy(), codes))
+    sorted_codes = codes[order]
+    lengths = np.bincount(sorted_codes, minlength=len(tickers))
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    positions = np.arange(len(order)) - starts[sorted_codes]
+    n_times = int(lengths.max()) if len(lengths) else 0
+
+    #flat position of each sorted row in the (tickers x time) arrays
+    cells = sorted_codes * n_times + positions
+
+    prices = {}
+    for field in PRICE_COLUMNS:
+        aligned = np.zeros(len(tickers) * n_times)
+        aligned[cells] = data[field].to_numpy(dtype=np.float64)[order]
+        prices[field] = aligned.reshape(len(tickers), n_times)
+
+    results = _compute_aligned(prices)
+    output = np.empty((len(data), len(INDICATOR_COLUMNS)))
+    output[order] = np.column_stack([results[column].ravel()[cells] for column in INDICATOR_COLUMNS])
+    indicators = pd.DataFrame(output, index=data.index, columns=INDICATOR_COLUMNS)
+
+    #tickers with missing prices fall back to `ta`, which handles NaN as pandas does
+    has_gaps = data[PRICE_COLUMNS].isna().any(axis=1).to_numpy()
+    for code in np.unique(codes[has_gaps]):
+        rows = order[sorted_codes == code]
+        indicators.iloc[rows] = _compute_with_ta(data.iloc[rows]).to_numpy()
+    return indicators
+
+
+def compute_indicators(data: pd.DataFrame, ticker_column: str = 'Ticker',
+                       date_column: Optional[str] = 'Date') -> pd.DataFrame:
+    """
+    Adds technical indicators to a long or wide OHLCV frame of many tickers.
+
+    The indicator columns match `StockAnalyser.calculate_technical_indicators`
+    (see `INDICATOR_COLUMNS`).
+
+    Args:
+        data (pd.DataFrame): Either a long frame with one row per ticker and date, or
+                             a wide frame with (field, ticker) MultiIndex columns and
+                             dates as the index, as returned by `yfinance.download`.
+        ticker_column (str): The ticker column of a long frame.
+        date_column (str, optional): The date column of a long frame. None uses the row order.
+
+    Returns:
+        pd.DataFrame: A copy of `data` with the indicators added, in the same layout.
+    """
+    if not isinstance(data, pd.DataFrame):
+        raise TypeError("Input must be a pandas DataFrame.")
+
+    if isinstance(data.columns, pd.MultiIndex):
+        #wide: the rows are already dates, so each column is one ticker's series
+        fields = data.columns.get_level_values(0)
+        missing = [column for column in PRICE_COLUMNS if column not in fields]
+        if missing:
+            raise ValueError(f'DataFrame is missing price columns: {missing}')
+        ordered = data.sort_index()
+        tickers = ordered['Adj Close'].columns
+        prices = {field: ordered[field][tickers].to_numpy(dtype=np.float64).T
+                  for field in PRICE_COLUMNS}
+
+        #tickers listed after the first date have leading NaNs, so they take the long path
+        complete = np.all([~np.isnan(values).any(axis=1) for values in prices.values()], axis=0)
+        results = _compute_aligned({field: values[complete] for field, values in prices.items()})
+        blocks = {}
+        for column in INDICATOR_COLUMNS:
+            block = pd.DataFrame(np.nan, index=ordered.index, columns=tickers)
+            block.loc[:, tickers[complete]] = results[column].T
+            blocks[column] = block
+
+        for ticker in tickers[~complete]:
+            series = ordered.xs(ticker, axis=1, level=1)[PRICE_COLUMNS].dropna(how='all')
+            computed = _compute_with_ta(series)
+            for column in INDICATOR_COLUMNS:
+                blocks[column].loc[computed.index, ticker] = computed[column]
+
+        indicators = pd.concat(blocks, axis=1).reindex(data.index)
+        return pd.concat([data, indicators], axis=1)
+
+    result = data.copy()
+    indicators = compute_indicators_long(data, ticker_column=ticker_column, date_column=date_column)
+    result[INDICATOR_COLUMNS] = indicators
+    return result
+
+
+def compute_indicators_single(data: pd.DataFrame, dtype: type = np.float64) -> pd.DataFrame:
+    """
+    Computes the indicators of one ticker's date-indexed price frame.
+
+    The price columns are read without copying and the indicators are written into
+    one preallocated (rows x indicators) buffer of `dtype`, which backs the result.
+
+    Args:
+        data (pd.DataFrame): Historical stock data in date order.
+        dtype (type): The indicator dtype, np.float64 or np.float32. Computation is
+                      always done in float64; float32 halves the stored size.
+
+    Returns:
+        pd.DataFrame: The indicator columns, aligned with the index of `data`.
+    """
+    prices = {field: data[field].to_numpy(dtype=np.float64)[np.newaxis, :] for field in PRICE_COLUMNS}
+    if any(np.isnan(values).any() for values in prices.values()):
+        return _compute_with_ta(data).astype(dtype)
+
+    #one row per indicator, so each indicator is a contiguous column of the result
+    buffer = np.empty((len(INDICATOR_COLUMNS), len(data)), dtype=dtype)
+    _compute_aligned(prices, out={column: buffer[index:index + 1]
+                                  for index, column in enumerate(INDICATOR_COLUMNS)})
+    return pd.DataFrame(buffer.T, index=data.index, columns=INDICATOR_COLUMNS, copy=False)
+
+
+
+class StreamingIndicators:
+    def __init__(self):
+        """
+        Initialise incremental indicator state for one ticker.
+
+        The state is O(window): the last adjusted closes for the moving averages, the Wilder
+        averages of RSI and ATR, and the MACD and signal EMAs. Each bar updates it
+        in O(1) with the same arithmetic as the batch engine, so the values are
+        identical to `compute_indicators_single` over the full history.
+        """
+        self.n_bars = 0
+        self.previous_close = None
+        self.previous_adj_close = None
+
+        #adjusted closes of the longest moving-average window
+        self.recent_adj_close = deque(maxlen=max(SMA_WINDOWS.values()))
+
+        #Wilder averages of up and down moves per RSI column
+        self.rsi_state = {column: [0.0, 0.0] for column in RSI_WINDOWS}
+
+        self.ema_fast = None
+        self.ema_slow = None
+        self.macd_signal = None
+
+        #true ranges are kept until the first ATR value (their mean) is defined
+        self.true_ranges = []
+        self.atr = 0.0
+
+    @classmethod
+    def from_history(cls, data: pd.DataFrame) -> 'StreamingIndicators':
+        """
+        Builds the state by replaying a ticker's price history.
+
+        Args:
+            data (pd.DataFrame): Historical stock data in date order.
+
+        Returns:
+            StreamingIndicators: The state after the last bar of `data`.
+        """
+        state = cls()
+        state.update_many(data)
+        return state
+
+    def update(self, high: float, low: float, close: float, adj_close: float) -> Dict[str, float]:
+        """
+        Adds one bar and returns the indicator values at that bar.
+
+        Args:
+            high (float): The high price of the bar.
+            low (float): The low price of the bar.
+            close (float): The close price of the bar.
+            adj_close (float): The adjusted close price of the bar.
+
+        Returns:
+            Dict[str, float]: The value of each indicator column (NaN while undefined).
+        """
+        high, low, close, adj_close = float(high), float(low), float(close), float(adj_close)
+        if np.isnan([high, low, close, adj_close]).any():
+            raise ValueError('Streaming indicators need complete bars; missing prices are not supported.')
+
+        first = self.n_bars == 0
+        self.n_bars += 1
+        n_bars = self.n_bars
+        values = {}
+
+        self.recent_adj_close.append(adj_close)
+        recent = np.fromiter(self.recent_adj_close, dtype=np.float64, count=len(self.recent_adj_close))
+        for column, window in SMA_WINDOWS.items():
+            if n_bars >= window:
+                #summed like a window of `_sma`, so both give the same values
+                values[column] = recent[-window:].sum() / window
+            else:
+                values[column] = np.nan
+
+        for column, (field, window) in RSI_WINDOWS.items():
+            price = adj_close if field == 'Adj Close' else close
+            previous = self.previous_adj_close if field == 'Adj Close' else self.previous_close
+            diff = 0.0 if first else price - previous
+            up = diff if diff > 0 else 0.0
+            down = -diff if diff < 0 else 0.0
+            state = self.rsi_state[column]
+            alpha = 1 / window
+            if first:
+                state[0], state[1] = up, down
+            else:
+                state[0] = alpha * up + (1 - alpha) * state[0]
+                state[1] = alpha * down + (1 - alpha) * state[1]
+            if n_bars < window:
+                values[column] = np.nan
+            elif state[1] == 0:
+                values[column] = 100.0
+            else:
+                values[column] = 100 - 100 / (1 + state[0] / state[1])
+
+        fast_alpha, slow_alpha = 2 / (MACD_FAST + 1), 2 / (MACD_SLOW + 1)
+        if first:
+            self.ema_fast, self.ema_slow = adj_close, adj_close
+        else:
+            self.ema_fast = fast_alpha * adj_close + (1 - fast_alpha) * self.ema_fast
+            self.ema_slow = slow_alpha * adj_close + (1 - slow_alpha) * self.ema_slow
+        values['MACD'] = self.ema_fast - self.ema_slow if n_bars >= MACD_SLOW else np.nan
+        if n_bars == MACD_SLOW:
+            self.macd_signal = values['MACD']
+        elif n_bars > MACD_SLOW:
+            signal_alpha = 2 / (MACD_SIGNAL + 1)
+            self.macd_signal = signal_alpha * values['MACD'] + (1 - signal_alpha) * self.macd_signal
+        defined = n_bars >= MACD_SLOW + MACD_SIGNAL - 1
+        values['MACD_Signal'] = self.macd_signal if defined else np.nan
+        values['MACD_Diff'] = values['MACD'] - self.macd_signal if defined else np.nan
+
+        true_range = high - low
+        if not first:
+            true_range = max(true_range, abs(high - self.previous_close), abs(low - self.previous_close))
+        if n_bars < ATR_WINDOW:
+            self.true_ranges.append(true_range)
+        elif n_bars == ATR_WINDOW:
+            self.true_ranges.append(true_range)
+            self.atr = float(np.array(self.true_ranges).mean())
+            self.true_ranges = []
+        else:
+            self.atr = 1 / ATR_WINDOW * true_range + (ATR_WINDOW - 1) / ATR_WINDOW * self.atr
+        values['Volatility'] = self.atr
+
+        self.previous_close = close
+        self.previous_adj_close = adj_close
+        return {column: values[column] for column in INDICATOR_COLUMNS}
+
+    def update_many(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adds a small batch of bars in order.
+
+        Args:
+            data (pd.DataFrame): New bars with 'High', 'Low', 'Close' and 'Adj Close' columns.
+
+        Returns:
+            pd.DataFrame: The indicator values at each new bar, aligned with the index of `data`.
+        """
+        rows = [self.update(*bar) for bar in data[PRICE_COLUMNS].itertuples(index=False, name=None)]
+        return pd.DataFrame(rows, index=data.index, columns=INDICATOR_COLUMNS)
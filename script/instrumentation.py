@@ -0,0 +1,206 @@
+#important python libraries
+import os
+import sys
+import json
+import time
+import functools
+import threading
+
+try:
+    import psutil
+except ImportError:
+    #RSS is then left out of the records
+    psutil = None
+
+#environment variable naming a JSON-lines file; when set, every process that reads it records spans there
+TRACE_ENV_VAR = 'ANALYSIS_TRACE'
+
+#receivers of finished span records; instrumentation is off while this is empty
+_sinks = []
+_lock = threading.Lock()
+
+#open spans of the current thread, for the 'path' of nested spans
+_stack = threading.local()
+
+#the psutil handle of this process, recreated in forked workers
+_process = None
+
+class JsonLinesSink:
+    def __init__(self, path):
+        """
+        Appends each span record to a file as one JSON line.
+
+        Every process opens the file itself in append mode, so worker processes can
+        share one trace file.
+
+        Args:
+            path (str): The path of the JSON-lines file.
+        """
+        self.path = path
+        self._file = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def __call__(self, record):
+        line = json.dumps(record, default=str) + '\n'
+        with self._lock:
+            if self._pid != os.getpid():
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+                self._pid = os.getpid()
+            self._file.write(line)
+            self._file.flush()
+
+def enable(sink=None, path=None):
+    """
+    Turns instrumentation on, sending each finished span to a callback and/or a JSON-lines file.
+
+    With `path`, the file is also exported through `ANALYSIS_TRACE` so that worker
+    processes started later record to it too.
+
+    Args:
+        sink (callable, optional): Called with each span record (a dict).
+        path (str, optional): A JSON-lines file to append the records to.
+    """
+    with _lock:
+        if sink is not None:
+            _sinks.append(sink)
+        if path is not None:
+            if not any(isinstance(known, JsonLinesSink) and known.path == path for known in _sinks):
+                _sinks.append(JsonLinesSink(path))
+            os.environ[TRACE_ENV_VAR] = path
+
+def disable():
+    """
+    Turns instrumentation off and forgets all sinks.
+    """
+    with _lock:
+        _sinks.clear()
+        os.environ.pop(TRACE_ENV_VAR, None)
+
+def is_enabled():
+    """
+    Returns whether spans are being recorded.
+
+    Returns:
+        bool: True if at least one sink is registered.
+    """
+    return bool(_sinks)
+
+def _rss_bytes():
+    """
+    Returns the current resident set size of the process, or None without psutil.
+    """
+    global _process
+    if psutil is None:
+        return None
+    if _process is None or _process.pid != os.getpid():
+        _process = psutil.Process()
+    return _process.memory_info().rss
+
+class _NullSpan:
+    """
+    The span handed out while instrumentation is off: every operation does nothing.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+
+    def set(self, **attributes):
+        """
+        Adds attributes to the record, e.g. `rows=len(df)` once the row count is known.
+        """
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        stack = getattr(_stack, 'names', None)
+        if stack is None:
+            stack = _stack.names = []
+        stack.append(self.name)
+        self.path = '/'.join(stack)
+        self.start = time.time()
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.rss_start = _rss_bytes()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        record = {'span': self.name,
+                  'path': self.path,
+                  'start': self.start,
+                  'wall_seconds': time.perf_counter() - self.wall_start,
+                  'cpu_seconds': time.process_time() - self.cpu_start,
+                  'rss_start_bytes': self.rss_start,
+                  'rss_end_bytes': _rss_bytes(),
+                  'status': 'ok' if exc_type is None else 'error',
+                  'pid': os.getpid(),
+                  'thread': threading.current_thread().name}
+        if exc_type is not None:
+            record['error'] = f'{exc_type.__name__}: {exc}'
+        record.update(self.attributes)
+        _stack.names.pop()
+
+        for sink in list(_sinks):
+            try:
+                sink(record)
+            except Exception as e:
+                print(f'Error recording span {self.name}: {e}', file=sys.stderr)
+        return False
+
+def span(name, **attributes):
+    """
+    Measures a stage: wall and CPU time, the resident memory at its start and end and any
+    attributes such as row counts.
+
+    Use as `with span('sentiment', rows=len(df)) as stage: ...`; `stage.set(...)` adds
+    attributes known only later. Nested spans record their parents in 'path', e.g.
+    'news/sentiment'. While instrumentation is off a shared no-op span is returned.
+
+    Args:
+        name (str): The stage name.
+        **attributes: Extra fields of the record.
+
+    Returns:
+        The span context manager.
+    """
+    if not _sinks:
+        return _NULL_SPAN
+    return _Span(name, attributes)
+
+def traced(name=None):
+    """
+    Decorator recording every call of a function as a span.
+
+    Args:
+        name (str, optional): The span name. Defaults to the function name.
+
+    Returns:
+        callable: The decorator.
+    """
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _sinks:
+                return func(*args, **kwargs)
+            with _Span(span_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+#processes started with a trace file in the environment record to it from the start
+if os.environ.get(TRACE_ENV_VAR):
+    enable(path=os.environ[TRACE_ENV_VAR])
@@ -0,0 +1,297 @@
+#important python libraries
+import re
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+from importlib.metadata import version
+
+#identifies the lexicon scorer in sentiment cache keys; bump when the rules change
+SCORER_NAME = 'lexicon'
+SCORER_VERSION = f"1-textblob{version('textblob')}"
+
+#words that flip the next assessment, as in TextBlob's pattern analyser
+NEGATIONS = ('no', 'not', "n't", 'never')
+
+#exclamation marks boost the preceding assessment by this factor
+EXCLAMATION_BOOST = 1.25
+
+#negated assessments are scaled by this factor ("not good" = slightly bad)
+NEGATION_FACTOR = -0.5
+
+#TextBlob's tokenizer splits leading and trailing punctuation off words and treats quotes as separators
+_PUNCTUATION = re.escape('.,;:!?()[]{}`"@#$^&*+-|=~_')
+_SEPARATORS = r"""\s'"‘’“”"""
+TOKEN_PATTERN = (rf"\.\.\.|[^{_SEPARATORS}{_PUNCTUATION}](?:[^{_SEPARATORS}]*[^{_SEPARATORS}{_PUNCTUATION}])?"
+                 rf"|[{_PUNCTUATION}]")
+
+class LexiconScorer:
+    def __init__(self, lexicon=None):
+        """
+        Initialise the scorer by compiling a polarity lexicon into token-indexed arrays.
+
+        Args:
+            lexicon (dict, optional): Maps a word to `(polarity, intensity, is_modifier)`.
+                                      Defaults to TextBlob's English pattern lexicon,
+                                      averaged over parts of speech as TextBlob does.
+        """
+        if lexicon is None:
+            lexicon = load_pattern_lexicon()
+
+        words = list(lexicon)
+        #the vocabulary also holds the negations and '!' so one lookup classifies every token
+        extra = [word for word in NEGATIONS + ('!',) if word not in lexicon]
+        self.vocabulary = pd.Index(words + extra)
+
+        size = len(self.vocabulary)
+        self.known = np.zeros(size, dtype=bool)
+        self.polarity = np.zeros(size, dtype=np.float64)
+        self.intensity = np.ones(size, dtype=np.float64)
+        self.modifier = np.zeros(size, dtype=bool)
+        for index, word in enumerate(words):
+            self.polarity[index], self.intensity[index], self.modifier[index] = lexicon[word]
+        self.known[:len(words)] = True
+
+        self.negation = self.vocabulary.isin(NEGATIONS)
+        self.ly_suffix = np.asarray(self.vocabulary.str.endswith('ly'), dtype=bool)
+        self.exclamation = np.asarray(self.vocabulary == '!')
+
+    def tokenize(self, texts):
+        """
+        Splits texts into lowercase tokens.
+
+        Args:
+            texts (list): The input texts.
+
+        Returns:
+            tuple: `(doc_ids, token_ids, lengths)` arrays with one entry per token, in
+                   text and token order; tokens outside the vocabulary have id -1.
+        """
+        #"don't" is split as "do n't" before quotes are treated as separators, as TextBlob does
+        texts = pd.Series(texts, dtype='object').str.replace("n't", " n't", regex=False)
+        tokens = texts.str.lower().str.findall(TOKEN_PATTERN).explode()
+        tokens = tokens.dropna()
+        token_ids = self.vocabulary.get_indexer(tokens.to_numpy())
+        lengths = tokens.str.len().to_numpy()
+        doc_ids = tokens.index.to_numpy()
+        return doc_ids, token_ids, lengths
+
+    def score(self, texts):
+        """
+        Scores a batch of texts with vectorised token lookup and aggregation.
+
+        The rules follow TextBlob's pattern analyser: a known modifier ("very")
+        scales the next known word by its intensity, a negation flips the next
+        assessment (and inverts a modifier's intensity), '!' boosts the preceding
+        assessment, and the text score is the mean of its assessments. Emoticons
+        and the '(!)' irony marker are not scored.
+
+        Args:
+            texts (list): The input texts.
+
+        Returns:
+            numpy.ndarray: The polarity score of each text, in input order.
+        """
+        texts = list(texts)
+        n_docs = len(texts)
+        doc_ids, token_ids, lengths = self.tokenize(texts)
+        if len(token_ids) == 0:
+            return np.zeros(n_docs, dtype=np.float64)
+
+        in_vocabulary = token_ids >= 0
+        ids = np.where(in_vocabulary, token_ids, 0)
+        known = self.known[ids] & in_vocabulary
+        polarity = np.where(known, self.polarity[ids], 0.0)
+        intensity = np.where(known, self.intensity[ids], 1.0)
+        modifier = self.modifier[ids] & known
+        negation = self.negation[ids] & in_vocabulary
+        exclamation = self.exclamation[ids] & in_vocabulary
+
+        unknown = ~known
+        small_word = unknown & ~negation & (lengths <= 1)
+
+        #a negation right after an '-ly' modifier negates the modifier itself ("really not good")
+        #and does not interrupt it, otherwise a modifier carries over unknown words of up to
+        #two letters ("very is a good")
+        before_negation = _previous_token(doc_ids, unknown & (lengths <= 2))
+        previous_index = np.maximum(before_negation, 0)
+        consumed = (negation & (before_negation >= 0) & modifier[previous_index]
+                    & self.ly_suffix[ids[previous_index]])
+        modifier_negated = np.zeros(len(ids), dtype=bool)
+        modifier_negated[before_negation[consumed]] = True
+        before_modified = _previous_token(doc_ids, (unknown & (lengths <= 2)) | consumed)
+
+        #a negation carries over unknown one-letter words ("not a good")
+        before_negated = _previous_token(doc_ids, small_word)
+        negated_index = np.maximum(before_negated, 0)
+        negated = (before_negated >= 0) & negation[negated_index] & ~consumed[negated_index]
+
+        after_modifier = known & (before_modified >= 0) & modifier[np.maximum(before_modified, 0)]
+
+        #a modifier followed by a known word merges into that word's assessment
+        merged = np.zeros(len(ids), dtype=bool)
+        merged[before_modified[after_modifier]] = True
+        assessment = known & ~merged
+
+        #a chain of modifiers and known words ("very very good") forms one assessment that
+        #takes the first modifier's (negation-inverted) intensity and any negation in the chain
+        root = np.where(after_modifier, before_modified, np.arange(len(ids)))
+        while True:
+            next_root = root[root]
+            if np.array_equal(next_root, root):
+                break
+            root = next_root
+        root_intensity = np.where(negated[root], 1.0 / intensity[root], intensity[root])
+        polarity = np.where(after_modifier, np.clip(polarity * root_intensity, -1.0, 1.0), polarity)
+        chain_negated = np.bincount(root, weights=negated | modifier_negated, minlength=len(ids)) > 0
+        negated = chain_negated[root]
+
+        #each '!' boosts the most recent assessment of the same text
+        positions = np.arange(len(ids))
+        last_assessment = np.maximum.accumulate(np.where(assessment, positions, -1))
+        boosted = exclamation & (last_assessment >= 0)
+        boosted &= doc_ids[np.maximum(last_assessment, 0)] == doc_ids
+        boosts = np.bincount(last_assessment[boosted], minlength=len(ids))
+        polarity = np.clip(polarity * EXCLAMATION_BOOST ** boosts, -1.0, 1.0)
+
+        polarity = np.where(negated, polarity * NEGATION_FACTOR, polarity)
+
+        #mean polarity of the assessments of each text (0.0 when there are none)
+        totals = np.bincount(doc_ids[assessment], weights=polarity[assessment], minlength=n_docs)
+        counts = np.bincount(doc_ids[assessment], minlength=n_docs)
+        return totals / np.maximum(counts, 1)
+
+def _previous_token(doc_ids, skipped):
+    """
+    Returns, for each token, the position of the closest earlier token of the same
+    text that is not skipped, or -1 when there is none.
+    """
+    positions = np.arange(len(doc_ids))
+    previous = np.full(len(doc_ids), -1)
+    previous[1:] = np.maximum.accumulate(np.where(skipped, -1, positions))[:-1]
+    same_doc = previous >= 0
+    same_doc[same_doc] = doc_ids[previous[same_doc]] == doc_ids[same_doc]
+    return np.where(same_doc, previous, -1)
+
+def load_pattern_lexicon():
+    """
+    Loads TextBlob's English pattern lexicon as `(polarity, intensity, is_modifier)` per word.
+
+    Returns:
+        dict: The compiled lexicon entries.
+    """
+    from textblob.en import sentiment as pattern_lexicon
+
+    #the lexicon is a lazy dict: its first len() reads the XML file (calling load() again would reload it)
+    n_entries = len(pattern_lexicon)
+    if not n_entries:
+        raise RuntimeError("TextBlob's pattern lexicon is empty.")
+    modifiers = pattern_lexicon.modifiers
+    lexicon = {}
+    for word, senses in dict.items(pattern_lexicon):
+        polarity, _, intensity = senses[None]
+        lexicon[word] = (polarity, intensity, any(pos in senses for pos in modifiers))
+    return lexicon
+
+_default_scorer = None
+
+def get_lexicon_scorer():
+    """
+    Returns the process-wide lexicon scorer, compiling it on first use.
+
+    Returns:
+        LexiconScorer: The shared scorer.
+    """
+    global _default_scorer
+    if _default_scorer is None:
+        _default_scorer = LexiconScorer()
+    return _default_scorer
+
+def compare_with_textblob(texts, tolerance=0.1):
+    """
+    Compares lexicon scores against TextBlob polarity on the given texts.
+
+    Args:
+        texts (list): The input texts, e.g. the 'Headline' column of the news data.
+        tolerance (float): The absolute difference counted as agreement.
+
+    Returns:
+        dict: Mean and maximum absolute error, the share of texts within the
+              tolerance, and the share with the same sign (positive/neutral/negative).
+    """
+    from .news_sentiment_analyser import calculate_sentiment_batch
+
+    texts = list(texts)
+    expected = np.asarray(calculate_sentiment_batch(texts), dtype=np.float64)
+    actual = get_lexicon_scorer().score(texts)
+    error = np.abs(actual - expected)
+    return {'texts': len(texts),
+            'mean_abs_error': float(error.mean()) if len(texts) else 0.0,
+            'max_abs_error': float(error.max()) if len(texts) else 0.0,
+            'within_tolerance': float((error <= tolerance).mean()) if len(texts) else 1.0,
+            'same_sign': float((np.sign(actual) == np.sign(expected)).mean()) if len(texts) else 1.0}
+
+def sample_texts(n_texts=3000, seed=0, max_tokens=8):
+    """
+    Builds seeded random texts from lexicon words, negations, modifiers and punctuation.
+
+    They exercise every rule of the scorer (modifier chains, negations with gaps,
+    '-ly' modifiers and '!' boosts). Emoticons such as ':)' are not used: TextBlob
+    scores them and the lexicon scorer does not.
+
+    Args:
+        n_texts (int): The number of texts.
+        seed (int): The random seed.
+        max_tokens (int): The most tokens per text.
+
+    Returns:
+        list: The texts.
+    """
+    rng = np.random.default_rng(seed)
+    lexicon = load_pattern_lexicon()
+    words = np.array(sorted(lexicon))
+    modifiers = np.array(sorted(word for word, (_, _, is_modifier) in lexicon.items() if is_modifier))
+    fillers = np.array(['the', 'stock', 'a', 'shares', 'i', 'of'])
+    punctuation = np.array(['!', '.', ',', '?', '...'])
+
+    pools = [words, modifiers, np.array(NEGATIONS), fillers, punctuation]
+    weights = np.array([0.4, 0.15, 0.1, 0.25, 0.1])
+    texts = []
+    for n_tokens in rng.integers(1, max_tokens + 1, size=n_texts):
+        pool_ids = rng.choice(len(pools), size=n_tokens, p=weights)
+        tokens = [pools[pool_id][rng.integers(len(pools[pool_id]))] for pool_id in pool_ids]
+        texts.append(' '.join(tokens))
+    return texts
+
+def main(argv=None):
+    """
+    Command-line check of the agreement with TextBlob, e.g.
+    `python -m script.lexicon_sentiment --news data/raw_analyst_ratings.csv --limit 5000`.
+
+    Exits with 1 when the share of texts within the tolerance falls below `--min-agreement`.
+    """
+    parser = argparse.ArgumentParser(description='Compare the lexicon scorer against TextBlob polarity.')
+    parser.add_argument('--news', default=None,
+                        help="Raw news CSV whose 'headline' column is scored; defaults to seeded random texts.")
+    parser.add_argument('--limit', type=int, default=3000, help='Number of texts to compare.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tolerance', type=float, default=0.01)
+    parser.add_argument('--min-agreement', type=float, default=0.99,
+                        help='Least share of texts within the tolerance.')
+    args = parser.parse_args(argv)
+
+    if args.news:
+        texts = pd.read_csv(args.news, usecols=['headline'], nrows=args.limit)['headline'].dropna().tolist()
+    else:
+        texts = sample_texts(args.limit, seed=args.seed)
+
+    report = compare_with_textblob(texts, tolerance=args.tolerance)
+    for name, value in report.items():
+        print(f'{name}: {value}')
+    if report['within_tolerance'] < args.min_agreement:
+        print(f"Agreement {report['within_tolerance']:.4f} is below {args.min_agreement}.")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
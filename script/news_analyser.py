@@ -1,8 +1,16 @@
 from . import news_sentiment_analyser
 from . import news_text_processor
-from . import news_visualiser
+from . import instrumentation
+from . import publication_calendar
+from . import news_sketches
+from . import frame_schema
 
-def analyse_stock_news(df, ticker, plot_folder):
+#modes of the headline and publisher statistics
+STATISTICS = ('exact', 'sketch')
+
+@instrumentation.traced('analyse_stock_news')
+def analyse_stock_news(df, ticker, plot_folder, statistics='exact', sketches=None, scorer='textblob',
+                       text_model_path=None, compact=False):
     """
     Performs a comprehensive analysis of news headlines for a given stock ticker.
 
@@ -10,64 +18,118 @@ def analyse_stock_news(df, ticker, plot_folder):
         df (pandas.DataFrame): The DataFrame containing news for the ticker.
         ticker (str): The stock ticker symbol.
         plot_folder (str): The folder to save the plots.
+        statistics (str): 'exact' for the pandas counts of headlines, publishers and
+                          domains, or 'sketch' for fixed-memory estimates (see `news_sketches`).
+        sketches (news_sketches.NewsSketches, optional): Sketches holding the ticker, e.g.
+                  from `news_sketches.sketch_news_file`; built from `df` in sketch mode if not given.
+        scorer (str): The sentiment scorer (see `news_sentiment_analyser.SCORERS`), used only
+                      when `df` has no 'Sentiment' column yet.
+        text_model_path (str, optional): State file of an incremental text model (see
+                                         `text_model.IncrementalTextModel`). When given, only
+                                         headlines new to the model update its TF-IDF and LDA
+                                         state instead of refitting both on every run.
+        compact (bool): Whether to convert `df` to the compact dtypes of `frame_schema.NEWS_SCHEMA`
+                        first and print its memory before and after.
     """
+    if statistics not in STATISTICS:
+        raise ValueError(f'Unknown statistics mode {statistics!r}. Choose from {STATISTICS}.')
+    #matplotlib and seaborn are only imported once an analysis runs
+    from . import news_visualiser
+
     print(f'\n--- Analysing {ticker} News Headlines ---\n')
 
+    if compact:
+        #categorical publishers and tickers, float32 sentiment; the caller's frame is not modified
+        df, _ = frame_schema.compact_with_report(df, frame_schema.NEWS_SCHEMA, name=f'{ticker} news')
+
     #----Descriptive Statistics-----#
-    #display descriptive statistics for the 'Headline' column
-    print("\nDescriptive statistics for 'Headline' column:")
-    print(df['Headline'].describe())
-    print()
-
-    #get the number of unique headlines
-    print('\nNumber of unique headlines:')
-    print(df['Headline'].nunique())
-    print()
-
-    #display the most frequent headlines
-    print('\nMost frequent headlines (head):')
-    print(df['Headline'].value_counts().head())
-    print()
-
-    #calculate headline length
-    df['Headline_Length'] = df['Headline'].apply(len)
-    print("\nBasic statistics for 'Headline_Length' column:")
-    print(df['Headline_Length'].describe())
-    print()
-
-    #count the number of articles per publisher 
-    print('\nNumber of articles per publisher (head):')
-    print(df['Publisher'].value_counts().head())
-    print()
+    with instrumentation.span('descriptive_statistics', rows=len(df)):
+        if statistics == 'sketch':
+            #distinct counts and top values estimated in fixed memory, chunk by chunk
+            if sketches is None:
+                sketches = news_sketches.sketch_frame(df, ticker)
+            headline_sketch = sketches.column(ticker, 'Headline')
+
+            print("\nApproximate descriptive statistics for 'Headline' column:")
+            print(headline_sketch.describe())
+            print()
+
+            print('\nApproximate number of unique headlines:')
+            print(headline_sketch.nunique())
+            print()
+
+            print('\nMost frequent headlines (head, approximate counts):')
+            print(headline_sketch.value_counts(5))
+            print()
+        else:
+            #display descriptive statistics for the 'Headline' column
+            print("\nDescriptive statistics for 'Headline' column:")
+            print(df['Headline'].describe())
+            print()
+
+            #get the number of unique headlines
+            print('\nNumber of unique headlines:')
+            print(df['Headline'].nunique())
+            print()
+
+            #display the most frequent headlines
+            print('\nMost frequent headlines (head):')
+            print(df['Headline'].value_counts().head())
+            print()
+
+        #calculate headline length
+        print("\nBasic statistics for 'Headline_Length' column:")
+        if statistics == 'sketch':
+            #exact, from the length histogram collected while sketching
+            print(sketches.column(ticker, 'Headline_Length').describe())
+        else:
+            df['Headline_Length'] = df['Headline'].apply(len)
+            print(df['Headline_Length'].describe())
+        print()
+
+        #count the number of articles per publisher 
+        print('\nNumber of articles per publisher (head):')
+        if statistics == 'sketch':
+            print(sketches.column(ticker, 'Publisher').value_counts(5))
+        else:
+            print(df['Publisher'].value_counts().head())
+        print()
     #------------------------------------------#
 
     #----Publication Analysis-----#
 
-    #call plot_publication_frequency_by_day function
-    #calculate publicatoin trend by the day of the week and save to 'publication_day' column
-    #plot and save number of daily publications
-    news_visualiser.plot_publication_frequency_by_day(df, ticker, plot_folder)
-    print()
+    with instrumentation.span('publication_plot', rows=len(df)):
+        #call plot_publication_frequency_by_day function
+        #calculate publicatoin trend by the day of the week
+        #plot and save number of daily publications
+        #one pass over the timestamps gives the weekday, hourly and daily counts of all publication plots
+        calendar = publication_calendar.aggregate_publications(df, ticker_column=None)
+        news_visualiser.plot_publication_frequency_by_day(df, ticker, plot_folder, calendar=calendar)
+        print()
     #------------------------------------------#
 
     #----Sentiment Analysis-----#
-    #calculate distribution of sentiment scores
-    df = news_sentiment_analyser.add_sentiment_column(df)
-    print('\nSentiment distribution:')
-    print(df['Sentiment'].describe())
-    print()
-
-    #analyse the sentiment of the most positive and negative headlines
-    #most positive headlines
-    print('\nMost Positive Headlines:')
-    print(df.nlargest(5, 'Sentiment')[['Headline', 'Sentiment']])
-    print()
-
-    #most negative headlines
-    print("\nMost Negative Headlines:")
-    print(df.nsmallest(5, 'Sentiment')[['Headline', 'Sentiment']])
-    news_visualiser.plot_sentiment_distribution(df, ticker, plot_folder)
-    print()
+    with instrumentation.span('sentiment', rows=len(df)):
+        #calculate distribution of sentiment scores
+        #scores already added by the caller (e.g. the pipeline, with its own scorer) are kept
+        if 'Sentiment' not in df.columns:
+            df = news_sentiment_analyser.add_sentiment_column(df, scorer=scorer)
+        print('\nSentiment distribution:')
+        print(df['Sentiment'].describe())
+        print()
+
+    with instrumentation.span('sentiment_report', rows=len(df)):
+        #analyse the sentiment of the most positive and negative headlines
+        #most positive headlines
+        print('\nMost Positive Headlines:')
+        print(df.nlargest(5, 'Sentiment')[['Headline', 'Sentiment']])
+        print()
+
+        #most negative headlines
+        print("\nMost Negative Headlines:")
+        print(df.nsmallest(5, 'Sentiment')[['Headline', 'Sentiment']])
+        news_visualiser.plot_sentiment_distribution(df, ticker, plot_folder)
+        print()
     #------------------------------------------#
 
     #----Text Analysis (Topic Modelling)-----#
@@ -77,59 +139,89 @@ def analyse_stock_news(df, ticker, plot_folder):
         #tokenizing the text into words
         #removing common English stop words
         #lemmatizing words to their base form
-    text_data = df['Headline'].dropna().tolist()
-    processed_text_data = [news_text_processor.preprocess_text(text) for text in text_data]
-
-    #iterate through each articles to find overall important terms
-    #terms with highest TF-IDF scores across all documents
-    print('\nTop 10 TF-IDF terms:')
-
-    #calculate Average TF-IDF scores
-    #'.A1' converts the result matrix of means into a 1-dimensional array
-    tfidf_matrix, feature_names = news_text_processor.calculate_tfidf(processed_text_data)
-    average_tfidf = tfidf_matrix.mean(axis=0).A1
-
-    #sort and get top terms
-    sorted_tfidf_indices = average_tfidf.argsort()[::-1]
-    top_tfidf_terms = [(feature_names[i], average_tfidf[i]) for i in sorted_tfidf_indices[:10]] #top 10
-    for term, score in top_tfidf_terms:
-        print(f'{term}: {score:.4f}')
-
-    news_text_processor.perform_lda_topic_modeling(tfidf_matrix, feature_names)
-    print()
-
-    news_text_processor.perform_ner(text_data)
-    print()
+    with instrumentation.span('preprocess', rows=len(df)) as stage:
+        text_data = df['Headline'].dropna().tolist()
+        processed_text_data = news_text_processor.preprocess_texts(text_data)
+        stage.set(documents=len(text_data))
+
+    if text_model_path is not None:
+        from . import text_model
+
+        with instrumentation.span('tfidf', rows=len(processed_text_data), incremental=True) as stage:
+            #new headlines update the saved document frequencies and online LDA topics
+            model = text_model.update_text_model(processed_text_data, model_path=text_model_path)
+            print('\nTop 10 TF-IDF terms:')
+            for term, score in model.top_tfidf_terms(processed_text_data, num_terms=10):
+                print(f'{term}: {score:.4f}')
+            stage.set(features=len(model.term_names), documents=model.n_documents)
+
+        with instrumentation.span('lda', rows=model.n_documents, incremental=True):
+            topics = model.topics()
+            print(f'\nTopics discovered by online LDA ({len(topics)} topics):')
+            for index, top_words in enumerate(topics):
+                print(f'Topic #{index + 1}: {", ".join(top_words)}')
+            print()
+    else:
+        with instrumentation.span('tfidf', rows=len(processed_text_data)) as stage:
+            #iterate through each articles to find overall important terms
+            #terms with highest TF-IDF scores across all documents
+            print('\nTop 10 TF-IDF terms:')
+
+            #calculate Average TF-IDF scores
+            #'.A1' converts the result matrix of means into a 1-dimensional array
+            tfidf_matrix, feature_names = news_text_processor.calculate_tfidf(processed_text_data)
+            average_tfidf = tfidf_matrix.mean(axis=0).A1
+
+            #sort and get top terms
+            sorted_tfidf_indices = average_tfidf.argsort()[::-1]
+            top_tfidf_terms = [(feature_names[i], average_tfidf[i]) for i in sorted_tfidf_indices[:10]] #top 10
+            for term, score in top_tfidf_terms:
+                print(f'{term}: {score:.4f}')
+            stage.set(features=len(feature_names))
+
+        with instrumentation.span('lda', rows=tfidf_matrix.shape[0]):
+            news_text_processor.perform_lda_topic_modeling(tfidf_matrix, feature_names)
+            print()
+
+    with instrumentation.span('ner', rows=len(text_data)):
+        news_text_processor.perform_ner(text_data)
+        print()
     #------------------------------------------#
 
     #----Time Series Analysis----#
-    #call plot_daily_publication_frequency function
-    #plot and save the daily publication frequency 
-    news_visualiser.plot_daily_publication_frequency(df, ticker, plot_folder)
-    print()
-
-    #call plot_hourly_publication_frequency_zero_hour function
-    #plot and save the hourly publication frequency for 00:00 hour
-    news_visualiser.plot_hourly_publication_frequency_zero_hour(df, ticker, plot_folder)
-    print()
-
-    #call plot_hourly_publication_frequency_other_hours function
-    #plot and save the hourly publication frequency for hour other than 00:00 hour
-    news_visualiser.plot_hourly_publication_frequency_other_hours(df, ticker, plot_folder)
-    print()
+    with instrumentation.span('time_series_plots', rows=len(df)):
+        #call plot_daily_publication_frequency function
+        #plot and save the daily publication frequency 
+        news_visualiser.plot_daily_publication_frequency(df, ticker, plot_folder, calendar=calendar)
+        print()
+
+        #call plot_hourly_publication_frequency_zero_hour function
+        #plot and save the hourly publication frequency for 00:00 hour
+        news_visualiser.plot_hourly_publication_frequency_zero_hour(df, ticker, plot_folder, calendar=calendar)
+        print()
+
+        #call plot_hourly_publication_frequency_other_hours function
+        #plot and save the hourly publication frequency for hour other than 00:00 hour
+        news_visualiser.plot_hourly_publication_frequency_other_hours(df, ticker, plot_folder, calendar=calendar)
+        print()
     #------------------------------------------#
 
     #----Publisher Analysis----#
-    #identify unique domains to check if  publisher is email adress instead of name
-    #extract the domain from each email address in the 'Publisher' column
-    df['Domain'] = df['Publisher'].apply(lambda x: x.split('@')[-1] if '@' in x else 'Not an email')
-    
-    #count the occurrences of each unique domain
-    domain_counts = df['Domain'].value_counts()
-
-    #display the domains with the highest counts (excluding 'Not an email' if it exists)
-    print('Domains with the most contributions:\n')
-    print(domain_counts[domain_counts.index != 'Not an email'].head())
+    with instrumentation.span('publisher_analysis', rows=len(df)):
+        if statistics == 'sketch':
+            #the domains were counted while sketching; one extra candidate covers 'Not an email'
+            domain_counts = sketches.column(ticker, 'Domain').value_counts(6)
+        else:
+            #identify unique domains to check if  publisher is email adress instead of name
+            #extract the domain from each email address in the 'Publisher' column
+            df['Domain'] = df['Publisher'].apply(lambda x: x.split('@')[-1] if '@' in x else 'Not an email')
+
+            #count the occurrences of each unique domain
+            domain_counts = df['Domain'].value_counts()
+
+        #display the domains with the highest counts (excluding 'Not an email' if it exists)
+        print('Domains with the most contributions:\n')
+        print(domain_counts[domain_counts.index != 'Not an email'].head())
 
     print(f'\n--- Analysis for {ticker} Complete ---\n')
     #------------------------------------------#
\ No newline at end of file
@@ -2,20 +2,39 @@
 import pandas as pd
 import os
 
-def load_and_filter_data(file_path, tickers):
+from pandas.api.types import CategoricalDtype, union_categoricals
+
+#columns of the raw analyst-ratings file that the analysis uses ('Unnamed: 0' is never needed)
+NEWS_COLUMNS = ['date', 'headline', 'publisher', 'stock', 'url']
+
+#explicit dtypes for the streamed columns; 'date' is parsed per chunk after filtering
+NEWS_DTYPES = {'headline': 'object', 'publisher': 'category', 'stock': 'object', 'url': 'object'}
+
+#old ticker names mapped to the ones used throughout the project
+TICKER_RENAMES = {'FB': 'META', 'MSF': 'MSFT'}
+
+def load_and_filter_data(file_path, tickers, chunksize=None, columns=None):
     """
     Loads the raw data and filters it for specified stock tickers.
 
     Args:
         file_path (str): The path to the raw data CSV file.
         tickers (list): A list of stock ticker symbols.
+        chunksize (int, optional): When given, the file is streamed in chunks of this
+                                   many rows (see `load_and_filter_data_chunked`) so that
+                                   peak memory is bounded by the chunk size. Defaults to None.
+        columns (list, optional): Raw column names to load in streaming mode.
+                                  Defaults to `NEWS_COLUMNS`.
 
     Returns:
         pandas.DataFrame: The filtered and processed DataFrame.
     """
+    if chunksize:
+        return load_and_filter_data_chunked(file_path, tickers, chunksize=chunksize, columns=columns)
+
     try:
         text_data = pd.read_csv(file_path, engine='python')
-        
+
         #change 'FB' ticker name to 'META' and 'MSF' to 'MSFT' for uniformity
         text_data.loc[text_data['stock'] == 'FB', 'stock'] = 'META'
         text_data.loc[text_data['stock'] == 'MSF', 'stock'] = 'MSFT'
@@ -26,12 +45,12 @@ def load_and_filter_data(file_path, tickers):
         #drop 'Unnamed: 0'column, reset and drop old index, and sort index
         stock_news = text_data[text_data['stock'].isin(tickers)].drop('Unnamed: 0',
                                                                       axis='columns').reset_index(drop=True).sort_index(axis=1)
-        
+
         #pass `format='ISO8601'` to change some date formats that are `'format='%Y-%m-%d %0:%0:%0%0'`
         stock_news['date'] = pd.to_datetime(stock_news['date'],
                                             format='ISO8601', errors='coerce')
-        
-        #reverse, reset, and drop index 
+
+        #reverse, reset, and drop index
         stock_news = stock_news.reindex(stock_news.index[::-1])
         stock_news = stock_news.reset_index(drop=True)
 
@@ -45,4 +64,92 @@ def load_and_filter_data(file_path, tickers):
         return None
     except Exception as e:
         print(f'An error occurred while loading file: {e}')
-        return None
\ No newline at end of file
+        return None
+
+def iter_filtered_chunks(file_path, tickers, chunksize=100_000, columns=None):
+    """
+    Streams the raw data in chunks, yielding only the rows for the specified tickers.
+
+    Each chunk is read with the C engine using only the requested columns and explicit
+    dtypes, the 'FB'/'MSF' tickers are remapped, rows are filtered with `isin(tickers)`
+    and the dates are parsed, all before the next chunk is read.
+
+    Args:
+        file_path (str): The path to the raw data CSV file.
+        tickers (list): A list of stock ticker symbols.
+        chunksize (int): The number of raw rows read per chunk.
+        columns (list, optional): Raw column names to load. Defaults to `NEWS_COLUMNS`.
+
+    Yields:
+        pandas.DataFrame: The filtered chunk, with the raw (lowercase) column names
+                          in sorted order and the raw row order kept.
+    """
+    columns = sorted(set(columns or NEWS_COLUMNS) | {'stock'})
+    dtypes = {col: NEWS_DTYPES[col] for col in columns if col in NEWS_DTYPES}
+    stock_dtype = CategoricalDtype(categories=sorted(set(tickers)))
+
+    reader = pd.read_csv(file_path, engine='c', usecols=columns, dtype=dtypes, chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            #remap old ticker names before filtering so that 'FB' rows are kept for 'META'
+            chunk['stock'] = chunk['stock'].replace(TICKER_RENAMES)
+            chunk = chunk[chunk['stock'].isin(tickers)]
+            if chunk.empty:
+                continue
+
+            #a fixed category list keeps the 'stock' dtype identical across chunks
+            chunk = chunk.astype({'stock': stock_dtype})
+            if 'date' in chunk.columns:
+                chunk['date'] = pd.to_datetime(chunk['date'], format='ISO8601', errors='coerce')
+
+            yield chunk[columns]
+
+def load_and_filter_data_chunked(file_path, tickers, chunksize=100_000, columns=None):
+    """
+    Loads the raw data in chunks and filters it for specified stock tickers.
+
+    Produces the same rows, row order and column names as `load_and_filter_data`,
+    but the raw file is never held in memory at once, and 'Stock'/'Publisher'
+    are returned as categoricals.
+
+    Args:
+        file_path (str): The path to the raw data CSV file.
+        tickers (list): A list of stock ticker symbols.
+        chunksize (int): The number of raw rows read per chunk.
+        columns (list, optional): Raw column names to load. Defaults to `NEWS_COLUMNS`.
+
+    Returns:
+        pandas.DataFrame: The filtered and processed DataFrame.
+    """
+    try:
+        chunks = list(iter_filtered_chunks(file_path, tickers, chunksize=chunksize, columns=columns))
+        print("File loaded successfully. The new DataFrame is 'stock_news'.")
+
+        if not chunks:
+            columns = sorted(set(columns or NEWS_COLUMNS) | {'stock'})
+            return pd.DataFrame(columns=[col.capitalize() for col in columns])
+
+        #publisher categories differ per chunk, so union them instead of falling back to object
+        publishers = None
+        if 'publisher' in chunks[0].columns:
+            publishers = union_categoricals([chunk['publisher'] for chunk in chunks])
+            chunks = [chunk.drop(columns='publisher') for chunk in chunks]
+
+        stock_news = pd.concat(chunks, ignore_index=True)
+        if publishers is not None:
+            stock_news['publisher'] = pd.Categorical(publishers)
+            stock_news = stock_news.sort_index(axis=1)
+
+        #reverse, reset, and drop index
+        stock_news = stock_news.iloc[::-1].reset_index(drop=True)
+
+        #capitalise the first letter of the column names
+        stock_news.columns = [col.capitalize() for col in stock_news.columns]
+        return stock_news
+
+    except FileNotFoundError:
+        print(f"Error: The file path '{file_path}' was not found.")
+        return None
+    except Exception as e:
+        print(f'An error occurred while loading file: {e}')
+        return None
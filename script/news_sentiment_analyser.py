@@ -1,5 +1,21 @@
+#important python libraries
+import os
+from importlib.metadata import version
+from concurrent.futures import ProcessPoolExecutor
+
 #for sentiment analysis
-from textblob import TextBlob
+#TextBlob (and NLTK underneath it) is imported on first use to keep module import fast
+from . import lexicon_sentiment
+
+#default number of texts scored per task in batch mode
+DEFAULT_BATCH_SIZE = 10_000
+
+#identifies the TextBlob scorer in sentiment cache keys
+SCORER_NAME = 'textblob'
+SCORER_VERSION = version('textblob')
+
+#scorer backends selectable in `add_sentiment_column`
+SCORERS = (SCORER_NAME, lexicon_sentiment.SCORER_NAME)
 
 def calculate_sentiment(text):
     """
@@ -11,18 +27,99 @@ def calculate_sentiment(text):
     Returns:
         float: The sentiment polarity score.
     """
+    from textblob import TextBlob
+
     return TextBlob(text).sentiment.polarity
 
-def add_sentiment_column(df, text_column='Headline'):
+def calculate_sentiment_batch(texts):
+    """
+    Calculates the sentiment polarity of a batch of texts.
+
+    Uses the same pattern analyser as `TextBlob(text).sentiment`, so the scores
+    are identical to `calculate_sentiment`, but a single analyser is reused for
+    the whole batch instead of building a `TextBlob` per text.
+
+    Args:
+        texts (list): The input texts.
+
+    Returns:
+        list: The sentiment polarity score of each text, in input order.
+    """
+    from textblob.en.sentiments import PatternAnalyzer
+
+    analyzer = PatternAnalyzer()
+    return [analyzer.analyze(text).polarity for text in texts]
+
+def score_sentiment_parallel(texts, n_workers=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Scores texts in batches across a pool of worker processes.
+
+    Args:
+        texts (list): The input texts.
+        n_workers (int, optional): The number of worker processes. Defaults to the
+                                   number of CPUs. With one worker the batches are
+                                   scored in the current process.
+        batch_size (int): The number of texts per batch.
+
+    Returns:
+        list: The sentiment polarity score of each text, in input order.
+    """
+    texts = list(texts)
+    n_workers = n_workers or os.cpu_count() or 1
+    batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+
+    if n_workers == 1 or len(batches) <= 1:
+        return [score for batch in batches for score in calculate_sentiment_batch(batch)]
+
+    #`map` returns the batch results in submission order, which keeps the scores aligned
+    with ProcessPoolExecutor(max_workers=min(n_workers, len(batches))) as executor:
+        results = executor.map(calculate_sentiment_batch, batches)
+        return [score for batch_scores in results for score in batch_scores]
+
+def add_sentiment_column(df, text_column='Headline', n_workers=None, batch_size=DEFAULT_BATCH_SIZE, cache=None,
+                         scorer='textblob'):
     """
     Adds a 'Sentiment' column to the DataFrame.
 
     Args:
         df (pandas.DataFrame): The input DataFrame.
         text_column (str): The name of the text column to analyse.
+        n_workers (int, optional): When given, scores the column in batches across this
+                                   many worker processes (see `score_sentiment_parallel`).
+                                   Defaults to None, which scores row by row.
+        batch_size (int): The number of texts per batch in multi-process mode.
+        cache (SentimentCache, optional): When given, only headlines missing from the
+                                          cache are scored. Defaults to None.
+        scorer (str): 'textblob' for TextBlob polarity, or 'lexicon' for the vectorised
+                      lexicon scorer (see `lexicon_sentiment.LexiconScorer`), which scores
+                      the whole column at once and ignores `n_workers`.
 
     Returns:
         pandas.DataFrame: The DataFrame with the added 'Sentiment' column.
     """
+    if scorer not in SCORERS:
+        raise ValueError(f"Unknown sentiment scorer '{scorer}'. Choose from {SCORERS}.")
+
+    if scorer == lexicon_sentiment.SCORER_NAME:
+        lexicon_scorer = lexicon_sentiment.get_lexicon_scorer()
+        if cache is not None:
+            df['Sentiment'] = cache.score(df[text_column].tolist(), lexicon_scorer.score,
+                                          lexicon_sentiment.SCORER_NAME, lexicon_sentiment.SCORER_VERSION)
+        else:
+            df['Sentiment'] = lexicon_scorer.score(df[text_column].tolist())
+        return df
+
+    if cache is not None:
+        def score_batch(texts):
+            return score_sentiment_parallel(texts, n_workers=n_workers or 1, batch_size=batch_size)
+
+        df['Sentiment'] = cache.score(df[text_column].tolist(), score_batch, SCORER_NAME, SCORER_VERSION)
+        return df
+
+    if n_workers:
+        df['Sentiment'] = score_sentiment_parallel(df[text_column].tolist(), n_workers=n_workers,
+                                                   batch_size=batch_size)
+        return df
+
     df['Sentiment'] = df[text_column].apply(calculate_sentiment)
-    return df
\ No newline at end of file
+    return df
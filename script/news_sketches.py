@@ -0,0 +1,565 @@
+#important python libraries
+import numpy as np
+import pandas as pd
+
+from . import news_data_loader
+
+#columns summarised by the sketches; 'Domain' is derived from 'Publisher'
+SKETCH_COLUMNS = ('Headline', 'Publisher', 'Domain')
+
+#value of 'Domain' for publishers that are not email addresses
+NOT_AN_EMAIL = 'Not an email'
+
+#HyperLogLog registers are 2**precision bytes; the relative error is about 1.04 / sqrt(2**precision)
+HLL_PRECISION = 14
+
+#count-min table of depth x width counters; estimates exceed the true count by at most
+#e / width of the total with probability 1 - exp(-depth)
+CMS_WIDTH = 4096
+CMS_DEPTH = 4
+
+#number of candidates kept by each space-saving summary
+TOP_CAPACITY = 1000
+
+_UINT64 = np.uint64
+
+def _hash_values(values):
+    """
+    Returns the 64-bit hashes of the non-missing values.
+
+    `pandas.util.hash_array` uses a fixed key, so the same value hashes the same in
+    every process and sketches built by different workers can be merged. Categoricals
+    are hashed through their categories, consistently with the plain values.
+    """
+    values = pd.Series(values).dropna()
+    if values.empty:
+        return np.empty(0, dtype=_UINT64)
+    return pd.util.hash_array(values.array if isinstance(values.dtype, pd.CategoricalDtype)
+                              else values.to_numpy(dtype=object))
+
+def _bit_length(words):
+    """
+    Returns the number of significant bits of each unsigned 64-bit word.
+    """
+    words = words.copy()
+    lengths = np.zeros(len(words), dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = words >= (_UINT64(1) << _UINT64(shift))
+        lengths[high] += shift
+        words[high] >>= _UINT64(shift)
+    return lengths + (words > 0)
+
+class HyperLogLog:
+    def __init__(self, precision=HLL_PRECISION):
+        """
+        Estimates the number of distinct values in a stream in fixed memory.
+
+        Args:
+            precision (int): The register count is 2**precision (4 to 18).
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError(f'Precision must be between 4 and 18, got {precision}.')
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes):
+        """
+        Adds values given by their 64-bit hashes (see `_hash_values`).
+        """
+        if not len(hashes):
+            return
+        p = _UINT64(self.precision)
+        buckets = (hashes >> (_UINT64(64) - p)).astype(np.intp)
+        #rank of the first set bit in the remaining 64 - p bits; a guard bit caps it
+        rest = (hashes << p) | (_UINT64(1) << (p - _UINT64(1)))
+        ranks = (65 - _bit_length(rest)).astype(np.uint8)
+        np.maximum.at(self.registers, buckets, ranks)
+
+    def add(self, values):
+        """
+        Adds an array-like of values; missing values are skipped.
+        """
+        self.add_hashes(_hash_values(values))
+
+    def merge(self, other):
+        """
+        Folds another HyperLogLog of the same precision into this one.
+
+        Returns:
+            HyperLogLog: self.
+        """
+        if other.precision != self.precision:
+            raise ValueError(f'Cannot merge precisions {self.precision} and {other.precision}.')
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        """
+        Returns the estimated number of distinct values.
+
+        Returns:
+            int: The estimate, from linear counting while many registers are still empty.
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        empty = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and empty:
+            estimate = m * np.log(m / empty)
+        return int(round(estimate))
+
+class CountMinSketch:
+    def __init__(self, width=CMS_WIDTH, depth=CMS_DEPTH):
+        """
+        Estimates how often each value occurs in a stream; estimates never fall below the true count.
+
+        Args:
+            width (int): The counters per row.
+            depth (int): The rows, each indexed by its own hash of the value.
+        """
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    def _columns(self, hashes):
+        """
+        Returns the (depth x values) counter columns of hashed values, by double hashing.
+        """
+        low, high = hashes & _UINT64(0xFFFFFFFF), (hashes >> _UINT64(32)) | _UINT64(1)
+        rows = np.arange(self.depth, dtype=_UINT64)[:, None]
+        return ((low[None, :] + rows * high[None, :]) % _UINT64(self.width)).astype(np.intp)
+
+    def add_hashes(self, hashes, counts=None):
+        """
+        Adds values given by their 64-bit hashes, each `counts` times (default once).
+        """
+        if not len(hashes):
+            return
+        for row, columns in enumerate(self._columns(hashes)):
+            self.table[row] += np.bincount(columns, weights=counts, minlength=self.width).astype(np.int64)
+
+    def add(self, values, counts=None):
+        """
+        Adds an array-like of values; missing values are skipped.
+        """
+        values = pd.Series(values)
+        present = values.notna().to_numpy()
+        if counts is not None:
+            counts = np.asarray(counts, dtype=np.float64)[present]
+        self.add_hashes(_hash_values(values), counts)
+
+    def estimate(self, values):
+        """
+        Returns the estimated count of each value.
+
+        Args:
+            values (array-like): The values to look up.
+
+        Returns:
+            numpy.ndarray: The estimates, in the order of `values`.
+        """
+        hashes = pd.util.hash_array(pd.Series(values).to_numpy(dtype=object))
+        columns = self._columns(hashes)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def merge(self, other):
+        """
+        Folds another sketch of the same shape into this one.
+
+        Returns:
+            CountMinSketch: self.
+        """
+        if self.table.shape != other.table.shape:
+            raise ValueError(f'Cannot merge sketches of shapes {self.table.shape} and {other.table.shape}.')
+        self.table += other.table
+        return self
+
+class SpaceSaving:
+    def __init__(self, capacity=TOP_CAPACITY):
+        """
+        Keeps the most frequent values of a stream in at most `capacity` counters.
+
+        Every value occurring more than total / capacity times is kept. A kept count
+        overestimates the true count by at most its error, which is at most the
+        smallest kept count.
+
+        Args:
+            capacity (int): The number of counters.
+        """
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.errors = pd.Series(dtype=np.int64)
+
+    def _floor(self):
+        """
+        Returns the count that any value missing from a full summary may have.
+        """
+        return int(self.counts.min()) if len(self.counts) >= self.capacity else 0
+
+    def _combine(self, counts, errors, floor):
+        """
+        Merges another summary given by its counts, errors and floor, then keeps the top counters.
+        """
+        own_floor = self._floor()
+        index = self.counts.index.union(counts.index)
+        combined = (self.counts.reindex(index, fill_value=own_floor)
+                    + counts.reindex(index, fill_value=floor))
+        combined_errors = (self.errors.reindex(index, fill_value=own_floor)
+                           + errors.reindex(index, fill_value=floor))
+        if len(combined) > self.capacity:
+            combined = combined.nlargest(self.capacity, keep='first')
+        self.counts = combined.astype(np.int64)
+        self.errors = combined_errors.reindex(combined.index).astype(np.int64)
+
+    def add(self, values):
+        """
+        Adds an array-like of values; missing values are skipped.
+
+        The values are counted exactly with `value_counts`, so the memory used per
+        call is bounded by the distinct values of the batch, not of the stream.
+        """
+        counts = pd.Series(values).value_counts(dropna=True)
+        counts = counts[counts > 0]
+        if counts.index.dtype != object:
+            counts.index = counts.index.astype(object)
+        self._combine(counts.astype(np.int64), pd.Series(0, index=counts.index, dtype=np.int64), 0)
+
+    def merge(self, other):
+        """
+        Folds another summary into this one, as if both streams had been read by one summary.
+
+        Returns:
+            SpaceSaving: self.
+        """
+        self._combine(other.counts, other.errors, other._floor())
+        return self
+
+    def top(self, n=5):
+        """
+        Returns the `n` values with the highest counts.
+
+        Returns:
+            pandas.Series: The counts (upper bounds), highest first.
+        """
+        return self.counts.sort_values(ascending=False, kind='stable').head(n)
+
+class ColumnSketch:
+    def __init__(self, name=None, precision=HLL_PRECISION, width=CMS_WIDTH, depth=CMS_DEPTH,
+                 capacity=TOP_CAPACITY):
+        """
+        Approximate statistics of one column: value count, distinct count and most frequent values.
+
+        Args:
+            name (str, optional): The column name, used for the returned Series.
+            precision (int): The HyperLogLog precision.
+            width (int): The count-min width.
+            depth (int): The count-min depth.
+            capacity (int): The space-saving capacity.
+        """
+        self.name = name
+        self.count = 0
+        self.distinct = HyperLogLog(precision)
+        self.frequencies = CountMinSketch(width, depth)
+        self.heavy_hitters = SpaceSaving(capacity)
+
+    def add(self, values):
+        """
+        Adds a chunk of values; missing values are skipped.
+        """
+        values = pd.Series(values)
+        hashes = _hash_values(values)
+        self.count += len(hashes)
+        self.distinct.add_hashes(hashes)
+        self.frequencies.add_hashes(hashes)
+        self.heavy_hitters.add(values)
+
+    def merge(self, other):
+        """
+        Folds the sketch of another part of the stream into this one.
+
+        Returns:
+            ColumnSketch: self.
+        """
+        self.count += other.count
+        self.distinct.merge(other.distinct)
+        self.frequencies.merge(other.frequencies)
+        self.heavy_hitters.merge(other.heavy_hitters)
+        return self
+
+    def nunique(self):
+        """
+        Returns the estimated number of distinct values, the approximate `nunique()`.
+        """
+        #the estimate can never exceed the number of values seen
+        return min(self.distinct.count(), self.count)
+
+    def value_counts(self, n=5):
+        """
+        Returns the estimated counts of the `n` most frequent values, the approximate `value_counts().head(n)`.
+
+        Each count is the lower of the space-saving and count-min estimates, which both
+        only overestimate.
+
+        Returns:
+            pandas.Series: The estimated counts, highest first.
+        """
+        candidates = self.heavy_hitters.counts
+        if candidates.empty:
+            return pd.Series(dtype=np.int64, name='count')
+        estimates = np.minimum(candidates.to_numpy(), self.frequencies.estimate(candidates.index))
+        counts = pd.Series(estimates, index=pd.Index(candidates.index, name=self.name), name='count')
+        return counts.sort_values(ascending=False, kind='stable').head(n)
+
+    def describe(self):
+        """
+        Returns the approximate `describe()` of an object column: count, unique, top and freq.
+        """
+        top = self.value_counts(1)
+        return pd.Series({'count': self.count, 'unique': self.nunique(),
+                          'top': top.index[0] if len(top) else None,
+                          'freq': int(top.iloc[0]) if len(top) else None}, name=self.name, dtype=object)
+
+class LengthHistogram:
+    def __init__(self, name=None):
+        """
+        Exact, mergeable summary of small non-negative integers such as headline lengths.
+
+        One counter per length is kept, so the memory is bounded by the longest value
+        and `describe()` (quantiles included) equals the pandas one on all the values.
+
+        Args:
+            name (str, optional): The column name, used for the returned Series.
+        """
+        self.name = name
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def add(self, lengths):
+        """
+        Adds an array-like of lengths; missing values are skipped.
+        """
+        lengths = pd.Series(lengths).dropna().to_numpy(dtype=np.int64)
+        if len(lengths):
+            self._add_counts(np.bincount(lengths))
+
+    def _add_counts(self, counts):
+        if len(counts) > len(self.counts):
+            self.counts = np.concatenate([self.counts, np.zeros(len(counts) - len(self.counts), dtype=np.int64)])
+        self.counts[:len(counts)] += counts
+
+    def merge(self, other):
+        """
+        Folds another histogram into this one.
+
+        Returns:
+            LengthHistogram: self.
+        """
+        self._add_counts(other.counts)
+        return self
+
+    def _quantile(self, q, cumulative):
+        """
+        Returns a quantile with linear interpolation between ranks, as `pandas.Series.quantile`.
+        """
+        position = q * (cumulative[-1] - 1)
+        lower, upper = np.searchsorted(cumulative, [np.floor(position), np.ceil(position)], side='right')
+        return lower + (position - np.floor(position)) * (upper - lower)
+
+    def describe(self):
+        """
+        Returns the `describe()` of the lengths: count, mean, std, min, quartiles and max.
+        """
+        n = int(self.counts.sum())
+        index = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+        if not n:
+            return pd.Series([0.0] + [np.nan] * 7, index=index, name=self.name)
+
+        lengths = np.arange(len(self.counts), dtype=np.float64)
+        mean = float((lengths * self.counts).sum()) / n
+        std = np.sqrt(float((self.counts * (lengths - mean) ** 2).sum()) / (n - 1)) if n > 1 else np.nan
+        cumulative = np.cumsum(self.counts)
+        present = np.flatnonzero(self.counts)
+        return pd.Series([n, mean, std, present[0], *(self._quantile(q, cumulative) for q in (0.25, 0.5, 0.75)),
+                          present[-1]], index=index, name=self.name, dtype=np.float64)
+
+def publisher_domains(publishers):
+    """
+    Returns the email domain of each publisher, or 'Not an email' for publishers without '@'.
+
+    Categorical publishers are split once per category instead of once per row.
+
+    Args:
+        publishers (pandas.Series): The publishers.
+
+    Returns:
+        pandas.Series: The domains, aligned with `publishers`.
+    """
+    publishers = pd.Series(publishers)
+    if isinstance(publishers.dtype, pd.CategoricalDtype):
+        #map the categories only; domains shared by several publishers make the result non-categorical
+        categories = pd.Series(publishers.cat.categories)
+        return publishers.map(dict(zip(categories, publisher_domains(categories))))
+    text = publishers.astype(str)
+    return text.str.rsplit('@', n=1).str[-1].where(text.str.contains('@', regex=False), NOT_AN_EMAIL) \
+        .where(publishers.notna())
+
+class NewsSketches:
+    def __init__(self, columns=SKETCH_COLUMNS, **sketch_options):
+        """
+        Mergeable approximate statistics of the news, per ticker and column.
+
+        Fold chunks in with `add` as they stream from the loader; sketches built by
+        different workers (they pickle like any object) are combined with `merge`.
+        The headline lengths are kept exactly in a `LengthHistogram` ('Headline_Length').
+
+        Args:
+            columns (tuple): The columns to summarise, from `SKETCH_COLUMNS`.
+            **sketch_options: Sizes passed to every `ColumnSketch`.
+        """
+        self.columns = tuple(columns)
+        self.sketch_options = sketch_options
+        self.tickers = {}
+
+    def _sketches(self, ticker):
+        if ticker not in self.tickers:
+            sketches = {column: ColumnSketch(column, **self.sketch_options) for column in self.columns}
+            sketches['Headline_Length'] = LengthHistogram('Headline_Length')
+            self.tickers[ticker] = sketches
+        return self.tickers[ticker]
+
+    def add(self, chunk, ticker=None):
+        """
+        Folds one chunk of news into the sketches.
+
+        Args:
+            chunk (pandas.DataFrame): News rows, with capitalised ('Headline') or raw
+                                      ('headline') column names.
+            ticker (str, optional): The ticker of all rows; otherwise the rows are
+                                    split by their 'Stock' column.
+
+        Returns:
+            NewsSketches: self.
+        """
+        chunk = chunk.rename(columns=str.capitalize)
+        if 'Domain' in self.columns and 'Domain' not in chunk.columns and 'Publisher' in chunk.columns:
+            chunk = chunk.assign(Domain=publisher_domains(chunk['Publisher']))
+
+        if ticker is not None:
+            groups = [(ticker, chunk)]
+        else:
+            groups = chunk.groupby('Stock', observed=True, sort=False)
+        for group_ticker, rows in groups:
+            sketches = self._sketches(group_ticker)
+            for column in self.columns:
+                if column in rows.columns:
+                    sketches[column].add(rows[column])
+            if 'Headline' in rows.columns:
+                sketches['Headline_Length'].add(rows['Headline'].str.len())
+        return self
+
+    def merge(self, other):
+        """
+        Folds the sketches of another part of the stream into these.
+
+        Returns:
+            NewsSketches: self.
+        """
+        for ticker, sketches in other.tickers.items():
+            own = self._sketches(ticker)
+            for column, sketch in sketches.items():
+                if column in own:
+                    own[column].merge(sketch)
+        return self
+
+    def select(self, ticker):
+        """
+        Returns sketches holding only one ticker (sharing its summaries), e.g. to hand to a worker.
+        """
+        selected = NewsSketches(self.columns, **self.sketch_options)
+        selected._sketches(ticker)
+        if ticker in self.tickers:
+            selected.tickers[ticker] = self.tickers[ticker]
+        return selected
+
+    def column(self, ticker, column):
+        """
+        Returns the `ColumnSketch` of one ticker and column, or the `LengthHistogram` for 'Headline_Length'.
+        """
+        if ticker not in self.tickers:
+            raise KeyError(f'No news sketched for ticker {ticker!r}.')
+        return self.tickers[ticker][column]
+
+def sketch_frame(df, ticker, chunksize=100_000, **sketch_options):
+    """
+    Sketches the news of one ticker chunk by chunk.
+
+    Args:
+        df (pandas.DataFrame): The news of the ticker.
+        ticker (str): The stock ticker symbol.
+        chunksize (int): The rows folded in at a time.
+        **sketch_options: Sizes passed to every `ColumnSketch`.
+
+    Returns:
+        NewsSketches: The sketches of the ticker.
+    """
+    sketches = NewsSketches(**sketch_options)
+    columns = [column for column in ('Headline', 'Publisher') if column in df.columns]
+    for start in range(0, len(df), chunksize):
+        sketches.add(df[columns].iloc[start:start + chunksize], ticker=ticker)
+    if not len(df):
+        sketches._sketches(ticker)
+    return sketches
+
+def _sketch_chunk(chunk, sketch_options):
+    """
+    Pool task: sketches one chunk of news.
+    """
+    return NewsSketches(**sketch_options).add(chunk)
+
+def sketch_news_file(file_path, tickers, chunksize=100_000, n_workers=None, **sketch_options):
+    """
+    Streams the raw news file once and sketches every ticker, never holding the file in memory.
+
+    With several workers the chunks are sketched on a process pool and the partial
+    sketches are merged as they finish; at most two chunks per worker are in flight.
+
+    Args:
+        file_path (str): The path to the raw data CSV file.
+        tickers (list): A list of stock ticker symbols.
+        chunksize (int): The number of raw rows read per chunk.
+        n_workers (int, optional): The number of worker processes. Defaults to None,
+                                   which sketches in this process.
+        **sketch_options: Sizes passed to every `ColumnSketch`.
+
+    Returns:
+        NewsSketches: The sketches of all tickers, or None if the file could not be read.
+    """
+    sketches = NewsSketches(**sketch_options)
+    chunks = news_data_loader.iter_filtered_chunks(file_path, tickers, chunksize=chunksize,
+                                                   columns=['headline', 'publisher', 'stock'])
+    try:
+        if not n_workers or n_workers < 2:
+            for chunk in chunks:
+                sketches.add(chunk)
+        else:
+            from collections import deque
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(executor.submit(_sketch_chunk, chunk, sketch_options))
+                    if len(pending) >= 2 * n_workers:
+                        sketches.merge(pending.popleft().result())
+                while pending:
+                    sketches.merge(pending.popleft().result())
+    except FileNotFoundError:
+        print(f"Error: The file path '{file_path}' was not found.")
+        return None
+    except Exception as e:
+        print(f'An error occurred while sketching file: {e}')
+        return None
+
+    #tickers without news still get (empty) sketches
+    for ticker in tickers:
+        sketches._sketches(ticker)
+    return sketches
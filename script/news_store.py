@@ -0,0 +1,121 @@
+#important python libraries
+import pandas as pd
+import os
+
+#default location of the partitioned news store, relative to the working directory
+STORE_FOLDER = os.path.join('data', 'news_store')
+
+#partition layout of the store: one directory per ticker, then one per year
+PARTITION_COLUMNS = ['Stock', 'Year']
+
+def build_news_store(stock_news, store_folder=STORE_FOLDER):
+    """
+    Writes the filtered news DataFrame to a Parquet store partitioned by ticker and year.
+
+    The layout is `Stock=<ticker>/Year=<year>/*.parquet`. Partitions present in
+    `stock_news` are replaced; partitions for other tickers or years are kept, so the
+    store can be updated one ticker at a time.
+
+    Args:
+        stock_news (pandas.DataFrame): The output of `news_data_loader.load_and_filter_data`
+                                       (optionally with a 'Sentiment' column).
+        store_folder (str): The root folder of the store.
+
+    Returns:
+        str: The root folder of the store.
+    """
+    if stock_news is None:
+        print('Input DataFrame is None. Skipping.')
+        return None
+
+    if not os.path.exists(store_folder):
+        os.makedirs(store_folder)
+
+    #rows without a parsed date have no year partition and are left out
+    partitioned = stock_news[stock_news['Date'].notna()]
+
+    #add the year partition key without touching the caller's frame
+    partitioned = partitioned.assign(Year=partitioned['Date'].dt.year.astype('int32'))
+
+    partitioned.to_parquet(store_folder, partition_cols=PARTITION_COLUMNS, index=False,
+                           existing_data_behavior='delete_matching')
+
+    #calculate the relative path
+    current_directory = os.getcwd()
+    relative_store_path = os.path.relpath(store_folder, current_directory)
+
+    print(f'News store saved to: {relative_store_path}\n')
+    return store_folder
+
+def query_news(ticker, start_date=None, end_date=None, columns=None, store_folder=STORE_FOLDER):
+    """
+    Reads the news for one ticker and date window from the partitioned store.
+
+    Only the partitions for the ticker and the years overlapping the window are read;
+    rows are then trimmed to the exact dates.
+
+    Args:
+        ticker (str): The stock ticker symbol.
+        start_date (str, optional): The first date to include (YYYY-MM-DD). Defaults to None.
+        end_date (str, optional): The last date to include (YYYY-MM-DD), inclusive of the
+                                  whole day. Defaults to None.
+        columns (list, optional): The columns to read. Defaults to all columns.
+        store_folder (str): The root folder of the store.
+
+    Returns:
+        pandas.DataFrame: The news for the ticker, oldest first, or None if the store
+                          does not exist.
+    """
+    if not os.path.exists(store_folder):
+        print(f"Error: The news store '{store_folder}' was not found.")
+        return None
+
+    #partition filters let pyarrow skip every other ticker and year directory
+    filters = [('Stock', '=', ticker)]
+    if start_date is not None:
+        filters.append(('Year', '>=', pd.Timestamp(start_date).year))
+    if end_date is not None:
+        filters.append(('Year', '<=', pd.Timestamp(end_date).year))
+
+    read_columns = None
+    if columns is not None:
+        read_columns = list(dict.fromkeys(list(columns) + ['Date']))
+
+    news = pd.read_parquet(store_folder, columns=read_columns, filters=filters)
+    news = news.drop(columns=['Year'], errors='ignore')
+    if 'Stock' in news.columns:
+        news['Stock'] = news['Stock'].astype('object')
+
+    news = filter_by_date(news, start_date, end_date)
+    news = news.sort_values('Date', kind='stable').reset_index(drop=True)
+
+    if columns is not None:
+        news = news[list(columns)]
+    return news
+
+def filter_by_date(df, start_date=None, end_date=None, date_column='Date'):
+    """
+    Keeps the rows of a DataFrame whose date falls within a window.
+
+    Dates are compared at day level, so `end_date` includes the whole day, and
+    time-zone-aware columns are compared in their own time zone.
+
+    Args:
+        df (pandas.DataFrame): The input DataFrame.
+        start_date (str, optional): The first date to include (YYYY-MM-DD). Defaults to None.
+        end_date (str, optional): The last date to include (YYYY-MM-DD). Defaults to None.
+        date_column (str): The name of the datetime column.
+
+    Returns:
+        pandas.DataFrame: The filtered DataFrame.
+    """
+    if start_date is None and end_date is None:
+        return df
+
+    days = pd.to_datetime(df[date_column]).dt.tz_localize(None).dt.normalize()
+    mask = pd.Series(True, index=df.index)
+    if start_date is not None:
+        mask &= days >= pd.Timestamp(start_date).normalize()
+    if end_date is not None:
+        mask &= days <= pd.Timestamp(end_date).normalize()
+    return df[mask]
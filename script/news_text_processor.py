@@ -1,28 +1,153 @@
 #important python libraries
+import re
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 
 #for text modelling
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
-import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.decomposition import LatentDirichletAllocation
-
-#download necessary NLTK data
-nltk.download('punkt', quiet=True)              #splits text
-nltk.download('stopwords', quiet=True)          #removes common words like 'a', 'is', 'the', 'in'
-nltk.download('wordnet', quiet=True)            #identifies synonyms
-
-#load spacy English model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    print("Downloading spacy model 'en_core_web_sm'...")
-    from spacy.cli import download
-    download("en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
+#NLTK data, the spaCy model and scikit-learn are loaded on first use (see `nlp_resources`)
+from . import nlp_resources
+
+#characters dropped by preprocessing: `\w` is `str.isalnum()` plus '_', `\s` is `str.isspace()`
+NON_ALNUM_PATTERN = re.compile(r'[^\w\s]|_')
+
+#once punctuation is stripped, these are the only inputs NLTK's word tokenizer does not
+#simply split on whitespace ("cannot" -> "can not", "gonna" -> "gon na", ...)
+SPLIT_CONTRACTIONS_PATTERN = re.compile(r'(?i)\b(?:cannot|gimme|gonna|gotta|lemme)\b|\bwanna(?=\s|$)')
+
+#default number of texts per task in multi-process preprocessing
+DEFAULT_BATCH_SIZE = 10_000
+
+#pipeline components named-entity recognition needs; the rest are disabled in corpus mode
+NER_COMPONENTS = ('tok2vec', 'ner', 'entity_ruler')
+
+#default number of texts spaCy processes per batch in corpus mode
+NER_BATCH_SIZE = 1_000
+
+class TextPreprocessor:
+    def __init__(self, language='english'):
+        """
+        Initialise the preprocessor, building the stop word set and lemmatizer once.
+
+        Args:
+            language (str): The NLTK stop word list to use.
+        """
+        self.stop_words = frozenset(nlp_resources.get_stopwords(language))
+        self.lemmatizer = nlp_resources.get_lemmatizer()
+        self.lemmas = {} #memoised lemma lookups
+
+    def lemmatize(self, word):
+        """
+        Returns the WordNet lemma of a word, memoised per preprocessor.
+
+        Args:
+            word (str): The input word.
+
+        Returns:
+            str: The lemma.
+        """
+        lemma = self.lemmas.get(word)
+        if lemma is None:
+            lemma = self.lemmatizer.lemmatize(word)
+            self.lemmas[word] = lemma
+        return lemma
+
+    def tokenize(self, text):
+        """
+        Tokenizes text that only contains alphanumeric characters and whitespace.
+
+        Gives the same tokens as `word_tokenize` for such text, calling it only
+        when a contraction it splits is present.
+
+        Args:
+            text (str): The cleaned, lowercase text.
+
+        Returns:
+            list: The tokens.
+        """
+        if SPLIT_CONTRACTIONS_PATTERN.search(text):
+            return nlp_resources.word_tokenize(text)
+        return text.split()
+
+    def process_clean_text(self, text):
+        """
+        Removes stop words from and lemmatizes cleaned, lowercase text.
+
+        Args:
+            text (str): The cleaned, lowercase text.
+
+        Returns:
+            str: The processed text.
+        """
+        stop_words = self.stop_words
+        return ' '.join([self.lemmatize(word) for word in self.tokenize(text) if word not in stop_words])
+
+    def preprocess(self, text):
+        """
+        Preprocesses one text; the output is identical to `preprocess_text`.
+
+        Args:
+            text (str): The input text.
+
+        Returns:
+            str: The processed text.
+        """
+        if pd.isna(text):
+            return ""
+        return self.process_clean_text(NON_ALNUM_PATTERN.sub('', str(text).lower()))
+
+    def preprocess_many(self, texts, n_workers=None, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Preprocesses a column of texts; the output is identical to applying `preprocess_text`.
+
+        Lowercasing and character filtering run as vectorised string operations, and
+        each unique cleaned text is tokenized, filtered and lemmatized only once.
+
+        Args:
+            texts (list or pandas.Series): The input texts.
+            n_workers (int, optional): When greater than one, unique texts are processed
+                                       in batches across this many worker processes.
+                                       Defaults to None (current process).
+            batch_size (int): The number of unique texts per batch in multi-process mode.
+
+        Returns:
+            list: The processed texts, in input order.
+        """
+        texts = pd.Series(texts, dtype='object').reset_index(drop=True)
+        missing = texts.isna()
+        cleaned = texts[~missing].astype(str).str.lower().str.replace(NON_ALNUM_PATTERN, '', regex=True)
+
+        unique = pd.unique(cleaned.to_numpy()).tolist()
+        if n_workers and n_workers > 1 and len(unique) > batch_size:
+            batches = [unique[start:start + batch_size] for start in range(0, len(unique), batch_size)]
+            with ProcessPoolExecutor(max_workers=min(n_workers, len(batches))) as executor:
+                processed = [text for batch in executor.map(_process_clean_batch, batches) for text in batch]
+        else:
+            processed = [self.process_clean_text(text) for text in unique]
+
+        result = pd.Series('', index=texts.index, dtype='object')
+        result[~missing] = cleaned.map(dict(zip(unique, processed)))
+        return result.tolist()
+
+_default_preprocessor = None
+
+def get_text_preprocessor():
+    """
+    Returns the process-wide text preprocessor, building it on first use.
+
+    Returns:
+        TextPreprocessor: The shared preprocessor.
+    """
+    global _default_preprocessor
+    if _default_preprocessor is None:
+        _default_preprocessor = TextPreprocessor()
+    return _default_preprocessor
+
+def _process_clean_batch(texts):
+    """
+    Worker task: processes a batch of cleaned texts with the worker's preprocessor.
+    """
+    preprocessor = get_text_preprocessor()
+    return [preprocessor.process_clean_text(text) for text in texts]
 
 def preprocess_text(text):
     """
@@ -35,16 +160,21 @@ def preprocess_text(text):
     Returns:
         str: The processed text.
     """
-    if pd.isna(text):
-        return ""
-    text = str(text).lower()
-    text = ''.join([char for char in text if char.isalnum() or char.isspace()])
-    tokens = word_tokenize(text)
-    stop_words = set(stopwords.words('english'))
-    tokens = [word for word in tokens if word not in stop_words]
-    lemmatizer = WordNetLemmatizer()
-    tokens = [lemmatizer.lemmatize(word) for word in tokens]
-    return ' '.join(tokens)
+    return get_text_preprocessor().preprocess(text)
+
+def preprocess_texts(texts, n_workers=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Preprocesses a list of texts in one batch (see `TextPreprocessor.preprocess_many`).
+
+    Args:
+        texts (list or pandas.Series): The input texts.
+        n_workers (int, optional): The number of worker processes. Defaults to None.
+        batch_size (int): The number of unique texts per batch in multi-process mode.
+
+    Returns:
+        list: The processed texts, in input order.
+    """
+    return get_text_preprocessor().preprocess_many(texts, n_workers=n_workers, batch_size=batch_size)
 
 def calculate_tfidf(text_data, max_features=1000, ngram_range=(1, 2)): #considerd unigrams and bigrams
     """
@@ -58,6 +188,8 @@ def calculate_tfidf(text_data, max_features=1000, ngram_range=(1, 2)): #consider
     Returns:
         tuple: tfidf_matrix, feature_names
     """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
     #calculate Term Frequency-Inverse Document Frequency (TF-IDF) to identify important terms
     #initalise tfidf_vectorizer for upto 1000 single words and two-word phrases 
     tfidf_vectorizer = TfidfVectorizer(max_features=max_features, ngram_range=ngram_range)
@@ -81,6 +213,8 @@ def perform_lda_topic_modeling(tfidf_matrix, feature_names, num_topics=10):
     Returns:
         list: A list of top words for each topic.
     """
+    from sklearn.decomposition import LatentDirichletAllocation
+
     #topic Modeling with LDA
     lda = LatentDirichletAllocation(n_components=num_topics, random_state=42)
     lda.fit(tfidf_matrix)
@@ -104,6 +238,8 @@ def perform_ner(text_data, num_samples=10):
     Returns:
         list: A list of entities for each processed document.
     """
+    nlp = nlp_resources.get_spacy_model()
+
     print('\nNamed Entities:')
     entities_list = []
     for i, text in enumerate(text_data[:num_samples]):
@@ -115,4 +251,65 @@ def perform_ner(text_data, num_samples=10):
         else:
             print(f'Article {i + 1}: No named entities found.')
             entities_list.append([])
-    return entities_list
\ No newline at end of file
+    return entities_list
+
+def iter_entities(text_data, doc_ids=None, batch_size=NER_BATCH_SIZE, n_process=1):
+    """
+    Streams the named entities of a corpus with `nlp.pipe`.
+
+    Pipeline components outside `NER_COMPONENTS` (tagger, parser, lemmatizer, ...)
+    are disabled, so only the work needed for entities is done.
+
+    Args:
+        text_data (list): The text documents.
+        doc_ids (list, optional): An id for each document. Defaults to the document's position.
+        batch_size (int): The number of texts spaCy processes per batch.
+        n_process (int): The number of worker processes spaCy uses.
+
+    Yields:
+        tuple: `(doc_id, text, label, start_char, end_char)` for each entity, in document order.
+    """
+    nlp = nlp_resources.get_spacy_model()
+    disable = [name for name in nlp.pipe_names if name not in NER_COMPONENTS]
+    if doc_ids is None:
+        doc_ids = range(len(text_data))
+
+    #`as_tuples` carries each document's id through the (possibly multi-process) pipeline
+    docs = nlp.pipe(zip(text_data, doc_ids), as_tuples=True, batch_size=batch_size,
+                    n_process=n_process, disable=disable)
+    for doc, doc_id in docs:
+        for ent in doc.ents:
+            yield doc_id, ent.text, ent.label_, ent.start_char, ent.end_char
+
+def extract_entities(text_data, doc_ids=None, batch_size=NER_BATCH_SIZE, n_process=1):
+    """
+    Extracts the named entities of a whole corpus into a compact entity table.
+
+    Args:
+        text_data (list): The text documents.
+        doc_ids (list, optional): An id for each document, e.g. the DataFrame index.
+                                  Defaults to the document's position.
+        batch_size (int): The number of texts spaCy processes per batch.
+        n_process (int): The number of worker processes spaCy uses.
+
+    Returns:
+        pandas.DataFrame: One row per entity with 'Doc_ID', 'Text', 'Label',
+                          'Start_Char' and 'End_Char' columns; 'Text' and 'Label'
+                          are categorical and the offsets are int32.
+    """
+    text_data = list(text_data)
+    columns = ['Doc_ID', 'Text', 'Label', 'Start_Char', 'End_Char']
+    entities = pd.DataFrame(iter_entities(text_data, doc_ids=doc_ids, batch_size=batch_size,
+                                          n_process=n_process), columns=columns)
+
+    #entity texts and labels repeat heavily across headlines
+    return entities.astype({'Text': 'category', 'Label': 'category',
+                            'Start_Char': 'int32', 'End_Char': 'int32'})
+
+def __getattr__(name):
+    """
+    Keeps `news_text_processor.nlp` available, loading the spaCy model on first access.
+    """
+    if name == 'nlp':
+        return nlp_resources.get_spacy_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
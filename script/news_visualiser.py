@@ -1,37 +1,12 @@
 #important python libraries
 import pandas as pd
-import os
 
-#for visualisation
-import matplotlib.pyplot as plt
-import seaborn as sns
+from . import plot_renderer
+from . import decimation
+from . import publication_calendar
 
 
-def save_plot(plot_folder, plot_name, plot_path):
-    """
-    Saves the current matplotlib plot to a specified location.
-
-    Args:
-        plot_folder (str): The folder to save the plot.
-        plot_name (str): The name of the plot file.
-        plot_path (str): The full path to save the plot.
-    """
-    
-    #create the directory if it doesn't exist
-    if not os.path.exists(plot_folder):
-        os.makedirs(plot_folder)
-    
-    #save plot
-    plt.savefig(plot_path)
-
-    #calculate the relative path
-    current_directory = os.getcwd()
-    relative_plot_path = os.path.relpath(plot_path, current_directory)
-
-    #display message
-    print(f'\nPlot is saved to {relative_plot_path}.\n')
-
-def plot_publication_frequency_by_day(df, ticker, plot_folder):
+def plot_publication_frequency_by_day(df, ticker, plot_folder, calendar=None):
     """
     Plots and saves the publication frequency by day of the week.
 
@@ -39,35 +14,26 @@ def plot_publication_frequency_by_day(df, ticker, plot_folder):
         df (pandas.DataFrame): The input DataFrame.
         ticker (str): The stock ticker symbol.
         plot_folder (str): The folder to save the plot.
+        calendar (publication_calendar.PublicationCalendar, optional): The publication counts of `df`
+            from `publication_calendar.aggregate_publications`; computed here if not given.
     """
     #analyse publication dates
-    df['Publication_Day'] = df['Date'].dt.day_name()
+    #counted from the integer-encoded timestamps; no day-name column is added to df
+    if calendar is None:
+        calendar = publication_calendar.aggregate_publications(df, ticker_column=None)
+    publication_day_counts = calendar.day_of_week_counts()
     print("\nPublication trends by day of the week:")
-    print(df['Publication_Day'].value_counts())
-
-    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    publication_day_counts = df['Publication_Day'].value_counts().reindex(day_order)
+    print(publication_day_counts.sort_values(ascending=False, kind='stable'))
 
     #plot publication dates and save plot image 
-    plt.figure(figsize=(10, 6))
-    sns.barplot(x=publication_day_counts.index, y=publication_day_counts.values,
-                hue=publication_day_counts.index, palette='viridis', legend=False)
-    plt.title(f'{ticker} - Number of Publications by Day of the Week')
-    plt.xlabel('Day of the Week')
-    plt.ylabel('Number of Publications')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-
     #select plot directory and plot name to save plot
     plot_name = f'{ticker} - Number of Publications by Day of the Week.png'
-    plot_path = os.path.join(plot_folder, plot_name)
-    save_plot(plot_folder, plot_name, plot_path)
-
-    #show plot
-    plt.show()
-
-    #close plot to free up memory
-    plt.close()
+    plot_renderer.draw(plot_renderer.make_spec(
+        plot_folder, plot_name,
+        [{'kind': 'barplot', 'x': publication_day_counts.index, 'y': publication_day_counts.values,
+          'hue': publication_day_counts.index, 'palette': 'viridis', 'legend': False}],
+        figsize=(10, 6), title=f'{ticker} - Number of Publications by Day of the Week',
+        xlabel='Day of the Week', ylabel='Number of Publications', xticks_rotation=45, tight_layout=True))
 
 def plot_sentiment_distribution(df, ticker, plot_folder):
     """
@@ -79,24 +45,14 @@ def plot_sentiment_distribution(df, ticker, plot_folder):
         plot_folder (str): The folder to save the plot.
     """
     #plot the distribution of sentiment scores
-    plt.figure(figsize=(8, 4))
-    sns.histplot(df['Sentiment'], bins=20, kde=True)
-    plt.title(f'{ticker} - Distribution of Sentiment Scores Headlines')
-    plt.xlabel('Sentiment Polarity')
-    plt.ylabel('Frequency')
-    plt.gca().spines[['top', 'right']].set_visible(False)
-
     plot_name = f'{ticker} - Distribution of Sentiment Scores Headlines.png'
-    plot_path = os.path.join(plot_folder, plot_name)
-    save_plot(plot_folder, plot_name, plot_path)
-    
-    #show plot
-    plt.show()
-    
-    #close plot to free up memory
-    plt.close()
-
-def plot_daily_publication_frequency(df, ticker, plot_folder):
+    plot_renderer.draw(plot_renderer.make_spec(
+        plot_folder, plot_name,
+        [{'kind': 'histplot', 'values': df['Sentiment'], 'bins': 20, 'kde': True}],
+        figsize=(8, 4), title=f'{ticker} - Distribution of Sentiment Scores Headlines',
+        xlabel='Sentiment Polarity', ylabel='Frequency', hide_spines=['top', 'right']))
+
+def plot_daily_publication_frequency(df, ticker, plot_folder, calendar=None):
     """
     Plots and saves the daily article publication frequency.
 
@@ -104,31 +60,25 @@ def plot_daily_publication_frequency(df, ticker, plot_folder):
         df (pandas.DataFrame): The input DataFrame.
         ticker (str): The stock ticker symbol.
         plot_folder (str): The folder to save the plot.
+        calendar (publication_calendar.PublicationCalendar, optional): The publication counts of `df`
+            from `publication_calendar.aggregate_publications`; computed here if not given.
     """
     ##plot and save the daily publication frequency
-    daily_publications = df.resample('D', on='Date').size()
+    if calendar is None:
+        calendar = publication_calendar.aggregate_publications(df, ticker_column=None)
+    daily_publications = calendar.daily_counts()
 
-    #plot
-    plt.figure(figsize=(12, 6))
-    daily_publications.plot()
-    plt.title(f'{ticker} - Daily Article Publication Frequency')
-    plt.xlabel('Date')
-    plt.ylabel('Number of Articles')
-    plt.grid()
+    #long histories are reduced to a shape-preserving sample of days
+    daily_publications = decimation.decimate_series(daily_publications)
 
+    #plot
     plot_name = f'{ticker} - Daily Article Publication Frequency.png'
-    plot_path = os.path.join(plot_folder, plot_name)
+    plot_renderer.draw(plot_renderer.make_spec(
+        plot_folder, plot_name, [{'kind': 'series', 'series': daily_publications}],
+        figsize=(12, 6), title=f'{ticker} - Daily Article Publication Frequency',
+        xlabel='Date', ylabel='Number of Articles', grid=True))
 
-    #save plot
-    save_plot(plot_folder, plot_name, plot_path)
-
-    #show plot
-    plt.show()
-
-    #close plot to free up space
-    plt.close()
-
-def plot_hourly_publication_frequency_zero_hour(df, ticker, plot_folder):
+def plot_hourly_publication_frequency_zero_hour(df, ticker, plot_folder, calendar=None):
     """
     Plots and saves the hourly publication frequency for the 00:00 hour.
 
@@ -136,41 +86,30 @@ def plot_hourly_publication_frequency_zero_hour(df, ticker, plot_folder):
         df (pandas.DataFrame): The input DataFrame.
         ticker (str): The stock ticker symbol.
         plot_folder (str): The folder to save the plot.
+        calendar (publication_calendar.PublicationCalendar, optional): The publication counts of `df`
+            from `publication_calendar.aggregate_publications`; computed here if not given.
     """
-    #extract the hour from the datetime column
-    df['Publication_Hour'] = pd.to_datetime(df['Date']).dt.hour
-
-    #filter data for 00:00
-    zero_hour_data = df[df['Publication_Hour'] == 0]
+    #count the articles per hour of the datetime column
+    if calendar is None:
+        calendar = publication_calendar.aggregate_publications(df, ticker_column=None)
 
     #calculate and print the count of articles published at 00:00
-    zero_hour_count = len(zero_hour_data)
+    zero_hour_count = int(calendar.hour_counts()[0])
     print(f'\nNumber of articles published at 00:00 is {zero_hour_count}\n')
 
     #plot for 00:00
     #Create a small DataFrame 
     plot_data = pd.DataFrame({'hour': ['00:00'], 'count': [zero_hour_count]})
 
-    plt.figure(figsize=(6, 4))
-    sns.barplot(x='hour', y='count', data=plot_data, hue='hour', palette='viridis', legend=False)
-    plt.title(f'{ticker} - Article Publishing Frequency at 00:00 Hour')
-    plt.xlabel('Time of Day')
-    plt.ylabel('Number of Articles')
-    plt.grid()
-
     plot_name = f'{ticker} - Article Publishing Frequency at 00 00 Hour.png'
-    plot_path = os.path.join(plot_folder, plot_name)
-    
-    #save plot
-    save_plot(plot_folder, plot_name, plot_path)
-
-    #show plot
-    plt.show()
-
-    #close plot to free up space
-    plt.close()
-
-def plot_hourly_publication_frequency_other_hours(df, ticker, plot_folder):
+    plot_renderer.draw(plot_renderer.make_spec(
+        plot_folder, plot_name,
+        [{'kind': 'barplot', 'x': plot_data['hour'], 'y': plot_data['count'], 'hue': plot_data['hour'],
+          'palette': 'viridis', 'legend': False}],
+        figsize=(6, 4), title=f'{ticker} - Article Publishing Frequency at 00:00 Hour',
+        xlabel='Time of Day', ylabel='Number of Articles', grid=True))
+
+def plot_hourly_publication_frequency_other_hours(df, ticker, plot_folder, calendar=None):
     """
     Plots and saves the hourly publication frequency for hours other than 00:00.
 
@@ -178,31 +117,21 @@ def plot_hourly_publication_frequency_other_hours(df, ticker, plot_folder):
         df (pandas.DataFrame): The input DataFrame.
         ticker (str): The stock ticker symbol.
         plot_folder (str): The folder to save the plot.
+        calendar (publication_calendar.PublicationCalendar, optional): The publication counts of `df`
+            from `publication_calendar.aggregate_publications`; computed here if not given.
     """
-    #extract the hour from the datetime column
-    df['Publication_Hour'] = pd.to_datetime(df['Date']).dt.hour
+    #count the articles per hour of the datetime column
+    if calendar is None:
+        calendar = publication_calendar.aggregate_publications(df, ticker_column=None)
 
-    #plot for 00:00
     #Count articles per hour for other times
-    other_hours_data = df[df['Publication_Hour'] != 0]
-    hourly_counts = other_hours_data['Publication_Hour'].value_counts().sort_index()
-
-    plt.figure(figsize=(14, 6))
-    sns.barplot(x=hourly_counts.index, y=hourly_counts.values,
-                hue=hourly_counts.index, palette='viridis', legend=False)
-    plt.title(f'{ticker} - Article Publishing Frequency Hours (Excluding 00:00 Hour)')
-    plt.xlabel('Hour of Day')
-    plt.ylabel('Number of Articles')
-    plt.grid()
+    hourly_counts = calendar.hour_counts().iloc[1:]
+    hourly_counts = hourly_counts[hourly_counts > 0]
 
     plot_name = f'{ticker} - Article Publishing Frequency Hours (Excluding 00 00 Hour).png'
-    plot_path = os.path.join(plot_folder, plot_name)
-
-    #save plot
-    save_plot(plot_folder, plot_name, plot_path)
-
-    #show plot
-    plt.show()
-
-    #close plot to free up space
-    plt.close()
\ No newline at end of file
+    plot_renderer.draw(plot_renderer.make_spec(
+        plot_folder, plot_name,
+        [{'kind': 'barplot', 'x': hourly_counts.index, 'y': hourly_counts.values, 'hue': hourly_counts.index,
+          'palette': 'viridis', 'legend': False}],
+        figsize=(14, 6), title=f'{ticker} - Article Publishing Frequency Hours (Excluding 00:00 Hour)',
+        xlabel='Hour of Day', ylabel='Number of Articles', grid=True))
@@ -0,0 +1,179 @@
+#important python libraries
+import os
+import threading
+
+#NLTK resources used by the project and where `nltk.data.find` looks for them
+NLTK_RESOURCES = {
+    'punkt': 'tokenizers/punkt',            #splits text
+    'punkt_tab': 'tokenizers/punkt_tab',    #punkt tables used by `word_tokenize` in NLTK >= 3.9
+    'stopwords': 'corpora/stopwords',       #removes common words like 'a', 'is', 'the', 'in'
+    'wordnet': 'corpora/wordnet',           #identifies synonyms
+}
+
+#default spaCy English model
+SPACY_MODEL = 'en_core_web_sm'
+
+#environment variable that turns on offline mode for every process that reads it
+OFFLINE_ENV_VAR = 'NLP_OFFLINE'
+
+_offline = None
+_resources = {}
+_lock = threading.RLock()
+
+def set_offline_mode(offline=True):
+    """
+    Turns offline mode on or off for the current process.
+
+    In offline mode a missing resource raises `LookupError` straight away instead of
+    being downloaded. Without a call to this function the mode is read from the
+    `NLP_OFFLINE` environment variable ('1', 'true' or 'yes').
+
+    Args:
+        offline (bool): Whether to forbid downloads.
+    """
+    global _offline
+    _offline = bool(offline)
+
+def is_offline():
+    """
+    Returns whether offline mode is on for the current process.
+
+    Returns:
+        bool: True if downloads are forbidden.
+    """
+    if _offline is not None:
+        return _offline
+    return os.environ.get(OFFLINE_ENV_VAR, '').strip().lower() in ('1', 'true', 'yes')
+
+def _get_or_load(key, loader):
+    """
+    Returns a cached resource, loading it once per process under a lock.
+    """
+    if key in _resources:
+        return _resources[key]
+    with _lock:
+        if key not in _resources:
+            _resources[key] = loader()
+    return _resources[key]
+
+def ensure_nltk_resource(name):
+    """
+    Makes sure an NLTK data package is available, downloading it once if needed.
+
+    Args:
+        name (str): The package name, e.g. 'stopwords' (see `NLTK_RESOURCES`).
+
+    Returns:
+        str: The package name.
+
+    Raises:
+        LookupError: If the package is missing and offline mode is on, or the download failed.
+    """
+    def load():
+        import nltk
+
+        path = NLTK_RESOURCES.get(name, name)
+        try:
+            nltk.data.find(path)
+            return name
+        except LookupError:
+            if is_offline():
+                raise LookupError(f"NLTK resource '{name}' is not installed and offline mode is on. "
+                                  f"Install it with nltk.download('{name}') on a connected machine.") from None
+
+        print(f"Downloading NLTK resource '{name}'...")
+        nltk.download(name, quiet=True)
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            raise LookupError(f"NLTK resource '{name}' could not be downloaded.") from None
+        return name
+
+    return _get_or_load(('nltk', name), load)
+
+def get_spacy_model(name=SPACY_MODEL):
+    """
+    Returns a spaCy model, loading it on first use and downloading it once if needed.
+
+    Args:
+        name (str): The spaCy model name.
+
+    Returns:
+        spacy.language.Language: The loaded model.
+
+    Raises:
+        LookupError: If the model is missing and offline mode is on.
+    """
+    def load():
+        import spacy
+
+        try:
+            return spacy.load(name)
+        except OSError:
+            if is_offline():
+                raise LookupError(f"spaCy model '{name}' is not installed and offline mode is on. "
+                                  f"Install it with `python -m spacy download {name}` on a connected machine.") from None
+
+        print(f"Downloading spacy model '{name}'...")
+        from spacy.cli import download
+        download(name)
+        return spacy.load(name)
+
+    return _get_or_load(('spacy', name), load)
+
+def get_stopwords(language='english'):
+    """
+    Returns the NLTK stop word list for a language.
+
+    Args:
+        language (str): The stop word list to use.
+
+    Returns:
+        list: The stop words.
+    """
+    def load():
+        ensure_nltk_resource('stopwords')
+        from nltk.corpus import stopwords
+        return stopwords.words(language)
+
+    return _get_or_load(('stopwords', language), load)
+
+def get_lemmatizer():
+    """
+    Returns the shared WordNet lemmatizer.
+
+    Returns:
+        nltk.stem.WordNetLemmatizer: The lemmatizer.
+    """
+    def load():
+        ensure_nltk_resource('wordnet')
+        from nltk.stem import WordNetLemmatizer
+        return WordNetLemmatizer()
+
+    return _get_or_load(('lemmatizer',), load)
+
+def word_tokenize(text):
+    """
+    Tokenizes text with NLTK's `word_tokenize`, making sure the punkt tables are available.
+
+    Args:
+        text (str): The input text.
+
+    Returns:
+        list: The tokens.
+    """
+    def load():
+        ensure_nltk_resource('punkt_tab')
+        from nltk.tokenize import word_tokenize
+        return word_tokenize
+
+    return _get_or_load(('word_tokenize',), load)(text)
+
+def loaded_resources():
+    """
+    Returns the keys of the resources loaded in the current process.
+
+    Returns:
+        list: The loaded resource keys.
+    """
+    return list(_resources)
@@ -0,0 +1,304 @@
+#important python libraries
+import os
+import sys
+import time
+import argparse
+import traceback
+import contextlib
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from . import data_cache
+from . import news_sketches
+
+#tickers analysed in the notebooks
+DEFAULT_TICKERS = ['AAPL', 'AMZN', 'GOOG', 'META', 'MSFT', 'NVDA', 'TSLA']
+
+#pipeline steps, run in this order for each ticker
+STEPS = ('news', 'price', 'correlation')
+
+#price file of a ticker inside the price folder
+PRICE_FILE_PATTERN = '{ticker}_historical_data.csv'
+
+#news table shared by the parent, attached once per worker process
+_shared_news = None
+
+def share_news(stock_news):
+    """
+    Writes the news table to a shared memory block as an Arrow IPC stream.
+
+    Rows are grouped by ticker so that each worker reads its ticker as a zero-copy
+    slice of the shared table instead of receiving a pickled copy.
+
+    Args:
+        stock_news (pandas.DataFrame): The filtered news with a 'Stock' column.
+
+    Returns:
+        tuple: The `SharedMemory` block (owned by the caller, who must unlink it) and a
+               dict mapping each ticker to its `(offset, length)` rows in the table.
+    """
+    import pyarrow as pa
+
+    stock_news = stock_news.sort_values('Stock', kind='stable')
+    stocks = stock_news['Stock'].astype(str).to_numpy()
+    offsets = {}
+    for ticker in pd.unique(stocks):
+        rows = (stocks == ticker).nonzero()[0]
+        offsets[ticker] = (int(rows[0]), len(rows))
+
+    table = pa.Table.from_pandas(stock_news, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    payload = sink.getvalue()
+
+    block = shared_memory.SharedMemory(create=True, size=max(payload.size, 1))
+    block.buf[:payload.size] = payload.to_pybytes() if payload.size else b''
+    return block, offsets
+
+def _attach_news(block_name):
+    """
+    Pool initializer: attaches the shared news table and makes plotting headless.
+    """
+    global _shared_news
+    import pyarrow as pa
+
+    #workers only save plots, so no window may be opened
+    os.environ['MPLBACKEND'] = 'Agg'
+
+    block = shared_memory.SharedMemory(name=block_name)
+    table = pa.ipc.open_stream(pa.py_buffer(block.buf)).read_all()
+    _shared_news = (block, table)
+
+def _ticker_news(ticker, offsets):
+    """
+    Returns the news of one ticker from the shared table, or None if it has none.
+    """
+    if ticker not in offsets:
+        return None
+    offset, length = offsets[ticker]
+    return _shared_news[1].slice(offset, length).to_pandas()
+
+def run_ticker(ticker, offsets, price_folder, output_folder, steps=STEPS, start_date=None, end_date=None,
+               scorer='textblob', fmt='csv', statistics='exact', sketches=None, text_model_folder=None,
+               compact=False):
+    """
+    Runs the news, price and correlation analysis of one ticker.
+
+    All output of the analysis is written to `<output_folder>/logs/<ticker>.log`.
+
+    Args:
+        ticker (str): The stock ticker symbol.
+        offsets (dict): The rows of each ticker in the shared news table.
+        price_folder (str): The folder holding the '<ticker>_historical_data.csv' files.
+        output_folder (str): The folder receiving plots, data and logs.
+        steps (tuple): The steps to run, a subset of `STEPS`.
+        start_date (str, optional): The start date for the correlation analysis (YYYY-MM-DD).
+        end_date (str, optional): The end date for the correlation analysis (YYYY-MM-DD).
+        scorer (str): The sentiment scorer, see `news_sentiment_analyser.SCORERS`.
+        fmt (str): The format of the saved data, see `frame_writer.FORMATS`.
+        statistics (str): The headline and publisher statistics, see `news_analyser.STATISTICS`.
+        sketches (news_sketches.NewsSketches, optional): The ticker's sketches for sketch statistics.
+        text_model_folder (str, optional): The folder of the incremental text models, one
+                                           '<ticker>_text_model.joblib' file per ticker.
+        compact (bool): Whether to analyse the news and price frames in the compact dtypes of
+                        `frame_schema`; their memory before and after is printed to the log.
+
+    Returns:
+        dict: The ticker, its status ('ok' or 'failed'), the error if any, the elapsed
+              seconds and the path of its log.
+    """
+    from . import news_analyser
+    from . import news_sentiment_analyser
+    from . import correlation_analyser
+    from . import plot_renderer
+    from . import frame_writer
+    from . import instrumentation
+    from .historical_price_analyser import StockAnalyser
+
+    start = time.perf_counter()
+    log_folder = os.path.join(output_folder, 'logs')
+    os.makedirs(log_folder, exist_ok=True)
+    log_path = os.path.join(log_folder, f'{ticker}.log')
+    result = {'ticker': ticker, 'status': 'ok', 'error': None, 'log': log_path}
+
+    with open(log_path, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log), \
+            contextlib.redirect_stderr(log), instrumentation.span('ticker', ticker=ticker) as ticker_span:
+        try:
+            #plots render and data is written on background threads while the analysis continues
+            with plot_renderer.batch_rendering(n_workers=0), frame_writer.background_writes() as writes:
+                news = None
+                if 'news' in steps or 'correlation' in steps:
+                    news = _ticker_news(ticker, offsets)
+                    if news is None:
+                        raise ValueError(f'No news found for {ticker}.')
+                    with instrumentation.span('sentiment', rows=len(news), scorer=scorer):
+                        news = news_sentiment_analyser.add_sentiment_column(news, scorer=scorer)
+
+                if 'news' in steps:
+                    text_model_path = None
+                    if text_model_folder is not None:
+                        text_model_path = os.path.join(text_model_folder, f'{ticker}_text_model.joblib')
+                    news_analyser.analyse_stock_news(news, ticker, os.path.join(output_folder, 'plots', 'news'),
+                                                     statistics=statistics, sketches=sketches, scorer=scorer,
+                                                     text_model_path=text_model_path, compact=compact)
+
+                hist_data = None
+                if 'price' in steps or 'correlation' in steps:
+                    price_path = os.path.join(price_folder, PRICE_FILE_PATTERN.format(ticker=ticker))
+                    hist_data = data_cache.read_price_data_cached(price_path)
+                    if hist_data is None:
+                        raise ValueError(f'No price data found for {ticker} at {price_path}.')
+
+                if 'price' in steps:
+                    with instrumentation.span('indicators', rows=len(hist_data)):
+                        stock_analyser = StockAnalyser(hist_data, compact=compact)
+                        #the compact schema keeps the indicators in float32
+                        data_with_indicators = stock_analyser.calculate_technical_indicators(
+                            stock_analyser.data, dtype=np.float32 if compact else np.float64)
+                        stock_analyser.save_dataframe(data_with_indicators,
+                                                      os.path.join(output_folder, 'data', 'price'),
+                                                      f'{ticker}_price_data', fmt=fmt)
+                    with instrumentation.span('price_plot', rows=len(data_with_indicators)):
+                        fig = stock_analyser.plot_stock_data(data_with_indicators, ticker)
+                        stock_analyser.save_plot(fig, os.path.join(output_folder, 'plots', 'price'),
+                                                 f'{ticker}_historical_price')
+
+                if 'correlation' in steps:
+                    #the alignment does not modify its inputs, so no copies are needed
+                    senti_data = news[['Date', 'Sentiment']]
+                    correlation_analyser.analyse_and_plot(
+                        ticker, hist_data, senti_data, start_date=start_date, end_date=end_date,
+                        plot_folder=os.path.join(output_folder, 'plots', 'correlation'))
+            #a ticker whose output files could not be written has failed too
+            if writes.errors:
+                raise OSError(f'{len(writes.errors)} output file(s) could not be written; first: {writes.errors[0]}')
+        except Exception as e:
+            traceback.print_exc()
+            result['status'] = 'failed'
+            result['error'] = f'{type(e).__name__}: {e}'
+        ticker_span.set(status=result['status'])
+
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+def run_pipeline(tickers, news_path, price_folder, output_folder, n_workers=None, steps=STEPS,
+                 start_date=None, end_date=None, scorer='textblob', fmt='csv', statistics='exact',
+                 text_model_folder=None, compact=False):
+    """
+    Runs the per-ticker pipeline for many tickers on a process pool.
+
+    The news file is loaded once in the parent and shared with the workers through
+    shared memory. With sketch statistics the file is also streamed once into
+    per-ticker sketches (see `news_sketches.sketch_news_file`) and each worker gets
+    those of its ticker. A failure in one ticker is recorded in its result and does not
+    stop the others.
+
+    Args:
+        tickers (list): The stock ticker symbols.
+        news_path (str): The path to the raw analyst ratings CSV file.
+        price_folder (str): The folder holding the '<ticker>_historical_data.csv' files.
+        output_folder (str): The folder receiving plots, data and logs.
+        n_workers (int, optional): The number of worker processes. Defaults to the
+                                   number of CPUs, at most one per ticker.
+        steps (tuple): The steps to run, a subset of `STEPS`.
+        start_date (str, optional): The start date for the correlation analysis (YYYY-MM-DD).
+        end_date (str, optional): The end date for the correlation analysis (YYYY-MM-DD).
+        scorer (str): The sentiment scorer, see `news_sentiment_analyser.SCORERS`.
+        fmt (str): The format of the saved data, see `frame_writer.FORMATS`.
+        statistics (str): The headline and publisher statistics, see `news_analyser.STATISTICS`.
+        text_model_folder (str, optional): The folder of the per-ticker incremental text
+                                           models; None refits TF-IDF and LDA on every run.
+        compact (bool): Whether the tickers use compact dtypes, see `run_ticker`.
+
+    Returns:
+        list: One result dict per ticker (see `run_ticker`), in ticker order.
+    """
+    unknown = [step for step in steps if step not in STEPS]
+    if unknown:
+        raise ValueError(f'Unknown pipeline steps {unknown}. Choose from {STEPS}.')
+
+    stock_news = pd.DataFrame(columns=['Stock'])
+    if 'news' in steps or 'correlation' in steps:
+        stock_news = data_cache.load_and_filter_data_cached(news_path, tickers)
+        if stock_news is None:
+            raise ValueError(f'Could not load news from {news_path}.')
+
+    n_workers = max(1, min(n_workers or os.cpu_count() or 1, len(tickers)))
+
+    sketches = None
+    if statistics == 'sketch' and 'news' in steps:
+        sketches = news_sketches.sketch_news_file(news_path, tickers, n_workers=n_workers)
+        if sketches is None:
+            raise ValueError(f'Could not sketch news from {news_path}.')
+
+    block, offsets = share_news(stock_news)
+    results = {}
+    try:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_attach_news,
+                                 initargs=(block.name,)) as executor:
+            futures = {ticker: executor.submit(run_ticker, ticker, offsets, price_folder, output_folder, steps,
+                                               start_date, end_date, scorer, fmt, statistics,
+                                               sketches.select(ticker) if sketches is not None else None,
+                                               text_model_folder, compact)
+                       for ticker in tickers}
+            for ticker, future in futures.items():
+                try:
+                    results[ticker] = future.result()
+                except Exception as e:
+                    #the worker process itself died, e.g. killed for running out of memory
+                    results[ticker] = {'ticker': ticker, 'status': 'failed', 'error': f'{type(e).__name__}: {e}',
+                                       'log': None, 'seconds': None}
+                print(f"{ticker}: {results[ticker]['status']}"
+                      + (f" ({results[ticker]['error']})" if results[ticker]['error'] else ''))
+    finally:
+        block.close()
+        block.unlink()
+    return [results[ticker] for ticker in tickers]
+
+def main(argv=None):
+    """
+    Command-line entry point, e.g.
+    `python -m script.pipeline --news data/raw_analyst_ratings.csv --prices data/historical_data --workers 4`.
+    """
+    from . import news_sentiment_analyser
+
+    parser = argparse.ArgumentParser(description='Run the news, price and correlation analysis for many tickers.')
+    parser.add_argument('--tickers', nargs='+', default=DEFAULT_TICKERS)
+    parser.add_argument('--news', required=True, help='Path to the raw analyst ratings CSV file.')
+    parser.add_argument('--prices', required=True, help="Folder with the '<ticker>_historical_data.csv' files.")
+    parser.add_argument('--output', default='output', help='Folder for plots, data and logs.')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--steps', nargs='+', default=list(STEPS), choices=STEPS)
+    parser.add_argument('--start-date', default=None)
+    parser.add_argument('--end-date', default=None)
+    parser.add_argument('--scorer', default=news_sentiment_analyser.SCORER_NAME, choices=news_sentiment_analyser.SCORERS)
+    parser.add_argument('--format', default='csv', choices=['csv', 'parquet', 'feather'],
+                        help='Format of the saved data; parquet and feather keep the dtypes.')
+    parser.add_argument('--statistics', default='exact', choices=['exact', 'sketch'],
+                        help='Headline and publisher statistics: exact, or estimated in fixed memory.')
+    parser.add_argument('--text-model', default=None, metavar='FOLDER',
+                        help='Folder of saved incremental TF-IDF/LDA models, updated with new headlines only.')
+    parser.add_argument('--compact', action='store_true',
+                        help='Analyse the news and price frames in compact dtypes and log their memory use.')
+    parser.add_argument('--trace', default=None, help='JSON-lines file receiving the stage timings.')
+
+    args = parser.parse_args(argv)
+    if args.trace:
+        from . import instrumentation
+        instrumentation.enable(path=args.trace)
+
+    results = run_pipeline(args.tickers, args.news, args.prices, args.output, n_workers=args.workers,
+                           steps=tuple(args.steps), start_date=args.start_date, end_date=args.end_date,
+                           scorer=args.scorer, fmt=args.format, statistics=args.statistics,
+                           text_model_folder=args.text_model, compact=args.compact)
+    failed = [result['ticker'] for result in results if result['status'] != 'ok']
+    if failed:
+        print(f'Failed tickers: {failed}')
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,319 @@
+#important python libraries
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from . import artifact_manifest
+
+#for visualisation
+#matplotlib and seaborn are imported when a plot is drawn
+
+#executor of the active batch, and the futures of the plots it is rendering
+_batch = None
+_pending = []
+_lock = threading.Lock()
+
+#bump when the drawing code changes the look of existing plots, so that they are redrawn
+RENDER_VERSION = 1
+
+#figures reused across renders in this process (or thread), keyed by figure size
+_figures = threading.local()
+
+def make_spec(plot_folder, plot_name, layers, figsize=(8, 6), title=None, xlabel=None, ylabel=None,
+              grid=False, xticks_rotation=None, tight_layout=False, hide_spines=None):
+    """
+    Describes a plot as plain data, so that it can be rendered here or in another process.
+
+    Args:
+        plot_folder (str): The folder to save the plot.
+        plot_name (str): The name of the plot file.
+        layers (list): The layers to draw, each a dict with a 'kind' (see `LAYERS`) and its arguments.
+        figsize (tuple): The figure size in inches.
+        title (str, optional): The plot title.
+        xlabel (str, optional): The x-axis label.
+        ylabel (str, optional): The y-axis label.
+        grid (bool): Whether to draw a grid.
+        xticks_rotation (int, optional): The rotation of the x tick labels.
+        tight_layout (bool): Whether to apply a tight layout.
+        hide_spines (list, optional): The spines to hide, e.g. ['top', 'right'].
+
+    Returns:
+        dict: The plot spec.
+    """
+    return {'plot_folder': plot_folder, 'plot_name': plot_name, 'layers': layers, 'figsize': tuple(figsize),
+            'title': title, 'xlabel': xlabel, 'ylabel': ylabel, 'grid': grid,
+            'xticks_rotation': xticks_rotation, 'tight_layout': tight_layout, 'hide_spines': hide_spines}
+
+def _draw_barplot(ax, layer):
+    import seaborn as sns
+    sns.barplot(x=layer['x'], y=layer['y'], hue=layer.get('hue'), palette=layer.get('palette'),
+                legend=layer.get('legend', 'auto'), ax=ax)
+
+def _draw_histplot(ax, layer):
+    import seaborn as sns
+    sns.histplot(layer['values'], bins=layer.get('bins', 'auto'), kde=layer.get('kde', False), ax=ax)
+
+def _draw_series(ax, layer):
+    layer['series'].plot(ax=ax)
+
+def _draw_scatterplot(ax, layer):
+    import seaborn as sns
+    sns.scatterplot(data=layer['data'], x=layer['x'], y=layer['y'], ax=ax)
+
+def _draw_heatmap(ax, layer):
+    import seaborn as sns
+    sns.heatmap(layer['data'], annot=layer.get('annot', False), fmt=layer.get('fmt', '.2g'), ax=ax)
+
+def _draw_line(ax, layer):
+    #a 'twin' layer is drawn on a second y-axis sharing the x-axis
+    if layer.get('twin'):
+        ax = ax.twinx()
+    color = layer.get('color')
+    ax.plot(layer['x'], layer['y'], color=color, label=layer.get('label'))
+    if layer.get('xlabel'):
+        ax.set_xlabel(layer['xlabel'])
+    if layer.get('ylabel'):
+        ax.set_ylabel(layer['ylabel'], color=color)
+        ax.tick_params(axis='y', labelcolor=color)
+
+#layer kinds a spec can use
+LAYERS = {
+    'barplot': _draw_barplot,
+    'histplot': _draw_histplot,
+    'series': _draw_series,
+    'scatterplot': _draw_scatterplot,
+    'heatmap': _draw_heatmap,
+    'line': _draw_line,
+}
+
+#layer kinds that change the figure layout, so their figures are not reused
+FRESH_FIGURE_LAYERS = ('heatmap',)
+
+def draw_spec(fig, ax, spec):
+    """
+    Draws a plot spec onto a figure and its main axes.
+
+    Args:
+        fig (matplotlib.figure.Figure): The figure.
+        ax (matplotlib.axes.Axes): The main axes.
+        spec (dict): The plot spec (see `make_spec`).
+    """
+    for layer in spec['layers']:
+        LAYERS[layer['kind']](ax, layer)
+
+    if spec['title'] is not None:
+        ax.set_title(spec['title'])
+    if spec['xlabel'] is not None:
+        ax.set_xlabel(spec['xlabel'])
+    if spec['ylabel'] is not None:
+        ax.set_ylabel(spec['ylabel'])
+    if spec['grid']:
+        ax.grid()
+    if spec['xticks_rotation'] is not None:
+        ax.tick_params(axis='x', labelrotation=spec['xticks_rotation'])
+    if spec['hide_spines']:
+        ax.spines[spec['hide_spines']].set_visible(False)
+    if spec['tight_layout']:
+        fig.tight_layout()
+
+def _reusable_figure(figsize):
+    """
+    Returns a cleared figure and main axes of the given size, reused within the current thread.
+    """
+    import matplotlib
+    from matplotlib.figure import Figure
+
+    figures = getattr(_figures, 'by_size', None)
+    if figures is None:
+        figures = _figures.by_size = {}
+
+    if figsize not in figures:
+        fig = Figure(figsize=figsize)
+        figures[figsize] = (fig, fig.add_subplot())
+    fig, ax = figures[figsize]
+
+    #drop twin axes of the previous plot and restore the default margins
+    for extra in fig.axes:
+        if extra is not ax:
+            extra.remove()
+    ax.clear()
+    fig.subplots_adjust(**{name: matplotlib.rcParams[f'figure.subplot.{name}']
+                           for name in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')})
+    return fig, ax
+
+def spec_fingerprint(spec):
+    """
+    Returns the fingerprint of a plot spec: its data, its parameters and the renderer version.
+
+    Args:
+        spec (dict): The plot spec (see `make_spec`).
+
+    Returns:
+        str: The fingerprint recorded in the artifact manifest.
+    """
+    return artifact_manifest.fingerprint(RENDER_VERSION, spec)
+
+def spec_path(spec):
+    """
+    Returns the path of the PNG file of a plot spec.
+    """
+    return os.path.join(spec['plot_folder'], spec['plot_name'])
+
+def render_spec(spec, key=None):
+    """
+    Renders a plot spec to its PNG file with the non-interactive Agg canvas.
+
+    Args:
+        spec (dict): The plot spec (see `make_spec`).
+        key (str, optional): The fingerprint of the spec, recorded in the artifact manifest.
+
+    Returns:
+        str: The path of the saved plot.
+    """
+    from matplotlib.figure import Figure
+
+    #a colorbar reshapes the main axes, so heatmaps get a fresh figure
+    if any(layer['kind'] in FRESH_FIGURE_LAYERS for layer in spec['layers']):
+        fig = Figure(figsize=spec['figsize'])
+        ax = fig.add_subplot()
+    else:
+        fig, ax = _reusable_figure(spec['figsize'])
+    draw_spec(fig, ax, spec)
+
+    os.makedirs(spec['plot_folder'], exist_ok=True)
+    plot_path = spec_path(spec)
+    fig.savefig(plot_path)
+    if key is not None:
+        artifact_manifest.record(plot_path, key)
+    return plot_path
+
+def _init_worker():
+    """
+    Pool initializer: selects the Agg backend so that workers never open a window.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+
+def start_batch(n_workers=None):
+    """
+    Turns on batch rendering: plots are queued and rendered off the calling thread.
+
+    Args:
+        n_workers (int, optional): The number of rendering processes. 0 renders in one
+                                   background thread of the current process, which suits
+                                   code already running in a worker. Defaults to the
+                                   number of CPUs.
+    """
+    global _batch
+    with _lock:
+        if _batch is not None:
+            return
+        if n_workers == 0:
+            #the thread draws on its own Figure objects, so the process backend is left alone
+            _batch = ThreadPoolExecutor(max_workers=1)
+        else:
+            _batch = ProcessPoolExecutor(max_workers=n_workers or os.cpu_count() or 1, initializer=_init_worker)
+
+def finish_batch():
+    """
+    Waits for the queued plots and turns batch rendering off.
+
+    Returns:
+        list: The paths of the rendered plots; failed renders are printed and skipped.
+    """
+    global _batch, _pending
+    with _lock:
+        executor, pending = _batch, _pending
+        _batch, _pending = None, []
+    if executor is None:
+        return []
+
+    paths = []
+    for future in pending:
+        try:
+            paths.append(future.result())
+        except Exception as e:
+            print(f'Error rendering plot: {e}')
+    executor.shutdown()
+    return paths
+
+class batch_rendering:
+    def __init__(self, n_workers=None):
+        """
+        Context manager running the enclosed plotting code in batch rendering mode.
+
+        Args:
+            n_workers (int, optional): The number of rendering processes (see `start_batch`).
+        """
+        self.n_workers = n_workers
+        self.paths = []
+
+    def __enter__(self):
+        start_batch(self.n_workers)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.paths = finish_batch()
+        return False
+
+def is_batch_mode():
+    """
+    Returns whether batch rendering is on.
+
+    Returns:
+        bool: True if plots are queued instead of shown.
+    """
+    return _batch is not None
+
+def draw(spec, force=False):
+    """
+    Draws a plot spec: queued for rendering in batch mode, otherwise drawn, saved and shown.
+
+    A plot whose data and parameters match the fingerprint recorded for its file in
+    the artifact manifest is not rendered again in batch mode, and not saved again in
+    interactive mode, where it is still shown.
+
+    Args:
+        spec (dict): The plot spec (see `make_spec`).
+        force (bool): Whether to render and save the plot even if it is unchanged.
+
+    Returns:
+        concurrent.futures.Future or str: The pending render in batch mode, otherwise
+                                          the path of the saved plot.
+    """
+    plot_path = spec_path(spec)
+    key = spec_fingerprint(spec)
+    unchanged = not force and artifact_manifest.is_up_to_date(plot_path, key)
+
+    with _lock:
+        if _batch is not None:
+            if unchanged:
+                print(f'\nPlot is unchanged, kept {os.path.relpath(plot_path, os.getcwd())}.\n')
+                return plot_path
+            future = _batch.submit(render_spec, spec, key)
+            _pending.append(future)
+            return future
+
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=spec['figsize'])
+    draw_spec(fig, fig.add_subplot(), spec)
+
+    #calculate the relative path
+    relative_plot_path = os.path.relpath(plot_path, os.getcwd())
+
+    if unchanged:
+        print(f'\nPlot is unchanged, kept {relative_plot_path}.\n')
+    else:
+        #create the directory if it doesn't exist
+        os.makedirs(spec['plot_folder'], exist_ok=True)
+        plt.savefig(plot_path)
+        artifact_manifest.record(plot_path, key)
+        print(f'\nPlot is saved to {relative_plot_path}.\n')
+
+    #show plot
+    plt.show()
+
+    #close plot to free up memory
+    plt.close()
+    return plot_path
@@ -0,0 +1,151 @@
+#important python libraries
+import numpy as np
+import pandas as pd
+
+from . import frame_schema
+
+_SECONDS_PER_DAY = 86_400
+
+#1970-01-01 was a Thursday; adding 3 makes Monday day 0
+_EPOCH_WEEKDAY = 3
+
+class PublicationCalendar:
+    def __init__(self, tickers, first_day, day_of_week, hour_of_day, daily, ticker_first_day, ticker_last_day,
+                 timezone=None):
+        """
+        Publication counts per ticker by day of the week, hour of the day and calendar day.
+
+        Built by `aggregate_publications`; the counts are (tickers x bins) int32 arrays.
+
+        Args:
+            tickers (pandas.Index): The tickers, in row order.
+            first_day (int): The first calendar day of the `daily` columns, in days since the epoch.
+            day_of_week (numpy.ndarray): Counts by weekday, Monday first.
+            hour_of_day (numpy.ndarray): Counts by hour, 0 to 23.
+            daily (numpy.ndarray): Counts by calendar day from `first_day`.
+            ticker_first_day (numpy.ndarray): The first publication day of each ticker.
+            ticker_last_day (numpy.ndarray): The last publication day of each ticker.
+            timezone (optional): The timezone of the timestamps, kept for the daily dates.
+        """
+        self.tickers = tickers
+        self.first_day = first_day
+        self.day_of_week = day_of_week
+        self.hour_of_day = hour_of_day
+        self.daily = daily
+        self.ticker_first_day = ticker_first_day
+        self.ticker_last_day = ticker_last_day
+        self.timezone = timezone
+
+    def _row(self, ticker):
+        """
+        Returns the row of a ticker; None picks the only ticker.
+        """
+        if ticker is None:
+            if len(self.tickers) != 1:
+                raise ValueError(f'The calendar holds {len(self.tickers)} tickers; pass one of them.')
+            return 0
+        row = self.tickers.get_indexer([ticker])[0]
+        if row < 0:
+            raise KeyError(f'No publications for ticker {ticker!r}.')
+        return row
+
+    def day_of_week_counts(self, ticker=None):
+        """
+        Returns the number of publications per day of the week, Monday first.
+
+        Args:
+            ticker (str, optional): The ticker; may be left out when the calendar holds one.
+
+        Returns:
+            pandas.Series: The counts, indexed by the day names of `frame_schema.DAY_ORDER`.
+        """
+        return pd.Series(self.day_of_week[self._row(ticker)],
+                         index=pd.CategoricalIndex(frame_schema.DAY_ORDER, categories=frame_schema.DAY_ORDER,
+                                                   ordered=True, name='Publication_Day'),
+                         name='count')
+
+    def hour_counts(self, ticker=None):
+        """
+        Returns the number of publications per hour of the day.
+
+        Args:
+            ticker (str, optional): The ticker; may be left out when the calendar holds one.
+
+        Returns:
+            pandas.Series: The counts, indexed by the hours 0 to 23.
+        """
+        return pd.Series(self.hour_of_day[self._row(ticker)], index=pd.RangeIndex(24, name='Publication_Hour'),
+                         name='count')
+
+    def daily_counts(self, ticker=None):
+        """
+        Returns the number of publications per calendar day, from the ticker's first to its last day.
+
+        Args:
+            ticker (str, optional): The ticker; may be left out when the calendar holds one.
+
+        Returns:
+            pandas.Series: The counts, with a daily DatetimeIndex (empty days count 0); empty
+                           if the ticker has no dated publications.
+        """
+        row = self._row(ticker)
+        first, last = self.ticker_first_day[row], self.ticker_last_day[row]
+        if first > last:
+            return pd.Series([], index=pd.DatetimeIndex([], tz=self.timezone, name='Date'), dtype=np.int32)
+        counts = self.daily[row, first - self.first_day:last - self.first_day + 1]
+        dates = pd.date_range(pd.Timestamp(int(first), unit='D'), periods=len(counts), freq='D', tz=self.timezone,
+                              name='Date')
+        return pd.Series(counts, index=dates)
+
+def aggregate_publications(df, ticker_column='Stock', date_column='Date'):
+    """
+    Counts publications by weekday, hour and calendar day for all tickers in one pass.
+
+    Timestamps are taken as integer seconds of their own wall-clock time, so the
+    weekday, hour and day are those of `Series.dt` on the original column. Each count
+    is one `numpy.bincount` over a combined (ticker, bin) code. Rows with a missing
+    date or ticker are not counted. The input is not modified.
+
+    Args:
+        df (pandas.DataFrame): The news, with a datetime column.
+        ticker_column (str, optional): The ticker column; None counts the frame as one ticker.
+        date_column (str): The datetime column.
+
+    Returns:
+        PublicationCalendar: The counts of every ticker.
+    """
+    dates = pd.to_datetime(df[date_column])
+    timezone = dates.dt.tz
+    if timezone is not None:
+        dates = dates.dt.tz_localize(None)
+    valid = dates.notna().to_numpy()
+    if ticker_column is not None:
+        valid &= df[ticker_column].notna().to_numpy()
+    seconds = dates.to_numpy(dtype='datetime64[ns]').view(np.int64)[valid] // 1_000_000_000
+
+    if ticker_column is None:
+        codes, tickers = np.zeros(len(seconds), dtype=np.int64), pd.Index([None])
+    else:
+        codes, tickers = pd.factorize(df[ticker_column].to_numpy()[valid])
+        codes, tickers = codes.astype(np.int64), pd.Index(tickers)
+    n_tickers = len(tickers)
+
+    days = seconds // _SECONDS_PER_DAY
+    hours = (seconds - days * _SECONDS_PER_DAY) // 3600
+    weekdays = (days + _EPOCH_WEEKDAY) % 7
+
+    def count(bins, n_bins):
+        return np.bincount(codes * n_bins + bins, minlength=n_tickers * n_bins).reshape(n_tickers, n_bins) \
+            .astype(np.int32)
+
+    first_day = int(days.min()) if len(days) else 0
+    n_days = int(days.max()) - first_day + 1 if len(days) else 0
+
+    #first and last publication day of each ticker
+    ticker_first_day = np.full(n_tickers, np.iinfo(np.int64).max)
+    ticker_last_day = np.full(n_tickers, np.iinfo(np.int64).min)
+    np.minimum.at(ticker_first_day, codes, days)
+    np.maximum.at(ticker_last_day, codes, days)
+
+    return PublicationCalendar(tickers, first_day, count(weekdays, 7), count(hours, 24), count(days - first_day, n_days),
+                               ticker_first_day, ticker_last_day, timezone)
@@ -0,0 +1,177 @@
+#important python libraries
+import os
+import sqlite3
+import hashlib
+import unicodedata
+from collections import OrderedDict
+
+#default location of the on-disk tier, relative to the working directory
+CACHE_PATH = os.path.join('data', 'cache', 'sentiment_cache.sqlite')
+
+#number of keys per SQL lookup; stays below SQLite's bound-parameter limit
+_SQL_BATCH = 900
+
+def normalise_text(text):
+    """
+    Normalises a headline for cache lookups.
+
+    Applies Unicode NFC normalisation, trims the ends and collapses runs of
+    whitespace. Case and punctuation are kept because they can change the score.
+
+    Args:
+        text (str): The input text.
+
+    Returns:
+        str: The normalised text.
+    """
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+def text_key(text, scorer_name, scorer_version):
+    """
+    Returns the content-addressed cache key of a text for a given scorer.
+
+    Args:
+        text (str): The input text.
+        scorer_name (str): The name of the scorer.
+        scorer_version (str): The version of the scorer.
+
+    Returns:
+        str: The hex SHA-256 digest identifying the text and scorer.
+    """
+    payload = f'{scorer_name}\x00{scorer_version}\x00{normalise_text(text)}'
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class SentimentCache:
+    def __init__(self, cache_path=CACHE_PATH, max_memory_items=100_000):
+        """
+        Initialise a two-tier sentiment cache: an in-memory LRU in front of a SQLite file.
+
+        Each unique (normalised headline, scorer, scorer version) is scored once and
+        reused across runs, tickers and notebooks that share the same cache file.
+
+        Args:
+            cache_path (str, optional): The path to the SQLite file of the on-disk tier.
+                                        None keeps the cache in memory only.
+            max_memory_items (int): The maximum number of scores held in the LRU tier.
+        """
+        self.cache_path = cache_path
+        self.max_memory_items = max_memory_items
+        self.memory = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self.connection = None
+        if cache_path is not None:
+            cache_folder = os.path.dirname(cache_path)
+            if cache_folder and not os.path.exists(cache_folder):
+                os.makedirs(cache_folder)
+            self.connection = sqlite3.connect(cache_path)
+            self.connection.execute('CREATE TABLE IF NOT EXISTS sentiment (key TEXT PRIMARY KEY, score REAL NOT NULL)')
+            self.connection.commit()
+
+    def _remember(self, key, score):
+        """
+        Stores a score in the LRU tier, evicting the least recently used entries.
+        """
+        self.memory[key] = score
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_items:
+            self.memory.popitem(last=False)
+
+    def _read_disk(self, keys):
+        """
+        Reads the scores of the given keys from the on-disk tier.
+        """
+        found = {}
+        if self.connection is None:
+            return found
+        for start in range(0, len(keys), _SQL_BATCH):
+            batch = keys[start:start + _SQL_BATCH]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.connection.execute(f'SELECT key, score FROM sentiment WHERE key IN ({placeholders})', batch)
+            found.update(rows)
+        return found
+
+    def _write_disk(self, scores):
+        """
+        Writes new scores to the on-disk tier in a single transaction.
+        """
+        if self.connection is None or not scores:
+            return
+        with self.connection:
+            self.connection.executemany('INSERT OR REPLACE INTO sentiment (key, score) VALUES (?, ?)',
+                                        scores.items())
+
+    def score(self, texts, score_batch, scorer_name, scorer_version):
+        """
+        Returns the score of each text, scoring only texts not seen before.
+
+        Texts are deduplicated on their normalised form, looked up in memory, then
+        on disk, and the remaining texts are scored in one call to `score_batch`.
+
+        Args:
+            texts (list): The input texts.
+            score_batch (callable): Takes a list of texts and returns their scores in order.
+            scorer_name (str): The name of the scorer, part of the cache key.
+            scorer_version (str): The version of the scorer, part of the cache key.
+
+        Returns:
+            list: The score of each text, in input order.
+        """
+        keys = [text_key(text, scorer_name, scorer_version) for text in texts]
+
+        #one representative text per unique key
+        unique = {}
+        for key, text in zip(keys, texts):
+            unique.setdefault(key, text)
+
+        scores = {}
+        for key in unique:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                scores[key] = self.memory[key]
+        self.memory_hits += len(scores)
+
+        pending = [key for key in unique if key not in scores]
+        from_disk = self._read_disk(pending)
+        self.disk_hits += len(from_disk)
+        for key, score in from_disk.items():
+            scores[key] = score
+            self._remember(key, score)
+
+        missing = [key for key in pending if key not in from_disk]
+        self.misses += len(missing)
+        if missing:
+            new_scores = dict(zip(missing, score_batch([unique[key] for key in missing])))
+            self._write_disk(new_scores)
+            for key, score in new_scores.items():
+                scores[key] = score
+                self._remember(key, score)
+
+        return [scores[key] for key in keys]
+
+    def stats(self):
+        """
+        Returns the hit and miss counters of the cache.
+
+        Counters are per unique text in each `score` call, so repeated texts within
+        one call count once.
+
+        Returns:
+            dict: Memory hits, disk hits, misses, total lookups and hit rate.
+        """
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'lookups': lookups,
+                'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0}
+
+    def close(self):
+        """
+        Closes the on-disk tier.
+        """
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
@@ -0,0 +1,220 @@
+#important python libraries
+import numpy as np
+import pandas as pd
+
+#time zone of the exchange; time-zone-aware timestamps are converted to it, naive ones are assumed to be in it
+MARKET_TIMEZONE = 'America/New_York'
+
+#headlines published at or after the close count towards the next trading session
+MARKET_CLOSE = '16:00'
+
+#a headline published before a ticker's first session counts towards it only if it is at most this much older
+MAX_SESSION_GAP = '4D'
+
+#per-session sentiment reducers and the column each one fills ('{}' is the sentiment column)
+REDUCERS = {
+    'mean': '{}',
+    'count': '{}_Count',
+    'sum': '{}_Sum',
+    'std': '{}_Std',
+    'min': '{}_Min',
+    'max': '{}_Max',
+}
+
+#session keys pack the ticker code above the seconds since the earliest timestamp
+_TICKER_SHIFT = 40
+
+def _local_seconds(dates, timezone=None):
+    """
+    Returns timestamps as whole seconds of wall-clock time, and a mask of valid ones.
+
+    Time-zone-aware timestamps are converted to `timezone` first; with None they keep
+    their own wall-clock time.
+    """
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        #strings or timestamps with mixed UTC offsets
+        dates = pd.to_datetime(dates, format='ISO8601', utc=True, errors='coerce')
+    dates = pd.Series(dates)
+    if dates.dt.tz is not None:
+        if timezone is not None:
+            dates = dates.dt.tz_convert(timezone)
+        dates = dates.dt.tz_localize(None)
+
+    valid = dates.notna().to_numpy()
+    nanoseconds = dates.to_numpy(dtype='datetime64[ns]').view(np.int64)
+    return nanoseconds // 1_000_000_000, valid
+
+def _cutoff_seconds(cutoff):
+    """
+    Returns a time of day ('HH:MM', 'HH:MM:SS' or a Timedelta) as seconds after midnight.
+    """
+    if isinstance(cutoff, str) and cutoff.count(':') == 1:
+        cutoff = f'{cutoff}:00'
+    seconds = int(pd.Timedelta(cutoff).total_seconds())
+    if not 0 <= seconds <= 24 * 3600:
+        raise ValueError(f'The cutoff must be a time of day, got {cutoff!r}.')
+    return seconds
+
+def _ticker_codes(prices, news, ticker_column):
+    """
+    Returns the ticker codes of the price rows and of the headlines (-1 for tickers without prices).
+    """
+    if ticker_column is None:
+        return np.zeros(len(prices), dtype=np.int64), np.zeros(len(news), dtype=np.int64)
+    price_codes, tickers = pd.factorize(prices[ticker_column])
+    news_codes = pd.Index(tickers).get_indexer(news[ticker_column])
+    return price_codes.astype(np.int64), news_codes.astype(np.int64)
+
+def map_to_sessions(prices, news, cutoff=MARKET_CLOSE, timezone=MARKET_TIMEZONE, ticker_column=None,
+                    date_column='Date', max_gap=MAX_SESSION_GAP):
+    """
+    Maps each headline to the price row of its effective trading session.
+
+    A session closes at `cutoff` on its date, exchange time. A headline belongs to the
+    first session of its ticker that closes after it was published, so after-hours,
+    weekend and holiday news counts towards the next session. A headline is only
+    counted after the close of the previous session of its ticker; before the first
+    session it must be at most `max_gap` older than that session's close. The sessions are sorted
+    once and every headline is placed with a binary search, for all tickers at once.
+    Timestamps are compared at second resolution.
+
+    Args:
+        prices (pandas.DataFrame): One row per trading session (and ticker), with a date column.
+        news (pandas.DataFrame): The headlines, with a timestamp column.
+        cutoff (str or pandas.Timedelta): The market close as time of day, e.g. '16:00'.
+                                          '24:00' maps each headline to the session on or after its date.
+        timezone (str): The exchange time zone.
+        ticker_column (str, optional): The ticker column of both frames; None treats them as one ticker.
+        date_column (str): The date/timestamp column of both frames.
+        max_gap (str or pandas.Timedelta): How long before the close of a ticker's first
+                                           session its headlines may be published.
+
+    Returns:
+        numpy.ndarray: For each headline, the position of its session's row in `prices`,
+                       or -1 if it has no session (no later session, too old for the first
+                       session, unknown ticker or no date).
+    """
+    cutoff_seconds = _cutoff_seconds(cutoff)
+    max_gap_seconds = int(pd.Timedelta(max_gap).total_seconds())
+
+    #a session is identified by its calendar date, taken in the price data's own time zone
+    session_days, session_valid = _local_seconds(prices[date_column])
+    session_closes = session_days - session_days % 86_400 + cutoff_seconds
+    news_times, news_valid = _local_seconds(news[date_column], timezone)
+    price_codes, news_codes = _ticker_codes(prices, news, ticker_column)
+
+    session_valid &= price_codes >= 0
+    news_valid &= news_codes >= 0
+    positions = np.full(len(news), -1, dtype=np.int64)
+    if not session_valid.any() or not news_valid.any():
+        return positions
+
+    #pack (ticker, seconds) into one sortable int64 key
+    base = min(session_closes[session_valid].min(), news_times[news_valid].min())
+    span = max(session_closes[session_valid].max(), news_times[news_valid].max()) - base
+    if span >= 1 << _TICKER_SHIFT:
+        raise ValueError('The timestamps span too long a period to be aligned.')
+
+    session_rows = np.flatnonzero(session_valid)
+    session_keys = (price_codes[session_rows] << _TICKER_SHIFT) + (session_closes[session_rows] - base)
+    order = np.argsort(session_keys, kind='stable')
+    session_rows, session_keys = session_rows[order], session_keys[order]
+
+    headlines = np.flatnonzero(news_valid)
+    news_keys = (news_codes[headlines] << _TICKER_SHIFT) + (news_times[headlines] - base)
+
+    #the first session of the same ticker closing strictly after the headline
+    found = np.searchsorted(session_keys, news_keys, side='right')
+    in_range = found < len(session_keys)
+    found = np.minimum(found, len(session_keys) - 1)
+    same_ticker = (session_keys[found] >> _TICKER_SHIFT) == news_codes[headlines]
+
+    #side='right' puts the previous session's close at or before the headline, so a previous
+    #session of the same ticker bounds it from below; before the first session the gap is bounded
+    previous = np.maximum(found - 1, 0)
+    has_previous = (found > 0) & ((session_keys[previous] >> _TICKER_SHIFT) == news_codes[headlines])
+    recent = session_keys[found] - news_keys <= max_gap_seconds
+    matched = in_range & same_ticker & (has_previous | recent)
+
+    positions[headlines[matched]] = session_rows[found[matched]]
+    return positions
+
+def aggregate_by_session(positions, values, n_sessions, reducers=('mean',)):
+    """
+    Aggregates headline values per session with several reducers in one pass.
+
+    Args:
+        positions (numpy.ndarray): The session of each headline (see `map_to_sessions`); -1 is skipped.
+        values (array-like): The value of each headline, e.g. its sentiment; missing values are skipped.
+        n_sessions (int): The number of sessions.
+        reducers (tuple): The reducers to compute, keys of `REDUCERS`.
+
+    Returns:
+        dict: Maps each reducer to an array with one value per session. Sessions without
+              headlines have a count and sum of 0 and NaN for the other reducers.
+    """
+    unknown = [reducer for reducer in reducers if reducer not in REDUCERS]
+    if unknown:
+        raise ValueError(f'Unknown reducers {unknown}. Choose from {list(REDUCERS)}.')
+
+    values = np.asarray(values, dtype=np.float64)
+    used = (positions >= 0) & ~np.isnan(values)
+    groups, values = positions[used], values[used]
+
+    counts = np.bincount(groups, minlength=n_sessions).astype(np.float64)
+    sums = np.bincount(groups, weights=values, minlength=n_sessions)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+
+    results = {}
+    for reducer in reducers:
+        if reducer == 'mean':
+            results[reducer] = means
+        elif reducer == 'count':
+            results[reducer] = counts.astype(np.int64)
+        elif reducer == 'sum':
+            results[reducer] = sums
+        elif reducer == 'std':
+            #sample standard deviation (ddof=1) from the deviations around each session mean
+            squares = np.bincount(groups, weights=(values - means[groups]) ** 2, minlength=n_sessions)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                results[reducer] = np.where(counts > 1, np.sqrt(squares / (counts - 1)), np.nan)
+        else:
+            extreme = np.full(n_sessions, np.inf if reducer == 'min' else -np.inf)
+            (np.minimum if reducer == 'min' else np.maximum).at(extreme, groups, values)
+            results[reducer] = np.where(counts > 0, extreme, np.nan)
+    return results
+
+def align_sessions(prices, news, cutoff=MARKET_CLOSE, timezone=MARKET_TIMEZONE, reducers=('mean',),
+                   ticker_column=None, date_column='Date', sentiment_column='Sentiment', how='inner'):
+    """
+    Joins per-session sentiment to the price rows, without modifying either input.
+
+    Args:
+        prices (pandas.DataFrame): One row per trading session (and ticker), with a date column.
+        news (pandas.DataFrame): The headlines, with timestamp and sentiment columns.
+        cutoff (str or pandas.Timedelta): The market close as time of day (see `map_to_sessions`).
+        timezone (str): The exchange time zone.
+        reducers (tuple): The sentiment reducers, keys of `REDUCERS`. The mean fills the
+                          sentiment column itself, the others '<column>_<Reducer>' columns.
+        ticker_column (str, optional): The ticker column of both frames; None treats them as one ticker.
+        date_column (str): The date/timestamp column of both frames.
+        sentiment_column (str): The sentiment column of `news`.
+        how (str): 'inner' keeps the sessions with news, 'left' keeps all sessions.
+
+    Returns:
+        pandas.DataFrame: The price rows, in their input order, with the sentiment columns added.
+    """
+    if how not in ('inner', 'left'):
+        raise ValueError(f"how must be 'inner' or 'left', got {how!r}.")
+
+    positions = map_to_sessions(prices, news, cutoff=cutoff, timezone=timezone, ticker_column=ticker_column,
+                                date_column=date_column)
+    results = aggregate_by_session(positions, news[sentiment_column], len(prices), reducers)
+
+    columns = {REDUCERS[reducer].format(sentiment_column): values for reducer, values in results.items()}
+    aligned = prices.assign(**columns)
+    if how == 'inner':
+        used = (positions >= 0) & news[sentiment_column].notna().to_numpy()
+        aligned = aligned[np.bincount(positions[used], minlength=len(prices)) > 0]
+    return aligned
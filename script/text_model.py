@@ -0,0 +1,246 @@
+#important python libraries
+import os
+import numpy as np
+import pandas as pd
+import joblib
+
+#for text modelling
+#scikit-learn is imported when a model is built, to keep module import fast
+
+#default location of the persisted text model, relative to the working directory
+MODEL_PATH = os.path.join('data', 'cache', 'text_model.joblib')
+
+#bump when the persisted state layout changes so that old state is rebuilt
+MODEL_VERSION = 2
+
+class IncrementalTextModel:
+    def __init__(self, n_features=2 ** 18, ngram_range=(1, 2), num_topics=10, total_samples=1_000_000,
+                 random_state=42):
+        """
+        Initialise an incremental TF-IDF and online LDA model over hashed terms.
+
+        Terms are hashed into a fixed number of columns, so the vocabulary never has to
+        be refitted; document frequencies and the LDA topics are updated with each new
+        batch of headlines, so a refresh costs time proportional to the new data only.
+
+        Args:
+            n_features (int): The number of hashed term columns.
+            ngram_range (tuple): Range of n-grams to consider.
+            num_topics (int): The number of topics to discover.
+            total_samples (int): The expected size of the full archive, used by online
+                                 LDA to weight each mini-batch.
+            random_state (int): Seed of the LDA model.
+        """
+        from sklearn.decomposition import LatentDirichletAllocation
+
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.num_topics = num_topics
+        self.n_documents = 0
+        #sorted hashes of the documents added so far, so that re-sent documents are skipped
+        self.document_hashes = np.empty(0, dtype=np.uint64)
+        self.document_frequency = np.zeros(n_features, dtype=np.int64)
+        #readable name of each hashed column seen so far, for reporting terms and topics
+        self.term_names = {}
+        self.lda = LatentDirichletAllocation(n_components=num_topics, learning_method='online',
+                                             total_samples=total_samples, random_state=random_state)
+        self._vectorizer = None
+
+    @property
+    def vectorizer(self):
+        """
+        The stateless hashing vectorizer producing raw term counts.
+        """
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import HashingVectorizer
+
+            self._vectorizer = HashingVectorizer(n_features=self.n_features, ngram_range=self.ngram_range,
+                                                 alternate_sign=False, norm=None)
+        return self._vectorizer
+
+    def __getstate__(self):
+        #the vectorizer is rebuilt from the parameters after loading
+        state = self.__dict__.copy()
+        state['_vectorizer'] = None
+        return state
+
+    def update(self, text_data):
+        """
+        Adds new documents: updates document frequencies, term names and the LDA topics.
+
+        Documents added by an earlier update are skipped, so the full set of headlines
+        can be passed on every run and only the new ones cost time.
+
+        Args:
+            text_data (list): A list of processed text documents.
+
+        Returns:
+            IncrementalTextModel: The updated model.
+        """
+        text_data = list(text_data)
+        if not text_data:
+            return self
+
+        hashes = pd.util.hash_array(np.asarray(text_data, dtype=object))
+        new = ~np.isin(hashes, self.document_hashes)
+        text_data = [text for text, is_new in zip(text_data, new) if is_new]
+        if not text_data:
+            return self
+        self.document_hashes = np.union1d(self.document_hashes, hashes[new])
+
+        counts = self.vectorizer.transform(text_data)
+        self.document_frequency += np.bincount(counts.indices, minlength=self.n_features)
+        self.n_documents += len(text_data)
+
+        #name the hashed columns seen for the first time
+        analyzer = self.vectorizer.build_analyzer()
+        terms = {term for text in text_data for term in analyzer(text)}
+        for term in terms:
+            self.term_names.setdefault(self._column(term), term)
+
+        #LDA is fitted on raw counts, which is what its generative model assumes
+        self.lda.partial_fit(counts)
+        return self
+
+    def _column(self, term):
+        """
+        Returns the hashed column of a term, as computed by the hashing vectorizer.
+        """
+        from sklearn.utils import murmurhash3_32
+
+        return abs(murmurhash3_32(term, seed=0)) % self.n_features
+
+    def idf(self):
+        """
+        Returns the inverse document frequency of each hashed column.
+
+        Uses the same smoothed formula as scikit-learn's `TfidfVectorizer`.
+
+        Returns:
+            numpy.ndarray: The IDF weights.
+        """
+        return np.log((1 + self.n_documents) / (1 + self.document_frequency)) + 1
+
+    def transform_tfidf(self, text_data):
+        """
+        Calculates TF-IDF scores with the current document frequencies.
+
+        Args:
+            text_data (list): A list of processed text documents.
+
+        Returns:
+            scipy.sparse.csr_matrix: The L2-normalised TF-IDF matrix.
+        """
+        from sklearn.preprocessing import normalize
+
+        counts = self.vectorizer.transform(list(text_data))
+        tfidf = counts.multiply(self.idf()).tocsr()
+        return normalize(tfidf)
+
+    def feature_names(self):
+        """
+        Returns the name of each hashed column, or '' for columns not seen yet.
+
+        Returns:
+            numpy.ndarray: The feature names, one per column.
+        """
+        names = np.full(self.n_features, '', dtype=object)
+        if self.term_names:
+            columns = np.fromiter(self.term_names.keys(), dtype=np.int64, count=len(self.term_names))
+            names[columns] = list(self.term_names.values())
+        return names
+
+    def top_tfidf_terms(self, text_data, num_terms=10):
+        """
+        Returns the terms with the highest average TF-IDF score across documents.
+
+        Args:
+            text_data (list): A list of processed text documents.
+            num_terms (int): The number of terms to return.
+
+        Returns:
+            list: `(term, score)` pairs, highest first.
+        """
+        average_tfidf = self.transform_tfidf(text_data).mean(axis=0).A1
+        names = self.feature_names()
+        top = average_tfidf.argsort()[::-1][:num_terms]
+        return [(names[i], average_tfidf[i]) for i in top if average_tfidf[i] > 0]
+
+    def topics(self, num_words=10):
+        """
+        Returns the top words of each LDA topic.
+
+        Args:
+            num_words (int): The number of words per topic.
+
+        Returns:
+            list: A list of top words for each topic.
+        """
+        if self.n_documents == 0:
+            return []
+        names = self.feature_names()
+        #only named columns can be reported, unseen columns keep their prior weight
+        named = names != ''
+        topics = []
+        for topic in self.lda.components_:
+            weights = np.where(named, topic, -np.inf)
+            topics.append([names[i] for i in weights.argsort()[-num_words:]])
+        return topics
+
+    def save(self, model_path=MODEL_PATH):
+        """
+        Saves the model state atomically.
+
+        Args:
+            model_path (str): The path of the state file.
+        """
+        model_folder = os.path.dirname(model_path)
+        if model_folder and not os.path.exists(model_folder):
+            os.makedirs(model_folder)
+        temp_path = model_path + '.tmp'
+        joblib.dump({'version': MODEL_VERSION, 'model': self}, temp_path)
+        os.replace(temp_path, model_path)
+
+def load_text_model(model_path=MODEL_PATH, **model_args):
+    """
+    Loads a persisted text model, or creates a new one if there is none.
+
+    A state file written by a different model version or with different
+    `model_args` is ignored and a new model is created.
+
+    Args:
+        model_path (str): The path of the state file.
+        **model_args: Arguments of `IncrementalTextModel` for a new model.
+
+    Returns:
+        IncrementalTextModel: The model.
+    """
+    if os.path.exists(model_path):
+        try:
+            state = joblib.load(model_path)
+            model = state['model']
+            matches = all(getattr(model, name, None) == value for name, value in model_args.items()
+                          if name not in ('total_samples', 'random_state'))
+            if state.get('version') == MODEL_VERSION and matches:
+                return model
+            print(f'Text model at {model_path} is out of date, starting a new one.')
+        except Exception as e:
+            print(f'Error loading text model: {e}')
+    return IncrementalTextModel(**model_args)
+
+def update_text_model(text_data, model_path=MODEL_PATH, **model_args):
+    """
+    Loads the persisted text model, adds the documents it has not seen to it and saves it again.
+
+    Args:
+        text_data (list): A list of processed text documents.
+        model_path (str): The path of the state file.
+        **model_args: Arguments of `IncrementalTextModel` for a new model.
+
+    Returns:
+        IncrementalTextModel: The updated model.
+    """
+    model = load_text_model(model_path, **model_args)
+    model.update(text_data)
+    model.save(model_path)
+    return model